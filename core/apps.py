@@ -1,6 +1,24 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def _reinstall_search_index(sender, using, **kwargs):
+    # SQLite loses the search triggers whenever a migration rebuilds core_event.
+    from django.db import connections
+    from django.db.migrations.recorder import MigrationRecorder
+
+    from core.services.search_service import install_search_index
+
+    connection = connections[using]
+    if ("core", "0016_event_search_index") in MigrationRecorder(connection).applied_migrations():
+        install_search_index(connection)
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from . import checks  # noqa: F401  (registers the system checks)
+
+        post_migrate.connect(_reinstall_search_index, sender=self)
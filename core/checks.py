@@ -0,0 +1,46 @@
+"""System checks for settings that are only needed once the app serves requests.
+
+Build steps such as ``collectstatic`` load settings without the signing
+secrets, so missing keys are not an import error. They are reported here
+(``manage.py check``, ``runserver``, ``migrate``) and raise
+``ImproperlyConfigured`` again when a key is first used.
+"""
+import base64
+import binascii
+
+from django.conf import settings
+from django.core.checks import Error, register
+
+SIGNING_TAG = "signing"
+
+
+@register(SIGNING_TAG)
+def check_qr_signing_keys(app_configs, **kwargs):
+    key_id = getattr(settings, "QR_SIGNING_KEY_ID", "")
+    if getattr(settings, "QR_SIGNING_KEYS", {}).get(key_id):
+        return []
+    return [
+        Error(
+            f"QR_SIGNING_KEYS must include a key for QR_SIGNING_KEY_ID {key_id!r}.",
+            hint='Set QR_SIGNING_KEYS to dedicated secrets, e.g. "K1:<secret>".',
+            id="core.E002",
+        )
+    ]
+
+
+@register(SIGNING_TAG)
+def check_manifest_signing_key(app_configs, **kwargs):
+    key = getattr(settings, "ENTRY_MANIFEST_SIGNING_KEY", "")
+    try:
+        valid = len(base64.b64decode(key, validate=True)) == 32
+    except (binascii.Error, ValueError):
+        valid = False
+    if valid:
+        return []
+    return [
+        Error(
+            "ENTRY_MANIFEST_SIGNING_KEY must be a base64-encoded 32-byte Ed25519 private key.",
+            hint="Generate a dedicated key with `openssl rand -base64 32`.",
+            id="core.E001",
+        )
+    ]
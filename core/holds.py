@@ -0,0 +1,170 @@
+"""Storage backends for time-limited seat holds.
+
+A hold is a plain dict ``{"id", "event_id", "user_id", "quantity",
+"expires_at"}`` where ``expires_at`` is a unix timestamp. Backends only have
+to store holds and hand each one out exactly once, either to ``pop`` (the
+hold is being confirmed or released) or to ``pop_expired`` (the sweeper is
+returning its seats to the event).
+"""
+import json
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from core.models import SeatHold
+
+
+class LocalHoldBackend:
+    """In-process store for tests. Not shared between workers, and lost on restart.
+
+    The ``sweep_holds`` command cannot see these holds, so expired ones are
+    swept by the web process itself whenever a new hold is made.
+    """
+
+    shared = False
+
+    def __init__(self):
+        self._holds = {}
+        self._lock = threading.Lock()
+
+    def add(self, hold):
+        with self._lock:
+            self._holds[hold["id"]] = hold
+
+    def get(self, hold_id):
+        hold = self._holds.get(hold_id)
+        if hold is None or hold["expires_at"] <= time.time():
+            return None
+        return hold
+
+    def pop(self, hold_id):
+        with self._lock:
+            hold = self._holds.get(hold_id)
+            if hold is None or hold["expires_at"] <= time.time():
+                return None
+            return self._holds.pop(hold_id)
+
+    def pop_expired(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [hold_id for hold_id, hold in self._holds.items() if hold["expires_at"] <= now]
+            return [self._holds.pop(hold_id) for hold_id in expired]
+
+    def clear(self):
+        with self._lock:
+            self._holds.clear()
+
+
+class DatabaseHoldBackend:
+    """Default store: one ``SeatHold`` row per hold, so every worker sees every
+    hold and ``sweep_holds`` can return expired seats from a separate process."""
+
+    shared = True
+
+    def _as_hold(self, row):
+        return {
+            "id": row.id,
+            "event_id": row.event_id,
+            "user_id": row.user_id,
+            "quantity": row.quantity,
+            "expires_at": row.expires_at,
+        }
+
+    def add(self, hold):
+        SeatHold.objects.create(
+            id=hold["id"],
+            event_id=hold["event_id"],
+            user_id=hold["user_id"],
+            quantity=hold["quantity"],
+            expires_at=hold["expires_at"],
+        )
+
+    def get(self, hold_id):
+        row = SeatHold.objects.filter(pk=hold_id, expires_at__gt=time.time()).first()
+        return self._as_hold(row) if row is not None else None
+
+    def pop(self, hold_id):
+        hold = self.get(hold_id)
+        # Only the caller whose DELETE removes the row owns the hold.
+        if hold is None or not SeatHold.objects.filter(pk=hold_id).delete()[0]:
+            return None
+        return hold
+
+    def pop_expired(self, now=None):
+        now = time.time() if now is None else now
+        with transaction.atomic():
+            # Concurrent sweepers skip each other's rows instead of returning them twice.
+            rows = list(SeatHold.objects.select_for_update(skip_locked=True).filter(expires_at__lte=now))
+            SeatHold.objects.filter(pk__in=[row.pk for row in rows]).delete()
+        return [self._as_hold(row) for row in rows]
+
+    def clear(self):
+        SeatHold.objects.all().delete()
+
+
+class RedisHoldBackend:
+    """Shared store for production: one key per hold plus a sorted set indexed by expiry."""
+
+    index_key = "holds:expiry"
+    shared = True
+
+    def __init__(self, url=None):
+        import redis
+
+        self._redis = redis.Redis.from_url(url or settings.REDIS_URL)
+
+    def _key(self, hold_id):
+        return f"hold:{hold_id}"
+
+    def add(self, hold):
+        pipe = self._redis.pipeline()
+        pipe.set(self._key(hold["id"]), json.dumps(hold))
+        pipe.zadd(self.index_key, {hold["id"]: hold["expires_at"]})
+        pipe.execute()
+
+    def get(self, hold_id):
+        raw = self._redis.get(self._key(hold_id))
+        if raw is None:
+            return None
+        hold = json.loads(raw)
+        return hold if hold["expires_at"] > time.time() else None
+
+    def _claim(self, hold_id):
+        # ZREM succeeds for exactly one caller, which makes it the owner of the hold.
+        if not self._redis.zrem(self.index_key, hold_id):
+            return None
+        pipe = self._redis.pipeline()
+        pipe.get(self._key(hold_id))
+        pipe.delete(self._key(hold_id))
+        raw, _ = pipe.execute()
+        return json.loads(raw) if raw is not None else None
+
+    def pop(self, hold_id):
+        if self.get(hold_id) is None:
+            return None
+        return self._claim(hold_id)
+
+    def pop_expired(self, now=None):
+        now = time.time() if now is None else now
+        expired = []
+        for hold_id in self._redis.zrangebyscore(self.index_key, "-inf", now):
+            hold = self._claim(hold_id.decode())
+            if hold is not None:
+                expired.append(hold)
+        return expired
+
+    def clear(self):
+        hold_ids = self._redis.zrange(self.index_key, 0, -1)
+        if hold_ids:
+            self._redis.delete(*[self._key(hold_id.decode()) for hold_id in hold_ids])
+        self._redis.delete(self.index_key)
+
+
+@lru_cache(maxsize=None)
+def get_hold_backend():
+    backend = getattr(settings, "TICKET_HOLD_BACKEND", "core.holds.DatabaseHoldBackend")
+    return import_string(backend)()
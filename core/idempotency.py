@@ -0,0 +1,76 @@
+"""Idempotency-Key support for retried POSTs.
+
+The first request with a given key runs the view and its response is cached
+for ``IDEMPOTENCY_KEY_TTL`` seconds. Retries with the same key and body get
+that response replayed without running the view again. While the first
+request runs, its key is held for at most ``IDEMPOTENCY_LOCK_TTL`` seconds,
+so a worker that dies mid-request does not block the key for a day.
+
+Keys live in the ``SHARED_CACHE_ALIAS`` cache so retries that reach another
+worker are recognised too.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+IN_PROGRESS = "in-progress"
+
+
+def _fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.path}\n{body}".encode()).hexdigest()
+
+
+def idempotent(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if not key:
+            return view(request, *args, **kwargs)
+
+        cache_key = f"idempotency:{request.user.pk}:{view.__name__}:{key}"
+        fingerprint = _fingerprint(request)
+        ttl = getattr(settings, "IDEMPOTENCY_KEY_TTL", 24 * 60 * 60)
+        lock_ttl = getattr(settings, "IDEMPOTENCY_LOCK_TTL", 60)
+        cache = caches[getattr(settings, "SHARED_CACHE_ALIAS", "default")]
+
+        if not cache.add(cache_key, IN_PROGRESS, timeout=lock_ttl):
+            stored = cache.get(cache_key)
+            if stored == IN_PROGRESS:
+                return Response(
+                    {"error": "A request with this Idempotency-Key is still being processed"},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            if stored is not None:
+                if stored["fingerprint"] != fingerprint:
+                    return Response(
+                        {"error": "Idempotency-Key was already used with a different request"},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    )
+                return Response(stored["data"], status=stored["status"], headers={"Idempotent-Replayed": "true"})
+            # The entry expired between add() and get(); treat this as a first request.
+            cache.add(cache_key, IN_PROGRESS, timeout=lock_ttl)
+
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            cache.delete(cache_key)
+            raise
+
+        if response.status_code >= 500 or response.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+            # Transient failures must stay retryable under the same key.
+            cache.delete(cache_key)
+        else:
+            cache.set(
+                cache_key,
+                {"fingerprint": fingerprint, "status": response.status_code, "data": response.data},
+                timeout=ttl,
+            )
+        return response
+
+    return wrapper
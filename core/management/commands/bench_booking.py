@@ -0,0 +1,99 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, connections
+
+from core.models import Event, Ticket, User
+from core.services.ticket_service import TicketsUnavailable, create_ticket, reconcile_inventory, reshard_inventory
+
+from ._concurrency import run_concurrently
+
+
+def _book_many(event_id, user_id, attempts):
+    outcome = Counter()
+    event = Event.objects.get(pk=event_id)
+    user = User.objects.get(pk=user_id)
+    for _ in range(attempts):
+        try:
+            create_ticket(event=event, user=user)
+            outcome["booked"] += 1
+        except TicketsUnavailable:
+            outcome["sold_out"] += 1
+        except DatabaseError:
+            outcome["errors"] += 1
+    connections.close_all()
+    return outcome
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer a single event with concurrent bookings and verify that no "
+        "tickets are oversold. Runs against the configured database, so set "
+        "DB_ENGINE to compare SQLite and PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=500, help="Inventory of the benchmark event.")
+        parser.add_argument("--attempts", type=int, default=1000, help="Total booking attempts per run.")
+        parser.add_argument("--workers", type=int, default=8, help="Concurrent threads/processes per run.")
+        parser.add_argument(
+            "--mode",
+            choices=["threads", "processes", "both"],
+            default="both",
+            help="Concurrency model to benchmark.",
+        )
+        parser.add_argument(
+            "--shards",
+            type=int,
+            nargs="+",
+            default=[1],
+            help="Inventory shard counts to compare, e.g. --shards 1 16.",
+        )
+
+    def handle(self, *args, **options):
+        modes = ["threads", "processes"] if options["mode"] == "both" else [options["mode"]]
+        user, _ = User.objects.get_or_create(username="bench_booking", defaults={"role": "customer"})
+        self.stdout.write(f"Database vendor: {connection.vendor}")
+
+        try:
+            for shard_count in options["shards"]:
+                for mode in modes:
+                    self._run(mode, shard_count, user, options)
+        finally:
+            Event.objects.filter(title="Booking benchmark").delete()
+            user.delete()
+
+    def _run(self, mode, shard_count, user, options):
+        tickets, workers = options["tickets"], options["workers"]
+        label = f"{mode}, {shard_count} shard(s)"
+        event = Event.objects.create(
+            title="Booking benchmark",
+            ticket_price=100,
+            tickets_available=tickets,
+            total_tickets=tickets,
+            shard_count=shard_count,
+        )
+        reshard_inventory(event)
+
+        per_worker, remainder = divmod(options["attempts"], workers)
+        jobs = [(event.id, user.id, per_worker + (1 if i < remainder else 0)) for i in range(workers)]
+        results, elapsed = run_concurrently(_book_many, jobs, mode=mode, workers=workers)
+        outcome = sum(results, Counter())
+
+        reconcile_inventory()
+        event.refresh_from_db()
+        sold = Ticket.objects.filter(event=event).count()
+        self.stdout.write(
+            f"[{label}] booked={outcome['booked']} sold_out={outcome['sold_out']} "
+            f"errors={outcome['errors']} elapsed={elapsed:.2f}s "
+            f"bookings/sec={outcome['booked'] / elapsed:.1f}"
+        )
+
+        if event.tickets_available < 0 or sold != tickets - event.tickets_available or sold != outcome["booked"]:
+            raise CommandError(
+                f"[{label}] oversell detected: sold={sold} remaining={event.tickets_available} inventory={tickets}"
+            )
+        if event.tickets_sold != sold:
+            raise CommandError(f"[{label}] tickets_sold={event.tickets_sold} after reconciling, expected {sold}")
+        self.stdout.write(self.style.SUCCESS(f"[{label}] no oversell: sold={sold} remaining={event.tickets_available}"))
+        event.delete()
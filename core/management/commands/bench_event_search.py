@@ -0,0 +1,80 @@
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from core.models import Event
+from core.views import EventViewSet
+
+GENRES = "jazz rock gospel comedy theatre festival summit expo marathon derby gala symphony hackathon film poetry".split()
+VENUES = ["Nairobi Arena", "Uhuru Gardens", "KICC", "Carnivore Grounds", "Kasarani Stadium", "Sarit Expo Centre"]
+QUERIES = ["jazz", "gospel festival", "uhuru", "sym", "hackathon startup nairobi", "w123", "zzzz"]
+BENCH_VENUE = "Search benchmark"
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic events and time ranked ?q= searches through "
+        "the event list endpoint against an unindexed icontains scan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=100_000, help="Synthetic events to create.")
+        parser.add_argument("--repeat", type=int, default=20, help="Requests per query.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Database vendor: {connection.vendor}")
+        rng = random.Random(0)
+        start = timezone.now()
+        # A Zipf-like vocabulary: a few words are everywhere, most are rare.
+        vocabulary = [f"w{index}" for index in range(20_000)]
+        weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+        events = [
+            Event(
+                title=f"{rng.choice(GENRES).title()} {' '.join(rng.choices(vocabulary, weights, k=2))}",
+                description=" ".join(rng.choices(vocabulary, weights, k=30) + rng.sample(GENRES, 2)),
+                venue=f"{rng.choice(VENUES)} {BENCH_VENUE}",
+                date=start + timedelta(hours=rng.randrange(24 * 365)),
+                ticket_price=rng.randrange(0, 5000),
+            )
+            for _ in range(options["events"])
+        ]
+        started = time.perf_counter()
+        Event.objects.bulk_create(events, batch_size=5000)
+        self.stdout.write(f"indexed {len(events)} events in {time.perf_counter() - started:.1f}s")
+
+        list_view = EventViewSet.as_view({"get": "list"})
+        factory = RequestFactory(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        try:
+            for query in QUERIES:
+                params = {"q": query, "price_max": "2500", "page_size": 20}
+                timings, count = [], 0
+                for _ in range(options["repeat"]):
+                    began = time.perf_counter()
+                    # Time the query, not the anonymous response cache.
+                    with override_settings(EVENT_RESPONSE_CACHE_SECONDS=0):
+                        response = list_view(factory.get("/api/events/", params))
+                    timings.append(time.perf_counter() - began)
+                    count = len(response.data["results"])
+                timings.sort()
+                self.stdout.write(
+                    f"[index] q={query!r:30} results={count:3} "
+                    f"median={timings[len(timings) // 2] * 1000:.1f}ms p95={timings[int(len(timings) * 0.95)] * 1000:.1f}ms"
+                )
+
+                began = time.perf_counter()
+                term = query.split()[0]
+                scan = Event.objects.filter(
+                    Q(title__icontains=term) | Q(description__icontains=term) | Q(venue__icontains=term),
+                    ticket_price__lte=2500,
+                ).order_by("-date", "-id")[:20]
+                len(list(scan))
+                self.stdout.write(f"[icontains scan] q={term!r:24} {(time.perf_counter() - began) * 1000:.1f}ms")
+        finally:
+            Event.objects.filter(venue__endswith=BENCH_VENUE).delete()
@@ -0,0 +1,99 @@
+import random
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, connections
+
+from core.models import Event, Ticket, User
+from core.services.ticket_service import TicketNotVerifiable, admit_ticket
+
+from ._concurrency import run_concurrently
+
+
+def _admit_read_then_save(ticket_id):
+    # The pre-CAS flow, kept only so the benchmark can show the race it had.
+    ticket = Ticket.objects.get(pk=ticket_id)
+    if ticket.status != "unused":
+        raise TicketNotVerifiable("already_used")
+    ticket.status = "used"
+    ticket.save(update_fields=["status"])
+    return ticket.event.title
+
+
+STRATEGIES = {"cas": admit_ticket, "read-save": _admit_read_then_save}
+
+
+def _scan_many(strategy, ticket_ids):
+    admit = STRATEGIES[strategy]
+    outcome, admitted = Counter(), []
+    for ticket_id in ticket_ids:
+        try:
+            admit(ticket_id)
+            admitted.append(ticket_id)
+        except TicketNotVerifiable as exc:
+            outcome[exc.reason] += 1
+        except DatabaseError:
+            outcome["errors"] += 1
+    connections.close_all()
+    return outcome, admitted
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a gate rush: many scanners verifying the same tickets at once. "
+        "Fails if any ticket is admitted more than once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=500, help="Tickets issued for the benchmark event.")
+        parser.add_argument("--scans-per-ticket", type=int, default=3, help="How many scanners see each ticket.")
+        parser.add_argument("--scanners", type=int, default=16, help="Concurrent scanners (threads/processes).")
+        parser.add_argument("--mode", choices=["threads", "processes"], default="threads")
+        parser.add_argument(
+            "--strategy",
+            choices=[*STRATEGIES, "both"],
+            default="cas",
+            help="'read-save' replays the old read-check-save verification for comparison.",
+        )
+
+    def handle(self, *args, **options):
+        strategies = list(STRATEGIES) if options["strategy"] == "both" else [options["strategy"]]
+        user, _ = User.objects.get_or_create(username="bench_gate_rush", defaults={"role": "customer"})
+        self.stdout.write(f"Database vendor: {connection.vendor}")
+
+        failures = []
+        try:
+            for strategy in strategies:
+                failures += self._run(strategy, user, options)
+        finally:
+            Event.objects.filter(title="Gate rush benchmark").delete()
+            user.delete()
+        if failures:
+            raise CommandError("; ".join(failures))
+
+    def _run(self, strategy, user, options):
+        event = Event.objects.create(title="Gate rush benchmark", ticket_price=100)
+        tickets = Ticket.objects.bulk_create(
+            [Ticket(event=event, buyer=user, price=100, is_active=True) for _ in range(options["tickets"])]
+        )
+        scans = [ticket.id for ticket in tickets for _ in range(options["scans_per_ticket"])]
+        random.shuffle(scans)
+        scanners = options["scanners"]
+        jobs = [(strategy, scans[index::scanners]) for index in range(scanners)]
+
+        results, elapsed = run_concurrently(_scan_many, jobs, mode=options["mode"], workers=scanners)
+        outcome = sum((result for result, _ in results), Counter())
+        admissions = Counter(ticket_id for _, admitted in results for ticket_id in admitted)
+        double_admits = sum(1 for count in admissions.values() if count > 1)
+
+        self.stdout.write(
+            f"[{strategy}] scans={len(scans)} admitted={sum(admissions.values())} "
+            f"already_used={outcome['already_used']} errors={outcome['errors']} "
+            f"elapsed={elapsed:.2f}s scans/sec={len(scans) / elapsed:.1f}"
+        )
+        event.delete()
+
+        if double_admits or len(admissions) != len(tickets):
+            return [f"[{strategy}] {double_admits} ticket(s) admitted twice, {len(tickets) - len(admissions)} never admitted"]
+        self.stdout.write(self.style.SUCCESS(f"[{strategy}] every ticket admitted exactly once"))
+        return []
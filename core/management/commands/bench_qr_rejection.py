@@ -0,0 +1,56 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.models import Ticket
+from core.qr import InvalidTicketCode, parse_ticket_code, sign_ticket_code
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare how fast garbage and forged ticket codes are rejected by signature "
+        "checks alone versus the database lookup that unsigned ticket:<id> codes needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--codes", type=int, default=20000, help="Bogus codes to reject per run.")
+
+    def handle(self, *args, **options):
+        count = options["codes"]
+        rng = random.Random(0)
+        forged = []
+        for _ in range(count):
+            code = sign_ticket_code(rng.randrange(1, 10**7), rng.randrange(1, 10**4))
+            forged.append(code[:-1] + ("B" if code.endswith("A") else "A"))
+        garbage = [f"ticket:{rng.randrange(10**8, 10**9)}" for _ in range(count)]
+        wrong_event = [sign_ticket_code(rng.randrange(1, 10**7), 1) for _ in range(count)]
+
+        for label, codes, event_id in (
+            ("forged", forged, None),
+            ("garbage", garbage, None),
+            ("wrong event", wrong_event, 2),
+        ):
+            started = time.perf_counter()
+            rejected = 0
+            for code in codes:
+                try:
+                    parse_ticket_code(code, event_id=event_id)
+                except InvalidTicketCode:
+                    rejected += 1
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"[signature, {label}] rejected={rejected}/{len(codes)} "
+                f"{len(codes) / elapsed:,.0f} codes/sec ({elapsed / len(codes) * 1e6:.1f} us/code)"
+            )
+
+        lookups = garbage[: min(count, 2000)]
+        started = time.perf_counter()
+        for code in lookups:
+            Ticket.objects.filter(pk=int(code.split(":")[1])).exists()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"[database lookup ({connection.vendor})] {len(lookups) / elapsed:,.0f} codes/sec "
+            f"({elapsed / len(lookups) * 1e6:.1f} us/code)"
+        )
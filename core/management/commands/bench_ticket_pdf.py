@@ -0,0 +1,71 @@
+import time
+from datetime import timedelta
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from reportlab.pdfgen import canvas
+
+from core.models import Event, Ticket
+from core.qr import render_qr, ticket_qr_payload
+from core.utils import PAGE_HEIGHT, PAGE_WIDTH, build_ticket_invitation_pdf, draw_ticket_page
+
+
+class Command(BaseCommand):
+    help = (
+        "Build ticket PDFs in a loop and report pages/sec with the static page "
+        "layer redrawn per ticket versus stamped from a form XObject, for "
+        "single-ticket PDFs and for one multi-page document."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=200, help="Ticket pages to build per run.")
+        parser.add_argument(
+            "--warm-qr",
+            action="store_true",
+            help="Pre-render every QR code so only PDF assembly is measured.",
+        )
+
+    def handle(self, *args, **options):
+        event = Event(
+            id=1,
+            title="PDF benchmark",
+            venue="Main Hall",
+            description="Doors open an hour before the show. Bring this ticket.",
+            date=timezone.now() + timedelta(days=30),
+            ticket_price=100,
+        )
+        tickets = [
+            Ticket(id=ticket_id, event=event, price=100, created_at=timezone.now())
+            for ticket_id in range(1, options["count"] + 1)
+        ]
+
+        for layout, build in (("single-ticket PDFs", self._single_pdfs), ("one document", self._document)):
+            results = {}
+            for label, use_static_layer in (("redrawn", False), ("form", True)):
+                render_qr.cache_clear()
+                if options["warm_qr"]:
+                    for ticket in tickets:
+                        render_qr(ticket_qr_payload(ticket), "png")
+                started = time.perf_counter()
+                build(tickets, use_static_layer)
+                elapsed = time.perf_counter() - started
+                results[label] = len(tickets) / elapsed
+                self.stdout.write(
+                    f"[{layout}, {label} static layer] {len(tickets)} pages in {elapsed:.2f}s "
+                    f"({results[label]:.1f} pages/sec)"
+                )
+
+            speedup = results["form"] / results["redrawn"]
+            self.stdout.write(self.style.SUCCESS(f"{layout}, static layer form: {speedup:.2f}x"))
+
+    def _single_pdfs(self, tickets, use_static_layer):
+        for ticket in tickets:
+            build_ticket_invitation_pdf(ticket, f"BENCH-{ticket.id:06d}", use_static_layer=use_static_layer)
+
+    def _document(self, tickets, use_static_layer):
+        pdf = canvas.Canvas(BytesIO(), pagesize=(PAGE_WIDTH, PAGE_HEIGHT))
+        for ticket in tickets:
+            draw_ticket_page(pdf, ticket, f"BENCH-{ticket.id:06d}", use_static_layer=use_static_layer)
+            pdf.showPage()
+        pdf.save()
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from core.services.manifest_service import manifest_public_key
+
+
+class Command(BaseCommand):
+    help = "Print the Ed25519 public key that gate devices verify entry manifests with."
+
+    def handle(self, *args, **options):
+        self.stdout.write(manifest_public_key())
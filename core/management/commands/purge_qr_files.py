@@ -0,0 +1,37 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from core.models import Invitation, Ticket
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete persisted QR PNGs and clear the qr_code columns. QR images are "
+        "served on demand by /api/tickets/<id>/qr.<png|svg>, so the files are no "
+        "longer needed once QR_PERSIST_FILES is off."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many files would be removed.")
+
+    def handle(self, *args, **options):
+        for model in (Ticket, Invitation):
+            purged = self._purge(model, options["batch_size"], options["dry_run"])
+            action = "Would remove" if options["dry_run"] else "Removed"
+            self.stdout.write(f"{action} {purged} {model.__name__} QR file(s).")
+
+    def _purge(self, model, batch_size, dry_run):
+        stored = model.objects.exclude(qr_code="").exclude(qr_code__isnull=True)
+        if dry_run:
+            return stored.count()
+
+        purged = 0
+        while True:
+            batch = list(stored.values_list("pk", "qr_code")[:batch_size])
+            if not batch:
+                return purged
+            for _, name in batch:
+                default_storage.delete(name)
+            model.objects.filter(pk__in=[pk for pk, _ in batch]).update(qr_code="")
+            purged += len(batch)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.services.sales_service import rebuild_sales_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-event sales rollup and hourly sales buckets from the tickets table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", type=int, nargs="+", dest="events", help="Only rebuild these event ids.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Events rebuilt per transaction.")
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_sales_stats(options["events"], batch_size=options["batch_size"])
+        self.stdout.write(f"Rebuilt sales stats for {rebuilt} event(s).")
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services.ticket_service import reconcile_inventory
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll sharded inventory up into Event.tickets_available and fold queued "
+        "sales into tickets_sold and the sales rollups. Run from cron or with --interval."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Keep reconciling every N seconds instead of running once.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            updated = reconcile_inventory()
+            self.stdout.write(f"Reconciled {updated} sharded event(s).")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
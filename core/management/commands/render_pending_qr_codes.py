@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from core.models import Ticket
+from core.tasks import render_ticket_qr_codes
+
+
+class Command(BaseCommand):
+    help = "Render QR images for tickets whose background render never completed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if not getattr(settings, "QR_PERSIST_FILES", False):
+            self.stdout.write("QR_PERSIST_FILES is off; QR codes are served on demand and none are rendered.")
+            return
+        pending = Ticket.objects.filter(Q(qr_code="") | Q(qr_code__isnull=True)).values_list("id", flat=True)
+        ticket_ids = list(pending)
+        rendered = 0
+        for start in range(0, len(ticket_ids), options["batch_size"]):
+            rendered += render_ticket_qr_codes(ticket_ids[start:start + options["batch_size"]])
+        self.stdout.write(f"Rendered {rendered} QR code(s).")
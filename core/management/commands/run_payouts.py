@@ -0,0 +1,19 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from core.services.ledger_service import run_payouts
+
+
+class Command(BaseCommand):
+    help = "Settle provider balances from the finance ledger, a batch of providers per transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Providers settled per transaction.")
+        parser.add_argument(
+            "--minimum", type=Decimal, default=Decimal("0.01"), help="Skip providers owed less than this."
+        )
+
+    def handle(self, *args, **options):
+        paid, amount = run_payouts(batch_size=options["batch_size"], minimum=options["minimum"])
+        self.stdout.write(f"Paid out {amount} to {paid} provider(s).")
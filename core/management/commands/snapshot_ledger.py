@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services.ledger_service import take_ledger_snapshot
+
+
+class Command(BaseCommand):
+    help = "Snapshot platform and provider ledger balances. Run from cron or with --interval."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Keep snapshotting every N seconds instead of running once.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            written = take_ledger_snapshot()
+            self.stdout.write(f"Wrote {written} ledger snapshot(s).")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
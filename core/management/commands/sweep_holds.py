@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.holds import get_hold_backend
+
+from core.services.hold_service import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Return the seats of expired holds to their events. Run from cron or with --interval."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Keep sweeping every N seconds instead of running once.",
+        )
+
+    def handle(self, *args, **options):
+        if not get_hold_backend().shared:
+            raise CommandError(
+                "TICKET_HOLD_BACKEND keeps holds in each web process, where this command cannot see them; "
+                "configure core.holds.DatabaseHoldBackend or core.holds.RedisHoldBackend to sweep holds from a separate process."
+            )
+        while True:
+            released = release_expired_holds()
+            self.stdout.write(f"Released {released} expired hold(s).")
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
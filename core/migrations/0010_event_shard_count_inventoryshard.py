@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_event_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="shard_count",
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.CreateModel(
+            name="InventoryShard",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("index", models.PositiveSmallIntegerField()),
+                ("tickets_available", models.IntegerField(default=0)),
+                ("event", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="shards", to="core.event")),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("event", "index"), name="unique_inventory_shard")],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_event_shard_count_inventoryshard"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="details_updated_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_event_details_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="used_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="ticket",
+            name="used_by_device",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_ticket_used_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(fields=["event", "updated_at"], name="ticket_event_updated_idx"),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_ticket_event_updated_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["date", "id"], name="event_date_id_idx"),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:51
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_sold_tickets(apps, schema_editor):
+    Event = apps.get_model("core", "Event")
+    Ticket = apps.get_model("core", "Ticket")
+    sold = Ticket.objects.filter(event=OuterRef("pk")).values("event").annotate(total=Count("pk")).values("total")
+    Event.objects.update(tickets_sold=Coalesce(Subquery(sold), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_event_date_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="tickets_sold",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_sold_tickets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations
+
+# Frozen copy of the schema in core.services.search_service as of this
+# migration, so later changes to the service cannot alter its history.
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_event_fts USING fts5("
+    "title, description, venue, content='core_event', content_rowid='id', "
+    "tokenize='porter unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS core_event_fts_insert AFTER INSERT ON core_event BEGIN "
+    "INSERT INTO core_event_fts(rowid, title, description, venue) "
+    "VALUES (new.id, new.title, new.description, new.venue); END",
+    "CREATE TRIGGER IF NOT EXISTS core_event_fts_delete AFTER DELETE ON core_event BEGIN "
+    "INSERT INTO core_event_fts(core_event_fts, rowid, title, description, venue) "
+    "VALUES ('delete', old.id, old.title, old.description, old.venue); END",
+    "CREATE TRIGGER IF NOT EXISTS core_event_fts_update AFTER UPDATE OF title, description, venue ON core_event BEGIN "
+    "INSERT INTO core_event_fts(core_event_fts, rowid, title, description, venue) "
+    "VALUES ('delete', old.id, old.title, old.description, old.venue); "
+    "INSERT INTO core_event_fts(rowid, title, description, venue) "
+    "VALUES (new.id, new.title, new.description, new.venue); END",
+    "INSERT INTO core_event_fts(core_event_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS core_event_fts_insert",
+    "DROP TRIGGER IF EXISTS core_event_fts_delete",
+    "DROP TRIGGER IF EXISTS core_event_fts_update",
+    "DROP TABLE IF EXISTS core_event_fts",
+]
+
+POSTGRESQL_INSTALL = [
+    "ALTER TABLE core_event ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(venue, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS event_search_vector_idx ON core_event USING GIN (search_vector)",
+]
+
+POSTGRESQL_UNINSTALL = [
+    "ALTER TABLE core_event DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(schema_editor, statements):
+    statements = statements.get(schema_editor.connection.vendor, [])
+    with schema_editor.connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def install(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_INSTALL, "postgresql": POSTGRESQL_INSTALL})
+
+
+def uninstall(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_UNINSTALL, "postgresql": POSTGRESQL_UNINSTALL})
+
+
+class Migration(migrations.Migration):
+    # Backend-specific: an FTS5 table plus triggers on SQLite, a generated
+    # tsvector column with a GIN index on PostgreSQL. Other databases get nothing.
+
+    dependencies = [
+        ("core", "0015_event_tickets_sold"),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:23
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill(apps, schema_editor):
+    Ticket = apps.get_model("core", "Ticket")
+    EventSalesStats = apps.get_model("core", "EventSalesStats")
+    live = ~Q(status="cancelled")
+    rows = Ticket.objects.values("event_id").annotate(
+        sold=Count("pk", filter=live),
+        used=Count("pk", filter=Q(status="used")),
+        cancelled=Count("pk", filter=Q(status="cancelled")),
+        gross=Sum("price", filter=live),
+        commission=Sum("commission_amount", filter=live),
+        provider_net=Sum("provider_amount", filter=live),
+    )
+    EventSalesStats.objects.bulk_create(
+        [
+            EventSalesStats(
+                event_id=row.pop("event_id"), **{name: value or 0 for name, value in row.items()}
+            )
+            for row in rows.order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0016_event_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventSalesStats",
+            fields=[
+                ("event", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="sales_stats", serialize=False, to="core.event")),
+                ("sold", models.PositiveIntegerField(default=0)),
+                ("used", models.PositiveIntegerField(default=0)),
+                ("cancelled", models.PositiveIntegerField(default=0)),
+                ("gross", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("commission", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("provider_net", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("updated_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
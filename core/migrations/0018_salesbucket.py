@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:31
+
+import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncHour
+
+
+def backfill(apps, schema_editor):
+    Ticket = apps.get_model("core", "Ticket")
+    SalesBucket = apps.get_model("core", "SalesBucket")
+    rows = (
+        Ticket.objects.exclude(status="cancelled")
+        .annotate(bucket=TruncHour("created_at", tzinfo=datetime.timezone.utc))
+        .values("event_id", "bucket")
+        .annotate(sold=Count("pk"), gross=Sum("price"), provider_net=Sum("provider_amount"))
+    )
+    SalesBucket.objects.bulk_create(
+        [
+            SalesBucket(
+                event_id=row["event_id"],
+                hour=row["bucket"],
+                sold=row["sold"],
+                gross=row["gross"] or 0,
+                provider_net=row["provider_net"] or 0,
+            )
+            for row in rows.order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0017_eventsalesstats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SalesBucket",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("hour", models.DateTimeField()),
+                ("sold", models.PositiveIntegerField(default=0)),
+                ("gross", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("provider_net", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("event", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="sales_buckets", to="core.event")),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("event", "hour"), name="unique_sales_bucket")],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
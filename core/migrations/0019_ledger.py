@@ -0,0 +1,82 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill(apps, schema_editor):
+    """Open the ledger with one sale entry per event for the tickets booked so far."""
+    Ticket = apps.get_model("core", "Ticket")
+    LedgerEntry = apps.get_model("core", "LedgerEntry")
+    rows = (
+        Ticket.objects.exclude(status="cancelled")
+        .values("event_id", "event__provider_id")
+        .annotate(
+            tickets=Count("pk"),
+            gross=Sum("price"),
+            commission=Sum("commission_amount"),
+            provider_amount=Sum("provider_amount"),
+        )
+    )
+    LedgerEntry.objects.bulk_create(
+        [
+            LedgerEntry(
+                kind="sale",
+                event_id=row["event_id"],
+                provider_id=row["event__provider_id"],
+                tickets=row["tickets"],
+                gross=row["gross"] or 0,
+                commission=row["commission"] or 0,
+                provider_amount=row["provider_amount"] or 0,
+            )
+            for row in rows.order_by("event_id")
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0018_salesbucket"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LedgerEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(choices=[("sale", "Sale"), ("payout", "Payout")], max_length=10)),
+                ("tickets", models.PositiveIntegerField(default=0)),
+                ("gross", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("commission", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("provider_amount", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("event", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="ledger_entries", to="core.event")),
+                ("provider", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="ledger_entries", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["provider", "id"], name="ledger_provider_id_idx")],
+            },
+        ),
+        migrations.CreateModel(
+            name="LedgerSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("last_entry_id", models.BigIntegerField()),
+                ("gross", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("commission", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("earnings", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("paid_out", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("provider", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="ledger_snapshots", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["provider", "-last_entry_id"], name="ledger_snapshot_latest_idx")],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0019_ledger"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(fields=["buyer", "updated_at", "id"], name="ticket_buyer_updated_idx"),
+        ),
+    ]
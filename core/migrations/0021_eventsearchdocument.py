@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0020_ticket_buyer_updated_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventSearchDocument",
+            fields=[
+                (
+                    "event",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="core.event",
+                    ),
+                ),
+                ("document", models.TextField(db_column="core_event_fts")),
+            ],
+            options={
+                "db_table": "core_event_fts",
+                "managed": False,
+            },
+        ),
+    ]
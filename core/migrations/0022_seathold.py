@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_eventsearchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatHold',
+            fields=[
+                ('id', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('quantity', models.PositiveIntegerField()),
+                ('expires_at', models.FloatField(db_index=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_holds', to='core.event')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_holds', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 21:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_seathold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingSale',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sold', models.PositiveIntegerField()),
+                ('gross', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('commission', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('provider_net', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_sales', to='core.event')),
+            ],
+        ),
+    ]
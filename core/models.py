@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
+from django.utils import timezone
 import uuid
 from decimal import Decimal
 
@@ -51,6 +52,16 @@ class Event(models.Model):
     total_tickets = models.IntegerField(default=0)  # For progress bar
     is_hot = models.BooleanField(default=False)
     image = models.ImageField(upload_to="event_images/", blank=True, null=True)
+    # With more than one shard, inventory lives in InventoryShard rows and
+    # tickets_available is a periodically reconciled rollup of them.
+    shard_count = models.PositiveSmallIntegerField(default=1)
+    # Tickets issued so far, bumped in the booking transaction so listings
+    # never need a COUNT over the tickets table. Like tickets_available it is
+    # a reconciled rollup for sharded events (see PendingSale).
+    tickets_sold = models.PositiveIntegerField(default=0)
+    # Bumped whenever a field printed on ticket PDFs changes, so cached
+    # PDFs keyed on it go stale.
+    details_updated_at = models.DateTimeField(default=timezone.now)
 
     provider = models.ForeignKey(
         User,
@@ -60,14 +71,107 @@ class Event(models.Model):
         blank=True
     )
 
+    DETAIL_FIELDS = ("title", "venue", "date", "description")
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the event list on (date, id).
+            models.Index(fields=["date", "id"], name="event_date_id_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_details = instance._current_details()
+        return instance
+
+    def _current_details(self):
+        return {name: self.__dict__[name] for name in self.DETAIL_FIELDS if name in self.__dict__}
+
+    def save(self, *args, **kwargs):
+        creating = self._state.adding
+        loaded = getattr(self, "_loaded_details", None)
+        details_changed = loaded and any(getattr(self, name) != value for name, value in loaded.items())
+        if details_changed:
+            self.details_updated_at = timezone.now()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "details_updated_at"}
+        super().save(*args, **kwargs)
+        self._loaded_details = self._current_details()
+        if details_changed:
+            # Tickets print these details, so delta syncs ordered on
+            # Ticket.updated_at must re-send them.
+            self.tickets.update(updated_at=self.details_updated_at)
+        if creating:
+            # Bookings then only ever UPDATE the rollup row.
+            EventSalesStats.objects.get_or_create(event=self)
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._loaded_details = self._current_details()
+
     def delete(self, *args, **kwargs):
         if self.image:
             self.image.delete(save=False)
         super().delete(*args, **kwargs)
 
+# ---------------------------
+# Inventory Shard Model
+# ---------------------------
+class InventoryShard(models.Model):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="shards")
+    index = models.PositiveSmallIntegerField()
+    tickets_available = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["event", "index"], name="unique_inventory_shard"),
+        ]
+
+    def __str__(self):
+        return f"Shard {self.index} - {self.event_id}"
+
+# ---------------------------
+# Seat Hold Model
+# ---------------------------
+class SeatHold(models.Model):
+    """A live seat hold in ``core.holds.DatabaseHoldBackend``, deleted when it
+    is confirmed, released or swept. ``expires_at`` is a unix timestamp, as in
+    the hold dicts the backends exchange."""
+
+    id = models.CharField(max_length=32, primary_key=True)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="seat_holds")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="seat_holds")
+    quantity = models.PositiveIntegerField()
+    expires_at = models.FloatField(db_index=True)
+
+    def __str__(self):
+        return f"Hold {self.id} - {self.event_id}"
+
+# ---------------------------
+# Event Search Document Model
+# ---------------------------
+class EventSearchDocument(models.Model):
+    """Row of the SQLite FTS5 index behind event search (core.services.search_service).
+
+    The virtual table is created by migration 0016 and kept in step by
+    triggers, so Django never manages it and nothing writes through this model.
+    """
+
+    event = models.OneToOneField(
+        Event, primary_key=True, db_column="rowid", on_delete=models.DO_NOTHING, related_name="search_document"
+    )
+    # FTS5's hidden column named after the table: the left side of MATCH and
+    # the first argument of bm25().
+    document = models.TextField(db_column="core_event_fts")
+
+    class Meta:
+        managed = False
+        db_table = "core_event_fts"
+
 # ---------------------------
 # Ticket Model
 # ---------------------------
@@ -90,6 +194,10 @@ class Ticket(models.Model):
     provider_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="unused")
+    # When and at which gate device the ticket was admitted. Offline scans
+    # carry the device's clock, and the earliest scan is the one that counts.
+    used_at = models.DateTimeField(null=True, blank=True)
+    used_by_device = models.CharField(max_length=64, blank=True, default="")
     payment_confirmed = models.BooleanField(default=False)  # Future payment integration
     qr_code = models.ImageField(upload_to="tickets_qr/", blank=True, null=True)
 
@@ -98,17 +206,148 @@ class Ticket(models.Model):
     
     is_active = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Entry manifest deltas: an event's tickets changed since a version.
+            models.Index(fields=["event", "updated_at"], name="ticket_event_updated_idx"),
+            # Compact "my tickets" pages and ?since= delta syncs of one buyer's tickets.
+            models.Index(fields=["buyer", "updated_at", "id"], name="ticket_buyer_updated_idx"),
+        ]
+
     def __str__(self):
         return f"Ticket {self.id} - {self.event.title}"
 
+    @staticmethod
+    def split_price(price):
+        """Return ``(commission_amount, provider_amount)`` for a ticket price."""
+        price = Decimal(str(price))
+        commission_rate = getattr(settings, "PLATFORM_COMMISSION_PERCENT", 10) / 100
+        commission_amount = price * Decimal(commission_rate)
+        return commission_amount, price - commission_amount
+
     def save(self, *args, **kwargs):
         # Auto-calculate commission & provider amount if not set
         if self.price and self.commission_amount == 0:
-            commission_rate = getattr(settings, "PLATFORM_COMMISSION_PERCENT", 10) / 100
-            self.commission_amount = self.price * Decimal(commission_rate)
-            self.provider_amount = self.price - self.commission_amount
+            self.commission_amount, self.provider_amount = self.split_price(self.price)
         super().save(*args, **kwargs)
 
+# ---------------------------
+# Event Sales Stats Model
+# ---------------------------
+class EventSalesStats(models.Model):
+    """Per-event sales rollup, bumped in the same transaction as bookings and
+    admissions so the provider dashboard never aggregates ticket rows.
+    Sales of sharded events arrive later, through ``PendingSale``.
+    ``rebuild_sales_stats`` recomputes it from the tickets table.
+
+    ``sold`` and the amounts cover tickets that are not cancelled."""
+
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name="sales_stats")
+    sold = models.PositiveIntegerField(default=0)
+    used = models.PositiveIntegerField(default=0)
+    cancelled = models.PositiveIntegerField(default=0)
+    gross = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    commission = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    provider_net = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Sales of {self.event_id}"
+
+
+class SalesBucket(models.Model):
+    """Tickets booked for one event during one UTC hour, bumped alongside
+    ``EventSalesStats`` so sales charts never scan ticket rows. Day totals
+    are summed from the hours at query time."""
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="sales_buckets")
+    hour = models.DateTimeField()
+    sold = models.PositiveIntegerField(default=0)
+    gross = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    provider_net = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["event", "hour"], name="unique_sales_bucket"),
+        ]
+
+    def __str__(self):
+        return f"Sales of {self.event_id} at {self.hour:%Y-%m-%d %H:00}"
+
+
+class PendingSale(models.Model):
+    """A booking of a sharded event not yet counted in ``Event.tickets_sold``,
+    ``EventSalesStats`` or its ``SalesBucket``. Bookings only insert these so
+    they never lock a row shared by the whole event; ``apply_pending_sales``
+    folds them in and deletes them."""
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="pending_sales")
+    sold = models.PositiveIntegerField()
+    gross = models.DecimalField(max_digits=14, decimal_places=2)
+    commission = models.DecimalField(max_digits=14, decimal_places=2)
+    provider_net = models.DecimalField(max_digits=14, decimal_places=2)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Pending sale {self.id} of {self.event_id}"
+
+
+class LedgerEntry(models.Model):
+    """Append-only finance ledger: one ``sale`` row per booking and one
+    ``payout`` row per provider settlement. Rows are never updated.
+
+    ``provider_amount`` is what the platform owes the provider, so payouts
+    carry it negated and a provider's balance is the sum of the column."""
+
+    KIND_CHOICES = (
+        ("sale", "Sale"),
+        ("payout", "Payout"),
+    )
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    provider = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="ledger_entries"
+    )
+    event = models.ForeignKey(Event, on_delete=models.SET_NULL, null=True, blank=True, related_name="ledger_entries")
+    tickets = models.PositiveIntegerField(default=0)
+    gross = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    commission = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    provider_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # A provider's entries after its latest snapshot.
+            models.Index(fields=["provider", "id"], name="ledger_provider_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.id}"
+
+
+class LedgerSnapshot(models.Model):
+    """Ledger totals through entry ``last_entry_id`` for one provider or, when
+    ``provider`` is empty, the whole platform. Balances are the latest
+    snapshot plus the entries after it."""
+
+    provider = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True, related_name="ledger_snapshots"
+    )
+    last_entry_id = models.BigIntegerField()
+    gross = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    commission = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    earnings = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    paid_out = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["provider", "-last_entry_id"], name="ledger_snapshot_latest_idx"),
+        ]
+
+    def __str__(self):
+        return f"Ledger snapshot through {self.last_entry_id}"
+
 # ---------------------------
 # Transaction Model (Optional for MVP)
 # ---------------------------
@@ -0,0 +1,153 @@
+"""Keyset (cursor) pagination for the event listing.
+
+Pages are ordered by ``(date DESC NULLS FIRST, id DESC)`` and the cursor
+carries the last row's ``(date, id)``, so fetching the next page is an
+index range scan on ``event_date_id_idx`` however deep the client has
+scrolled, and rows inserted meanwhile never shift or repeat a page.
+Undated (TBA) events sort first, as they already did on PostgreSQL.
+
+Search results (querysets annotated with ``search_rank``) are ordered by
+``(search_rank DESC, id DESC)`` instead and the cursor carries the rank.
+
+Compact ticket lists page oldest change first on ``(updated_at, id)``, a
+range on ``ticket_buyer_updated_idx``, so the last page ends at the newest
+change a delta sync has to resume from. Editing an event's printed details
+touches its tickets' ``updated_at``, so edited events reach clients that
+cache them.
+"""
+import base64
+import json
+import math
+from datetime import datetime
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .services.search_service import SEARCH_RANK
+
+EVENT_ORDERING = (F("date").desc(nulls_first=True), F("id").desc())
+SEARCH_ORDERING = (F(SEARCH_RANK).desc(), F("id").desc())
+TICKET_SYNC_ORDERING = ("updated_at", "id")
+
+
+class InvalidCursor(NotFound):
+    default_detail = "Invalid cursor."
+    default_code = "invalid_cursor"
+
+
+def encode_cursor(position, pk):
+    if isinstance(position, datetime):
+        position = position.isoformat()
+    raw = json.dumps([position, pk], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, ranked=False):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position, pk = json.loads(raw)
+        if not isinstance(pk, int):
+            raise ValueError
+        if ranked:
+            if not math.isfinite(position):
+                raise ValueError
+            return float(position), pk
+        parsed = parse_datetime(position) if position is not None else None
+        if position is not None and parsed is None:
+            raise ValueError
+    except (TypeError, ValueError):
+        raise InvalidCursor()
+    return parsed, pk
+
+
+def after_cursor(date, pk):
+    """Rows that follow ``(date, pk)`` in EVENT_ORDERING."""
+    if date is None:
+        return Q(date__isnull=True, id__lt=pk) | Q(date__isnull=False)
+    # date <= d first keeps the whole predicate a range on the index.
+    return Q(date__lte=date) & (Q(date__lt=date) | Q(id__lt=pk))
+
+
+def after_rank(rank, pk):
+    """Rows that follow ``(rank, pk)`` in SEARCH_ORDERING."""
+    return Q(**{f"{SEARCH_RANK}__lt": rank}) | Q(**{SEARCH_RANK: rank, "id__lt": pk})
+
+
+def after_change(updated_at, pk):
+    """Rows that follow ``(updated_at, pk)`` in TICKET_SYNC_ORDERING."""
+    return Q(updated_at__gte=updated_at) & (Q(updated_at__gt=updated_at) | Q(id__gt=pk))
+
+
+class EventCursorPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 20
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        ranked = SEARCH_RANK in queryset.query.annotations
+        queryset = queryset.order_by(*(SEARCH_ORDERING if ranked else EVENT_ORDERING))
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            after = after_rank if ranked else after_cursor
+            queryset = queryset.filter(after(*decode_cursor(cursor, ranked)))
+
+        rows = list(queryset[: page_size + 1])
+        page = rows[:page_size]
+        self.next_cursor = None
+        if len(rows) > page_size:
+            last = page[-1]
+            self.next_cursor = encode_cursor(getattr(last, SEARCH_RANK) if ranked else last.date, last.pk)
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class TicketSyncPagination(EventCursorPagination):
+    page_size = 50
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*TICKET_SYNC_ORDERING)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            updated_at, pk = decode_cursor(cursor)
+            if updated_at is None:
+                raise InvalidCursor()
+            queryset = queryset.filter(after_change(updated_at, pk))
+
+        rows = list(queryset[: page_size + 1])
+        page = rows[:page_size]
+        self.next_cursor = encode_cursor(page[-1].updated_at, page[-1].pk) if len(rows) > page_size else None
+        return page
@@ -0,0 +1,229 @@
+"""Bulk ticket export streamed while it is generated.
+
+``stream_tickets_pdf`` writes one multi-page PDF. reportlab has no public
+API for writing a document page by page: a canvas keeps every page in
+memory until ``save()``, which for a box-office run of thousands of tickets
+is the whole document. So each page is drawn on a throwaway canvas with the
+regular ticket layout, its content stream is read from the canvas's private
+``_preamble``/``_code`` lists, and a minimal PDF writer emits it. Only
+object offsets are kept until the end.
+
+Those internals are why requirements.txt pins reportlab to an exact
+version, and the tests check that the pinned version has them. Should a
+different reportlab lack them anyway, a warning is logged and the document
+is built on one regular canvas instead. ``stream_tickets_zip`` packs one
+PDF per ticket, reusing cached single-ticket PDFs where available.
+"""
+import logging
+import zlib
+from functools import lru_cache
+from io import BytesIO
+from zipfile import ZIP_STORED, ZipFile
+
+from PIL import Image
+from reportlab.pdfgen import canvas
+
+from .pdf_rendering import get_cached_ticket_pdf
+from .qr import render_qr, ticket_qr_payload
+from .utils import (
+    PAGE_HEIGHT,
+    PAGE_WIDTH,
+    QR_SIZE,
+    QR_X,
+    QR_Y,
+    draw_ticket_page,
+    generate_ticket_pdf,
+    ticket_confirmation_id,
+    ticket_pdf_filename,
+)
+
+logger = logging.getLogger(__name__)
+
+CATALOG_ID, PAGES_ID = 1, 2
+PAGE_FONTS = ("Helvetica", "Helvetica-Bold")
+
+
+def _pdf_string(text):
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return f"({escaped})"
+
+
+class StreamingPdfWriter:
+    """Emit a PDF as byte chunks, one page at a time."""
+
+    def __init__(self):
+        self._offsets = {}
+        self._position = 0
+        self._next_id = PAGES_ID + 1
+        self._page_ids = []
+        self._font_refs = ""
+
+    def _allocate(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _emit(self, data):
+        self._position += len(data)
+        return data
+
+    def _object(self, obj_id, body, stream=None):
+        self._offsets[obj_id] = self._position
+        chunk = f"{obj_id} 0 obj\n{body}\n".encode("latin-1")
+        if stream is not None:
+            chunk += b"stream\n" + stream + b"\nendstream\n"
+        return self._emit(chunk + b"endobj\n")
+
+    def header(self):
+        chunks = [self._emit(b"%PDF-1.4\n%\x93\x8c\x8b\x9e\n")]
+        refs = []
+        # Fonts are numbered in the order _register_page_fonts registers them.
+        for index, font_name in enumerate(PAGE_FONTS, start=1):
+            font_id = self._allocate()
+            refs.append(f"/F{index} {font_id} 0 R")
+            chunks.append(
+                self._object(
+                    font_id,
+                    f"<< /Type /Font /Subtype /Type1 /BaseFont /{font_name} /Encoding /WinAnsiEncoding >>",
+                )
+            )
+        self._font_refs = " ".join(refs)
+        return b"".join(chunks)
+
+    def page(self, content, image):
+        width, height = image.size
+        image_id, content_id, page_id = self._allocate(), self._allocate(), self._allocate()
+        self._page_ids.append(page_id)
+        pixels = zlib.compress(image.tobytes())
+        content = zlib.compress(content.encode("latin-1"))
+        return b"".join(
+            [
+                self._object(
+                    image_id,
+                    f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                    f"/ColorSpace /DeviceGray /BitsPerComponent 1 /Filter /FlateDecode /Length {len(pixels)} >>",
+                    pixels,
+                ),
+                self._object(content_id, f"<< /Filter /FlateDecode /Length {len(content)} >>", content),
+                self._object(
+                    page_id,
+                    f"<< /Type /Page /Parent {PAGES_ID} 0 R /MediaBox [0 0 {PAGE_WIDTH:.4f} {PAGE_HEIGHT:.4f}] "
+                    f"/Resources << /Font << {self._font_refs} >> /XObject << /QR {image_id} 0 R >> >> "
+                    f"/Contents {content_id} 0 R >>",
+                ),
+            ]
+        )
+
+    def trailer(self, title):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        info_id = self._allocate()
+        chunks = [
+            self._object(PAGES_ID, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>"),
+            self._object(CATALOG_ID, f"<< /Type /Catalog /Pages {PAGES_ID} 0 R >>"),
+            self._object(info_id, f"<< /Title {_pdf_string(title)} /Producer (TicketFlow) >>"),
+        ]
+        xref_offset = self._position
+        xref = [f"xref\n0 {self._next_id}\n", "0000000000 65535 f \n"]
+        xref.extend(f"{self._offsets[obj_id]:010d} 00000 n \n" for obj_id in range(1, self._next_id))
+        xref.append(
+            f"trailer\n<< /Size {self._next_id} /Root {CATALOG_ID} 0 R /Info {info_id} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n"
+        )
+        chunks.append(self._emit("".join(xref).encode("latin-1")))
+        return b"".join(chunks)
+
+
+def _place_qr(pdf, ticket):
+    pdf.addLiteral(f"q {QR_SIZE} 0 0 {QR_SIZE} {QR_X:.4f} {QR_Y:.4f} cm /QR Do Q")
+
+
+def _register_page_fonts(pdf):
+    # Operators refer to fonts by their per-document resource names, so
+    # every page canvas must register them in the order the writer declares.
+    for font_name in PAGE_FONTS:
+        pdf.setFont(font_name, 10)
+
+
+def replays_operators(pdf):
+    """Whether ``pdf`` has the private reportlab internals that copying raw
+    operators relies on: the ``_preamble``/``_code`` operator lists and fonts
+    named /F1, /F2, ... in registration order. Call after registering fonts.
+    """
+    font_name = getattr(getattr(pdf, "_doc", None), "getInternalFontName", None)
+    return (
+        isinstance(getattr(pdf, "_preamble", None), str)
+        and isinstance(getattr(pdf, "_code", None), list)
+        and callable(getattr(pdf, "addLiteral", None))
+        and callable(font_name)
+        and all(font_name(name) == f"/F{index}" for index, name in enumerate(PAGE_FONTS, start=1))
+    )
+
+
+def _ticket_page_operators(ticket):
+    page = canvas.Canvas(BytesIO(), pagesize=(PAGE_WIDTH, PAGE_HEIGHT))
+    _register_page_fonts(page)
+    draw_ticket_page(page, ticket, ticket_confirmation_id(ticket), use_static_layer=False, draw_qr=_place_qr)
+    return "\n".join([page._preamble, *page._code]) + " "
+
+
+@lru_cache(maxsize=None)
+def _streams_pages():
+    page = canvas.Canvas(BytesIO(), pagesize=(PAGE_WIDTH, PAGE_HEIGHT))
+    _register_page_fonts(page)
+    if replays_operators(page):
+        return True
+    logger.warning("reportlab lacks the canvas internals page streaming reads; building bulk PDFs in memory")
+    return False
+
+
+def _canvas_tickets_pdf(tickets, title):
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=(PAGE_WIDTH, PAGE_HEIGHT))
+    pdf.setTitle(title)
+    for ticket in tickets:
+        draw_ticket_page(pdf, ticket, ticket_confirmation_id(ticket))
+        pdf.showPage()
+    pdf.save()
+    yield buffer.getvalue()
+
+
+def stream_tickets_pdf(tickets, title="TicketFlow tickets"):
+    if not _streams_pages():
+        yield from _canvas_tickets_pdf(tickets, title)
+        return
+
+    writer = StreamingPdfWriter()
+    yield writer.header()
+    for ticket in tickets:
+        image = Image.open(BytesIO(render_qr(ticket_qr_payload(ticket), "png"))).convert("1")
+        yield writer.page(_ticket_page_operators(ticket), image)
+    yield writer.trailer(title)
+
+
+class _ChunkBuffer:
+    """Write-only, unseekable sink that ZipFile drains into a generator."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_tickets_zip(tickets):
+    sink = _ChunkBuffer()
+    with ZipFile(sink, "w", compression=ZIP_STORED) as archive:
+        for ticket in tickets:
+            pdf = get_cached_ticket_pdf(ticket) or generate_ticket_pdf(ticket).getvalue()
+            archive.writestr(ticket_pdf_filename(ticket), pdf)
+            yield sink.drain()
+    yield sink.drain()
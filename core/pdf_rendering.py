@@ -0,0 +1,227 @@
+"""Ticket PDF rendering off the request thread.
+
+PDFs are built in a bounded process pool so a burst of downloads cannot
+monopolise the web workers' CPU. At most ``PDF_RENDER_MAX_PENDING`` renders
+may be queued or running per web process; beyond that, and when a render
+does not finish within ``PDF_RENDER_TIMEOUT`` seconds, callers get
+``PdfRenderUnavailable`` and should answer 503 with ``Retry-After``.
+``PDF_RENDER_WORKERS = 0`` renders inline in the calling thread. A pool
+whose worker died is replaced: submits retry once on a fresh pool, and
+renders lost with the worker answer 503 like a timeout.
+
+Rendered PDFs are kept in the ``PDF_CACHE_ALIAS`` cache under a key that
+includes the ticket's ``updated_at`` and the event's ``details_updated_at``,
+so editing anything printed on the ticket makes the old entry unreachable
+and the cache's own eviction reclaims it.
+"""
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Event, Ticket
+from .utils import generate_ticket_pdf
+
+logger = logging.getLogger(__name__)
+_executor_lock = threading.Lock()
+
+
+class PdfRenderUnavailable(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class RenderMetrics:
+    """Per-process counters and timing totals for PDF renders."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {"rendered": 0, "cache_hits": 0, "rejected": 0, "timed_out": 0, "failed": 0}
+            self.timings = {
+                "queue_wait": {"count": 0, "total": 0.0, "max": 0.0},
+                "render": {"count": 0, "total": 0.0, "max": 0.0},
+            }
+
+    def incr(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def observe(self, name, seconds):
+        with self._lock:
+            timing = self.timings[name]
+            timing["count"] += 1
+            timing["total"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+
+    def snapshot(self):
+        with self._lock:
+            timings = {
+                name: {
+                    "count": timing["count"],
+                    "avg_ms": round(timing["total"] / timing["count"] * 1000, 2) if timing["count"] else 0.0,
+                    "max_ms": round(timing["max"] * 1000, 2),
+                }
+                for name, timing in self.timings.items()
+            }
+            return {**self.counts, **timings}
+
+
+metrics = RenderMetrics()
+
+
+def _workers():
+    return getattr(settings, "PDF_RENDER_WORKERS", 2)
+
+
+def _max_pending():
+    return getattr(settings, "PDF_RENDER_MAX_PENDING", 8)
+
+
+def _retry_after():
+    return getattr(settings, "PDF_RENDER_RETRY_AFTER", 5)
+
+
+@lru_cache(maxsize=None)
+def _slots():
+    return threading.BoundedSemaphore(_max_pending())
+
+
+@lru_cache(maxsize=None)
+def _executor():
+    return ProcessPoolExecutor(max_workers=_workers(), initializer=django.setup)
+
+
+def _discard_executor(executor):
+    """Drop a broken pool so the next ``_executor()`` call starts a fresh one."""
+    with _executor_lock:
+        if _executor() is executor:
+            _executor.cache_clear()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(ticket):
+    executor = _executor()
+    try:
+        return executor, executor.submit(_render, ticket)
+    except BrokenProcessPool:
+        logger.warning("pdf render pool broken, starting a new one")
+        _discard_executor(executor)
+        executor = _executor()
+        return executor, executor.submit(_render, ticket)
+
+
+def _detached_ticket(ticket):
+    """Copy the fields the PDF uses so the pool pickles no more than needed."""
+    event = Event(
+        id=ticket.event_id,
+        title=ticket.event.title,
+        venue=ticket.event.venue,
+        date=ticket.event.date,
+        description=ticket.event.description,
+    )
+    return Ticket(id=ticket.id, event=event, created_at=ticket.created_at)
+
+
+def _render(ticket):
+    started = time.time()
+    pdf = generate_ticket_pdf(ticket).getvalue()
+    return pdf, started, time.time() - started
+
+
+def render_ticket_pdf(ticket):
+    """Return ``(pdf_bytes, timings)`` with queue wait and render time in seconds."""
+    submitted = time.time()
+    if _workers() <= 0:
+        pdf, started, render_time = _render(ticket)
+    else:
+        slots = _slots()
+        if not slots.acquire(blocking=False):
+            metrics.incr("rejected")
+            raise PdfRenderUnavailable("PDF rendering is saturated", _retry_after())
+        try:
+            executor, future = _submit(_detached_ticket(ticket))
+        except Exception:
+            slots.release()
+            raise
+        # A timed-out render keeps its slot until the worker actually finishes.
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            pdf, started, render_time = future.result(timeout=getattr(settings, "PDF_RENDER_TIMEOUT", 10))
+        except FutureTimeout:
+            future.cancel()
+            metrics.incr("timed_out")
+            raise PdfRenderUnavailable("PDF rendering timed out", _retry_after())
+        except BrokenProcessPool:
+            logger.warning("pdf render worker died rendering ticket %s", ticket.id)
+            _discard_executor(executor)
+            metrics.incr("failed")
+            raise PdfRenderUnavailable("PDF rendering was interrupted", _retry_after())
+        except Exception:
+            metrics.incr("failed")
+            raise
+
+    timings = {"queue_wait": max(started - submitted, 0.0), "render": render_time}
+    for name, seconds in timings.items():
+        metrics.observe(name, seconds)
+    metrics.incr("rendered")
+    logger.info(
+        "ticket pdf %s rendered: queue_wait=%.1fms render=%.1fms",
+        ticket.id,
+        timings["queue_wait"] * 1000,
+        timings["render"] * 1000,
+    )
+    return pdf, timings
+
+
+def ticket_pdf_version(ticket):
+    # The QR key id is part of the version so rotating keys re-renders PDFs.
+    return (
+        f"{ticket.id}:{ticket.updated_at.timestamp()}:{ticket.event.details_updated_at.timestamp()}"
+        f":{settings.QR_SIGNING_KEY_ID}"
+    )
+
+
+def ticket_pdf_etag(ticket):
+    digest = hashlib.sha256(f"ticket-pdf:{ticket_pdf_version(ticket)}".encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def ticket_pdf_last_modified(ticket):
+    return max(ticket.updated_at, ticket.event.details_updated_at)
+
+
+def _pdf_cache():
+    return caches[getattr(settings, "PDF_CACHE_ALIAS", "default")]
+
+
+def get_cached_ticket_pdf(ticket):
+    pdf = _pdf_cache().get(f"ticket-pdf:{ticket_pdf_version(ticket)}")
+    if pdf is not None:
+        metrics.incr("cache_hits")
+    return pdf
+
+
+def cached_ticket_pdf(ticket):
+    """Like ``render_ticket_pdf`` but served from the PDF cache when possible.
+
+    ``timings`` is ``None`` for cache hits.
+    """
+    pdf = get_cached_ticket_pdf(ticket)
+    if pdf is not None:
+        return pdf, None
+    pdf, timings = render_ticket_pdf(ticket)
+    _pdf_cache().set(f"ticket-pdf:{ticket_pdf_version(ticket)}", pdf, timeout=None)
+    return pdf, timings
@@ -1,7 +1,19 @@
-from rest_framework import serializers
+from datetime import timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from .models import Event, Invitation, Ticket, User
+from .report_export import COLUMNS
+from .services.sales_service import sold_tickets
+
+MAX_INVENTORY_SHARDS = 64
+MAX_SCANS_PER_BATCH = 1000
+MAX_TIMESERIES_HOURS = 24 * 366
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -36,13 +48,84 @@ class EventSerializer(serializers.ModelSerializer):
             "image",
             "provider",
             "sold_tickets",
+            "shard_count",
         ]
         read_only_fields = ["provider", "sold_tickets"]
 
     def get_sold_tickets(self, obj):
         if obj.total_tickets:
             return max(obj.total_tickets - obj.tickets_available, 0)
-        return obj.tickets.count()
+        return obj.tickets_sold
+
+
+class EventFilterSerializer(serializers.Serializer):
+    """Query parameters of the event list: full-text ``q`` plus date and price ranges."""
+
+    q = serializers.CharField(required=False, allow_blank=True, max_length=200)
+    date_from = serializers.DateTimeField(required=False, input_formats=[ISO_8601, "%Y-%m-%d"])
+    date_before = serializers.DateTimeField(required=False, input_formats=[ISO_8601, "%Y-%m-%d"])
+    price_min = serializers.DecimalField(required=False, max_digits=8, decimal_places=2, min_value=0)
+    price_max = serializers.DecimalField(required=False, max_digits=8, decimal_places=2, min_value=0)
+
+
+class SalesTimeseriesSerializer(serializers.Serializer):
+    """Query parameters of the provider sales timeseries. Dates without an
+    offset are read in ``tz``; the range defaults to the last 30 days."""
+
+    event = serializers.IntegerField(required=False, min_value=1)
+    interval = serializers.ChoiceField(choices=["hour", "day"], default="day")
+    tz = serializers.CharField(required=False, max_length=64)
+    date_from = serializers.DateTimeField(required=False, input_formats=[ISO_8601, "%Y-%m-%d"])
+    date_before = serializers.DateTimeField(required=False, input_formats=[ISO_8601, "%Y-%m-%d"])
+
+    def validate_tz(self, value):
+        try:
+            return ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise serializers.ValidationError("Unknown time zone.")
+
+    def to_internal_value(self, data):
+        tz = timezone.get_default_timezone()
+        if data.get("tz"):
+            try:
+                tz = self.validate_tz(data["tz"])
+            except serializers.ValidationError as exc:
+                raise serializers.ValidationError({"tz": exc.detail})
+        with timezone.override(tz):
+            attrs = super().to_internal_value(data)
+        attrs["tz"] = tz
+        return attrs
+
+    def validate(self, attrs):
+        attrs.setdefault("date_before", timezone.now())
+        attrs.setdefault("date_from", attrs["date_before"] - timedelta(days=30))
+        span = attrs["date_before"] - attrs["date_from"]
+        if span <= timedelta(0):
+            raise serializers.ValidationError({"date_before": "Must be after date_from."})
+        if span > timedelta(hours=MAX_TIMESERIES_HOURS):
+            raise serializers.ValidationError({"date_from": "Ranges are limited to 366 days."})
+        return attrs
+
+
+class EventReportSerializer(serializers.Serializer):
+    """Query parameters of an event report: ``columns`` (comma-separated,
+    default: the report's own) and a booking date range."""
+
+    columns = serializers.CharField(required=False, max_length=500)
+    status = serializers.ChoiceField(choices=Ticket.STATUS_CHOICES, required=False)
+    date_from = serializers.DateTimeField(required=False, input_formats=[ISO_8601, "%Y-%m-%d"])
+    date_before = serializers.DateTimeField(required=False, input_formats=[ISO_8601, "%Y-%m-%d"])
+
+    def validate_columns(self, value):
+        columns = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+        unknown = [name for name in columns if name not in COLUMNS]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown columns: {', '.join(unknown)}. Choose from {', '.join(COLUMNS)}."
+            )
+        if not columns:
+            raise serializers.ValidationError("Select at least one column.")
+        return columns
 
 
 class EventCreateUpdateSerializer(EventSerializer):
@@ -57,23 +140,50 @@ class EventCreateUpdateSerializer(EventSerializer):
         if total_tickets is not None and total_tickets < 0:
             raise serializers.ValidationError({"total_tickets": "Total tickets must be 0 or greater."})
 
-        if tickets_available is None:
+        if self.instance is not None:
+            # Once seats can have been sold, live stock only follows total_tickets
+            # as a delta (update_inventory), so a stale edit form cannot hand sold
+            # seats back.
+            attrs.pop("tickets_available", None)
+            tickets_available = None
+            sold = sold_tickets(self.instance)
+            if total_tickets < sold:
+                raise serializers.ValidationError(
+                    {"total_tickets": f"Total tickets cannot be below the {sold} already sold."}
+                )
+        elif tickets_available is None:
             attrs["tickets_available"] = total_tickets
-        elif tickets_available < 0:
+
+        if tickets_available is not None and tickets_available < 0:
             raise serializers.ValidationError({"tickets_available": "Available tickets must be 0 or greater."})
 
-        if attrs["tickets_available"] > total_tickets:
+        shard_count = attrs.get("shard_count")
+        if shard_count is not None and not 1 <= shard_count <= MAX_INVENTORY_SHARDS:
+            raise serializers.ValidationError(
+                {"shard_count": f"Shard count must be between 1 and {MAX_INVENTORY_SHARDS}."}
+            )
+
+        if attrs.get("tickets_available", 0) > total_tickets:
             raise serializers.ValidationError(
                 {"tickets_available": "Available tickets cannot exceed total tickets."}
             )
 
         return attrs
 
+    def create(self, validated_data):
+        validated_data.pop("clear_image", None)
+        return super().create(validated_data)
+
     def update(self, instance, validated_data):
         clear_image = validated_data.pop("clear_image", False)
         if clear_image and "image" not in validated_data:
-            instance.image = None
-        return super().update(instance, validated_data)
+            validated_data["image"] = None
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+        # Only write the edited columns: stock and tickets_sold are bumped
+        # concurrently by bookings and must not be overwritten with stale values.
+        instance.save(update_fields=validated_data)
+        return instance
 
     class Meta(EventSerializer.Meta):
         fields = EventSerializer.Meta.fields + ["clear_image"]
@@ -89,6 +199,8 @@ class LoginSerializer(TokenObtainPairSerializer):
 
 class TicketSerializer(serializers.ModelSerializer):
     event = EventSerializer(read_only=True)
+    qr_code = serializers.SerializerMethodField()
+    qr_status = serializers.SerializerMethodField()
 
     class Meta:
         model = Ticket
@@ -97,6 +209,7 @@ class TicketSerializer(serializers.ModelSerializer):
             "event",
             "buyer",
             "qr_code",
+            "qr_status",
             "status",
             "payment_confirmed",
             "is_active",
@@ -117,6 +230,61 @@ class TicketSerializer(serializers.ModelSerializer):
             "provider_amount",
         ]
 
+    def get_qr_code(self, obj):
+        url = reverse("ticket-qr", kwargs={"ticket_id": obj.id, "image_format": "svg"})
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+    def get_qr_status(self, obj):
+        # QR images are rendered on demand unless PNG files are still being persisted.
+        if not getattr(settings, "QR_PERSIST_FILES", False):
+            return "ready"
+        return "ready" if obj.qr_code else "pending"
+
+
+class CompactTicketSerializer(TicketSerializer):
+    """A ticket pointing at its event by id, for lists that send each event once."""
+
+    class Meta(TicketSerializer.Meta):
+        fields = [
+            "id",
+            "event_id",
+            "qr_code",
+            "qr_status",
+            "status",
+            "payment_confirmed",
+            "is_active",
+            "price",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = fields
+
+
+class TicketListSerializer(serializers.Serializer):
+    """Query parameters of "my tickets": ``compact`` responses and ``since`` delta syncs."""
+
+    compact = serializers.BooleanField(required=False, default=False)
+    since = serializers.DateTimeField(required=False)
+
+
+class ScanSerializer(serializers.Serializer):
+    ticket_id = serializers.IntegerField()
+    scanned_at = serializers.DateTimeField()
+    # The signed QR code that was scanned; typed ticket ids have none.
+    code = serializers.CharField(required=False, max_length=128)
+
+    def validate_scanned_at(self, value):
+        # A device clock running ahead must not let its scans lose every tie.
+        return min(value, timezone.now())
+
+
+class VerifyBatchSerializer(serializers.Serializer):
+    device_id = serializers.CharField(max_length=64)
+    # The gate's event; scanned codes issued for another event are rejected.
+    event_id = serializers.IntegerField(required=False)
+    scans = ScanSerializer(many=True, allow_empty=False, max_length=MAX_SCANS_PER_BATCH)
+
 
 class InvitationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -1,19 +1,9 @@
-from django.db.models import Sum
-from core.models import Ticket
+from core.services.ledger_service import platform_totals, provider_balance
 
 
 def total_platform_commission():
-    return (
-        Ticket.objects.aggregate(
-            total=Sum("commission_amount")
-        )["total"]
-        or 0
-    )
+    return platform_totals()["commission"]
 
 
 def provider_earnings(provider):
-    return (
-        Ticket.objects.filter(event__provider=provider)
-        .aggregate(total=Sum("provider_amount"))["total"]
-        or 0
-    )
+    return provider_balance(provider)["earnings"]
@@ -0,0 +1,94 @@
+"""Shared cache of anonymous event list/detail responses.
+
+Entries are keyed on the request URL and a generation number, so
+invalidating everything is one write: event edits and every change to
+seat availability bump the generation and the old entries age out.
+
+During on-sales availability changes on every booking and would keep the
+cache permanently cold. Setting ``EVENT_RESPONSE_STALE_SECONDS`` trades
+freshness for hit rate: bookings stop invalidating and entries live at
+most that many seconds, so listed availability lags by up to that much.
+Event edits still invalidate immediately. The booking itself is always
+checked against the database.
+
+Every worker has to see the same generation, so the cache is the shared
+alias (``EVENT_RESPONSE_CACHE_ALIAS``, default ``SHARED_CACHE_ALIAS``).
+If that alias is a per-process ``LocMemCache`` responses are not cached at
+all, since one worker's invalidation would never reach the others.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from rest_framework.response import Response
+
+GENERATION_KEY = "event_responses:generation"
+
+
+def _cache():
+    """The shared response cache, or ``None`` when it would be per-process."""
+    cache = caches[getattr(settings, "EVENT_RESPONSE_CACHE_ALIAS", settings.SHARED_CACHE_ALIAS)]
+    return None if isinstance(cache, LocMemCache) else cache
+
+
+def _stale_seconds():
+    return getattr(settings, "EVENT_RESPONSE_STALE_SECONDS", 0)
+
+
+def _timeout():
+    timeout = getattr(settings, "EVENT_RESPONSE_CACHE_SECONDS", 300)
+    return min(timeout, _stale_seconds()) if _stale_seconds() else timeout
+
+
+def _generation(cache):
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Never restart from a fixed value: entries of an evicted generation may still be cached.
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def response_cache_key(request, generation):
+    # Pagination links are absolute, so scheme and host are part of the key.
+    params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    url = f"{request.scheme}://{request.get_host()}{request.path}?{params}"
+    digest = hashlib.sha256(url.encode()).hexdigest()
+    return f"event_responses:{generation}:{digest}"
+
+
+def cached_event_response(request, render):
+    """Serve ``render()``'s response, reusing a cached copy for anonymous requests.
+
+    ``render`` returns a DRF Response; only 200s are stored. Setting
+    ``EVENT_RESPONSE_CACHE_SECONDS`` to 0 turns caching off.
+    """
+    cache = _cache()
+    if cache is None or not _timeout() or request.user.is_authenticated:
+        return render()
+
+    key = response_cache_key(request, _generation(cache))
+    data = cache.get(key)
+    if data is not None:
+        return Response(data)
+
+    response = render()
+    if response.status_code == 200:
+        cache.set(key, response.data, timeout=_timeout())
+    return response
+
+
+def invalidate_event_responses(*, availability_only=False):
+    """Drop every cached event response once the current transaction commits.
+
+    ``availability_only`` changes are tolerated as stale when
+    ``EVENT_RESPONSE_STALE_SECONDS`` is set.
+    """
+    cache = _cache()
+    if cache is None or (availability_only and _stale_seconds()):
+        return
+    transaction.on_commit(lambda: cache.set(GENERATION_KEY, time.time_ns(), timeout=None))
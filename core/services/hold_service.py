@@ -0,0 +1,93 @@
+"""Seat holds ahead of payment.
+
+Holding claims seats with ``claim_inventory`` exactly like a booking, so it
+takes the same row lock: the ``core_event`` row, or one random
+``InventoryShard`` row for sharded events. The hold store only records
+which seats are held and until when. Confirming a hold inserts tickets
+without touching inventory again, and releasing or sweeping holds gives
+their seats back in one UPDATE per event. Claiming on the inventory rows
+keeps held and booked seats from ever adding up to more than an event has.
+"""
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+
+from core.holds import get_hold_backend
+from core.models import Event
+from core.services.ticket_service import claim_inventory, insert_tickets, restore_inventory
+
+
+class HoldNotFound(Exception):
+    pass
+
+
+def hold_duration_seconds():
+    return getattr(settings, "TICKET_HOLD_MINUTES", 10) * 60
+
+
+def create_hold(*, event, user, quantity=1):
+    backend = get_hold_backend()
+    if not backend.shared:
+        # No sweeper process can reach a per-process store; return expired seats here.
+        release_expired_holds()
+
+    claim_inventory(event, quantity)
+    hold = {
+        "id": uuid.uuid4().hex,
+        "event_id": event.pk,
+        "user_id": user.pk,
+        "quantity": quantity,
+        "expires_at": time.time() + hold_duration_seconds(),
+    }
+    try:
+        backend.add(hold)
+    except Exception:
+        restore_inventory({event.pk: quantity})
+        raise
+    return hold
+
+
+def get_hold(*, hold_id, user):
+    hold = get_hold_backend().get(hold_id)
+    if hold is None or hold["user_id"] != user.pk:
+        raise HoldNotFound("Hold not found or expired")
+    return hold
+
+
+def confirm_hold(*, hold_id, user):
+    """Turn a live hold into paid tickets. The seats were claimed when the hold was made."""
+    get_hold(hold_id=hold_id, user=user)
+    hold = get_hold_backend().pop(hold_id)
+    if hold is None:
+        raise HoldNotFound("Hold not found or expired")
+
+    try:
+        with transaction.atomic():
+            event = Event.objects.get(pk=hold["event_id"])
+            tickets = insert_tickets(event=event, user=user, quantity=hold["quantity"])
+    except Exception:
+        restore_inventory({hold["event_id"]: hold["quantity"]})
+        raise
+    return tickets
+
+
+def release_hold(*, hold_id, user):
+    get_hold(hold_id=hold_id, user=user)
+    hold = get_hold_backend().pop(hold_id)
+    if hold is None:
+        raise HoldNotFound("Hold not found or expired")
+    restore_inventory({hold["event_id"]: hold["quantity"]})
+    return hold
+
+
+def release_expired_holds(now=None):
+    """Return the seats of every expired hold to their events with a single UPDATE."""
+    expired = get_hold_backend().pop_expired(now)
+    quantities = Counter()
+    for hold in expired:
+        quantities[hold["event_id"]] += hold["quantity"]
+    restore_inventory(dict(quantities))
+    return len(expired)
@@ -0,0 +1,176 @@
+"""Platform finance ledger: append-only ``LedgerEntry`` rows, periodic
+``LedgerSnapshot`` totals and batched provider payouts.
+
+Bookings append a ``sale`` entry in their own transaction. Balances are
+the latest snapshot plus the entries after it, so they never scan tickets
+and only read entries since the last ``take_ledger_snapshot`` run.
+
+Entry ids are handed out before their transaction commits, so a snapshot
+only covers entries older than ``LEDGER_SNAPSHOT_LAG_SECONDS``. A booking
+still open after that long would land behind a snapshot and be missed.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+from core.models import LedgerEntry, LedgerSnapshot, User
+from core.services.sales_service import CENTS
+
+TOTAL_FIELDS = ("gross", "commission", "earnings", "paid_out")
+
+
+def _empty():
+    return dict.fromkeys(TOTAL_FIELDS, Decimal("0.00"))
+
+
+def _entry_sums():
+    return {
+        "gross": Sum("gross"),
+        "commission": Sum("commission"),
+        "earnings": Sum("provider_amount", filter=Q(kind="sale")),
+        "payouts": Sum("provider_amount", filter=Q(kind="payout")),
+    }
+
+
+def _add_entries(totals, row):
+    totals["gross"] += row["gross"] or 0
+    totals["commission"] += row["commission"] or 0
+    totals["earnings"] += row["earnings"] or 0
+    totals["paid_out"] -= row["payouts"] or 0
+
+
+def _with_balance(totals):
+    return {**totals, "balance": totals["earnings"] - totals["paid_out"]}
+
+
+def record_booking(*, event, quantity, price, commission_amount, provider_amount):
+    """Append the ``sale`` entry for a booking. Call inside the booking transaction."""
+    return LedgerEntry.objects.create(
+        kind="sale",
+        provider_id=event.provider_id,
+        event=event,
+        tickets=quantity,
+        gross=Decimal(price).quantize(CENTS) * quantity,
+        commission=Decimal(commission_amount).quantize(CENTS) * quantity,
+        provider_amount=Decimal(provider_amount).quantize(CENTS) * quantity,
+    )
+
+
+def _latest_snapshots(snapshots):
+    latest = (
+        LedgerSnapshot.objects.filter(provider=OuterRef("provider"))
+        .order_by("-last_entry_id", "-pk")
+        .values("pk")[:1]
+    )
+    return snapshots.filter(pk=Subquery(latest))
+
+
+def platform_totals(through=None):
+    """Ledger totals across every provider, up to entry ``through`` (default: all)."""
+    totals, since = _empty(), 0
+    snapshot = LedgerSnapshot.objects.filter(provider__isnull=True).order_by("-last_entry_id", "-pk").first()
+    if snapshot:
+        totals, since = {name: getattr(snapshot, name) for name in TOTAL_FIELDS}, snapshot.last_entry_id
+    entries = LedgerEntry.objects.filter(id__gt=since)
+    if through is not None:
+        entries = entries.filter(id__lte=through)
+    _add_entries(totals, entries.aggregate(**_entry_sums()))
+    return _with_balance(totals)
+
+
+def provider_totals(provider_ids, through=None):
+    """Return ``{provider id: totals}`` for ``provider_ids`` in two queries."""
+    if not provider_ids:
+        return {}
+    totals = {provider_id: _empty() for provider_id in provider_ids}
+    since = dict.fromkeys(provider_ids, 0)
+    for snapshot in _latest_snapshots(LedgerSnapshot.objects.filter(provider_id__in=provider_ids)):
+        totals[snapshot.provider_id] = {name: getattr(snapshot, name) for name in TOTAL_FIELDS}
+        since[snapshot.provider_id] = snapshot.last_entry_id
+
+    # Providers snapshotted together share a starting point; query each group once.
+    groups = defaultdict(list)
+    for provider_id, last_entry_id in since.items():
+        groups[last_entry_id].append(provider_id)
+    entries = LedgerEntry.objects.filter(
+        reduce(or_, (Q(provider_id__in=ids, id__gt=last_entry_id) for last_entry_id, ids in groups.items()))
+    )
+    if through is not None:
+        entries = entries.filter(id__lte=through)
+    for row in entries.values("provider_id").annotate(**_entry_sums()).order_by():
+        _add_entries(totals[row["provider_id"]], row)
+    return {provider_id: _with_balance(row) for provider_id, row in totals.items()}
+
+
+def provider_balance(provider):
+    return provider_totals([provider.pk])[provider.pk]
+
+
+def take_ledger_snapshot(batch_size=500):
+    """Snapshot the platform and every provider with entries since its last snapshot.
+
+    Returns the number of snapshots written, 0 when nothing is old enough.
+    """
+    lag = timedelta(seconds=getattr(settings, "LEDGER_SNAPSHOT_LAG_SECONDS", 300))
+    through = LedgerEntry.objects.filter(created_at__lt=timezone.now() - lag).aggregate(Max("id"))["id__max"]
+    platform = LedgerSnapshot.objects.filter(provider__isnull=True).order_by("-last_entry_id", "-pk").first()
+    since = platform.last_entry_id if platform else 0
+    if through is None or through <= since:
+        return 0
+
+    # Providers are snapshotted before the platform, so any provider with
+    # entries not yet in a snapshot has some after the platform's last one.
+    provider_ids = sorted(
+        set(
+            LedgerEntry.objects.filter(id__gt=since, id__lte=through, provider__isnull=False)
+            .values_list("provider_id", flat=True)
+            .distinct()
+        )
+    )
+    written = 0
+    for start in range(0, len(provider_ids), batch_size):
+        batch = provider_ids[start : start + batch_size]
+        with transaction.atomic():
+            snapshots = [
+                LedgerSnapshot(
+                    provider_id=provider_id,
+                    last_entry_id=through,
+                    **{name: totals[name] for name in TOTAL_FIELDS},
+                )
+                for provider_id, totals in provider_totals(batch, through).items()
+            ]
+            LedgerSnapshot.objects.bulk_create(snapshots)
+            written += len(snapshots)
+    totals = platform_totals(through)
+    LedgerSnapshot.objects.create(provider=None, last_entry_id=through, **{name: totals[name] for name in TOTAL_FIELDS})
+    return written + 1
+
+
+def run_payouts(batch_size=100, minimum=Decimal("0.01")):
+    """Settle every provider whose balance is at least ``minimum``, ``batch_size`` providers per transaction.
+
+    Each batch locks its providers' rows, so concurrent runs cannot pay the
+    same balance twice. Returns ``(payouts written, total amount)``.
+    """
+    provider_ids = list(User.objects.filter(role="provider").order_by("pk").values_list("pk", flat=True))
+    paid, amount = 0, Decimal("0.00")
+    for start in range(0, len(provider_ids), batch_size):
+        batch = provider_ids[start : start + batch_size]
+        with transaction.atomic():
+            list(User.objects.select_for_update().filter(pk__in=batch).values_list("pk"))
+            payouts = [
+                LedgerEntry(kind="payout", provider_id=provider_id, provider_amount=-totals["balance"])
+                for provider_id, totals in provider_totals(batch).items()
+                if totals["balance"] >= minimum
+            ]
+            LedgerEntry.objects.bulk_create(payouts)
+        paid += len(payouts)
+        amount -= sum((payout.provider_amount for payout in payouts), Decimal("0.00"))
+    return paid, amount
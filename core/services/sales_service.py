@@ -0,0 +1,253 @@
+"""Sales rollups for the provider dashboard: per-event totals
+(``EventSalesStats``) and hourly ``SalesBucket`` rows for sales charts.
+
+Bookings and admissions bump the rollups, and ``Event.tickets_sold``, with
+F() updates inside their own transactions. Bookings of sharded events
+instead insert a ``PendingSale`` row that ``apply_pending_sales`` folds in
+later, so they never lock a row shared by the whole event.
+``rebuild_sales_stats`` recomputes both rollups from the tickets table for
+repairs and backfills.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncDay, TruncHour
+from django.utils import timezone
+
+from core.models import Event, EventSalesStats, PendingSale, SalesBucket, Ticket
+
+CENTS = Decimal("0.01")
+AMOUNT_FIELDS = ("gross", "commission", "provider_net")
+COUNT_FIELDS = ("sold", "used", "cancelled")
+SALE_FIELDS = ("sold", *AMOUNT_FIELDS)
+BUCKET_FIELDS = ("sold", "gross", "provider_net")
+INTERVALS = ("hour", "day")
+
+
+def _add(model, lookup, changes):
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    model.objects.get_or_create(**lookup)
+    model.objects.filter(**lookup).update(**changes)
+
+
+def _bump(event_id, deltas):
+    changes = {name: F(name) + value for name, value in deltas.items()}
+    _add(EventSalesStats, {"event_id": event_id}, {**changes, "updated_at": timezone.now()})
+
+
+def bucket_hour(moment):
+    """Start of the UTC hour containing ``moment``."""
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _add_to_bucket(event_id, hour, deltas):
+    _add(SalesBucket, {"event_id": event_id, "hour": hour}, {name: F(name) + deltas[name] for name in BUCKET_FIELDS})
+
+
+def record_sale(*, event, quantity, price, commission_amount, provider_amount):
+    """Add ``quantity`` tickets sold at the given per-ticket amounts. Call inside the booking transaction.
+
+    Unsharded events are bumped in place, since the booking already holds
+    their event row. Sharded events only queue a ``PendingSale``.
+    """
+    deltas = {
+        "sold": quantity,
+        "gross": Decimal(price).quantize(CENTS) * quantity,
+        "commission": Decimal(commission_amount).quantize(CENTS) * quantity,
+        "provider_net": Decimal(provider_amount).quantize(CENTS) * quantity,
+    }
+    if event.shard_count > 1:
+        PendingSale.objects.create(event=event, **deltas)
+        return
+    Event.objects.filter(pk=event.pk).update(tickets_sold=F("tickets_sold") + quantity)
+    _bump(event.pk, deltas)
+    _add_to_bucket(event.pk, bucket_hour(timezone.now()), deltas)
+
+
+def apply_pending_sales(event_ids=None, batch_size=1000):
+    """Fold queued ``PendingSale`` rows into ``Event.tickets_sold``, the rollup and the hourly buckets.
+
+    Each batch locks its rows with SKIP LOCKED and deletes them in the same
+    transaction, so concurrent runs never count a sale twice and sales still
+    in flight are left for the next run. Returns the number of rows folded.
+    """
+    pending = PendingSale.objects.order_by("pk")
+    if event_ids is not None:
+        pending = pending.filter(event_id__in=event_ids)
+
+    folded = 0
+    while True:
+        with transaction.atomic():
+            rows = list(pending.select_for_update(skip_locked=True)[:batch_size])
+            per_event = defaultdict(lambda: dict.fromkeys(SALE_FIELDS, 0))
+            per_bucket = defaultdict(lambda: dict.fromkeys(BUCKET_FIELDS, 0))
+            for row in rows:
+                for name in SALE_FIELDS:
+                    per_event[row.event_id][name] += getattr(row, name)
+                for name in BUCKET_FIELDS:
+                    per_bucket[row.event_id, bucket_hour(row.created_at)][name] += getattr(row, name)
+
+            # Lock event rows before rollup rows, in the same order as bookings.
+            for event_id, deltas in sorted(per_event.items()):
+                Event.objects.filter(pk=event_id).update(tickets_sold=F("tickets_sold") + deltas["sold"])
+                _bump(event_id, deltas)
+            for (event_id, hour), deltas in sorted(per_bucket.items()):
+                _add_to_bucket(event_id, hour, deltas)
+            PendingSale.objects.filter(pk__in=[row.pk for row in rows]).delete()
+        folded += len(rows)
+        if len(rows) < batch_size:
+            return folded
+
+
+def sold_tickets(event):
+    """``event.tickets_sold`` plus the sales still queued for it, for checks that cannot lag."""
+    queued = PendingSale.objects.filter(event=event).aggregate(total=Sum("sold"))["total"]
+    return event.tickets_sold + (queued or 0)
+
+
+def record_admissions(admitted):
+    """Count admitted tickets. ``admitted`` maps event id to tickets admitted, in one UPDATE."""
+    if not admitted:
+        return
+    if len(admitted) == 1:
+        (event_id, count), = admitted.items()
+        return _bump(event_id, {"used": count})
+
+    existing = set(EventSalesStats.objects.filter(event_id__in=admitted).values_list("event_id", flat=True))
+    EventSalesStats.objects.bulk_create(
+        [EventSalesStats(event_id=event_id) for event_id in admitted if event_id not in existing],
+        ignore_conflicts=True,
+    )
+    EventSalesStats.objects.filter(event_id__in=admitted).update(
+        used=F("used")
+        + Case(
+            *[When(event_id=event_id, then=Value(count)) for event_id, count in admitted.items()],
+            output_field=IntegerField(),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def sales_totals(tickets):
+    """Aggregate rollup columns from a ticket queryset, grouped by event."""
+    live = ~Q(status="cancelled")
+    money = DecimalField(max_digits=14, decimal_places=2)
+    return tickets.values("event_id").annotate(
+        sold=Count("pk", filter=live),
+        used=Count("pk", filter=Q(status="used")),
+        cancelled=Count("pk", filter=Q(status="cancelled")),
+        gross=Coalesce(Sum("price", filter=live), Value(0), output_field=money),
+        commission=Coalesce(Sum("commission_amount", filter=live), Value(0), output_field=money),
+        provider_net=Coalesce(Sum("provider_amount", filter=live), Value(0), output_field=money),
+    )
+
+
+def bucket_totals(tickets):
+    """Aggregate ``SalesBucket`` columns from a ticket queryset, grouped by event and UTC hour."""
+    return (
+        tickets.exclude(status="cancelled")
+        .annotate(bucket=TruncHour("created_at", tzinfo=dt_timezone.utc))
+        .values("event_id", "bucket")
+        .annotate(sold=Count("pk"), gross=Sum("price"), provider_net=Sum("provider_amount"))
+        .order_by()
+    )
+
+
+def rebuild_sales_stats(event_ids=None, batch_size=500):
+    """Recompute the rollup and hourly buckets from tickets for ``event_ids`` (default: every event).
+
+    Each batch folds its queued sales first and then locks its rollup rows
+    before reading tickets. Bookings that committed earlier are in the
+    totals. Bookings still in flight block on the lock and apply their bump
+    on top afterwards, or leave a ``PendingSale`` for the next fold.
+    """
+    events = Event.objects.order_by("pk").values_list("pk", flat=True)
+    if event_ids is not None:
+        events = events.filter(pk__in=event_ids)
+    ids = list(events)
+
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start : start + batch_size]
+        with transaction.atomic():
+            apply_pending_sales(batch)
+            list(EventSalesStats.objects.select_for_update().filter(event_id__in=batch).values_list("pk"))
+            now = timezone.now()
+            totals = {row.pop("event_id"): row for row in sales_totals(Ticket.objects.filter(event_id__in=batch))}
+            EventSalesStats.objects.filter(event_id__in=batch).delete()
+            EventSalesStats.objects.bulk_create(
+                [EventSalesStats(event_id=event_id, updated_at=now, **totals.get(event_id, {})) for event_id in batch]
+            )
+            SalesBucket.objects.filter(event_id__in=batch).delete()
+            SalesBucket.objects.bulk_create(
+                [
+                    SalesBucket(
+                        event_id=row["event_id"],
+                        hour=row["bucket"],
+                        sold=row["sold"],
+                        gross=row["gross"] or 0,
+                        provider_net=row["provider_net"] or 0,
+                    )
+                    for row in bucket_totals(Ticket.objects.filter(event_id__in=batch))
+                ],
+                batch_size=batch_size,
+            )
+    return len(ids)
+
+
+def provider_sales(events):
+    """Return ``(per-event stats, totals)`` for ``events`` fetched with ``select_related("sales_stats")``."""
+    per_event, totals = {}, dict.fromkeys(COUNT_FIELDS, 0) | dict.fromkeys(AMOUNT_FIELDS, Decimal("0"))
+    for event in events:
+        stats = getattr(event, "sales_stats", None) or EventSalesStats(event=event)
+        row = {name: getattr(stats, name) for name in (*COUNT_FIELDS, *AMOUNT_FIELDS)}
+        per_event[event.pk] = row
+        for name, value in row.items():
+            totals[name] += value
+    return per_event, totals
+
+
+def timeseries_starts(start, end, interval, tz):
+    """Start of every ``interval`` in ``tz`` overlapping ``[start, end)``, plus the end of the last one.
+
+    Hours are UTC hours, so in zones offset by a fraction of an hour they
+    start at the local half or quarter hour. Days run from local midnight
+    and are 23 or 25 hours long across DST changes.
+    """
+    if interval == "hour":
+        moment, step = bucket_hour(start), timedelta(hours=1)
+        starts = [moment]
+        while starts[-1] < end:
+            starts.append(starts[-1] + step)
+        return starts
+
+    day = start.astimezone(tz).date()
+    starts = [datetime.combine(day, time(), tzinfo=tz)]
+    while starts[-1] < end:
+        day += timedelta(days=1)
+        starts.append(datetime.combine(day, time(), tzinfo=tz))
+    return starts
+
+
+def sales_timeseries(buckets, *, start, end, interval, tz):
+    """Sum ``buckets`` per ``interval`` in ``tz`` over ``[start, end)``, with empty intervals filled in.
+
+    The database groups and sums the hourly rows; day intervals are
+    truncated to local midnight in ``tz`` there too. Returns one dict per
+    interval with its ``start`` and the ``BUCKET_FIELDS`` totals.
+    """
+    starts = timeseries_starts(start, end, interval, tz)
+    rows = buckets.filter(hour__gte=starts[0], hour__lt=starts[-1])
+    period = TruncDay("hour", tzinfo=tz) if interval == "day" else F("hour")
+    totals = {
+        row.pop("period"): row
+        for row in rows.annotate(period=period)
+        .values("period")
+        .annotate(**{name: Sum(name) for name in BUCKET_FIELDS})
+        .order_by()
+    }
+    empty = {"sold": 0, "gross": Decimal("0.00"), "provider_net": Decimal("0.00")}
+    return [{"start": moment.astimezone(tz), **totals.get(moment, empty)} for moment in starts[:-1]]
@@ -0,0 +1,137 @@
+"""Ranked full-text search over event title, description and venue.
+
+SQLite keeps an FTS5 external-content table, ``core_event_fts``, in step
+with ``core_event`` through triggers. PostgreSQL uses a stored generated
+``tsvector`` column with a GIN index. Both are created by migration 0016.
+SQLite drops a table's triggers whenever Django rebuilds the table for a
+migration, so ``install_search_index`` also runs after every ``migrate``.
+Other databases fall back to unranked ``icontains`` matching.
+
+Each query word is matched as a prefix, and all words must match.
+``search_events`` annotates ``search_rank``, where higher is better. On
+SQLite the FTS table is joined through the unmanaged ``EventSearchDocument``
+model with a ``match`` lookup; PostgreSQL uses ``SearchQuery``/``SearchRank``.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connections
+from django.db.models import F, FloatField, Func, Lookup, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+from core.models import EventSearchDocument
+
+SEARCH_RANK = "search_rank"
+MAX_QUERY_TERMS = 8
+
+_SQLITE_SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_event_fts USING fts5("
+    "title, description, venue, content='core_event', content_rowid='id', "
+    "tokenize='porter unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS core_event_fts_insert AFTER INSERT ON core_event BEGIN "
+    "INSERT INTO core_event_fts(rowid, title, description, venue) "
+    "VALUES (new.id, new.title, new.description, new.venue); END",
+    "CREATE TRIGGER IF NOT EXISTS core_event_fts_delete AFTER DELETE ON core_event BEGIN "
+    "INSERT INTO core_event_fts(core_event_fts, rowid, title, description, venue) "
+    "VALUES ('delete', old.id, old.title, old.description, old.venue); END",
+    "CREATE TRIGGER IF NOT EXISTS core_event_fts_update AFTER UPDATE OF title, description, venue ON core_event BEGIN "
+    "INSERT INTO core_event_fts(core_event_fts, rowid, title, description, venue) "
+    "VALUES ('delete', old.id, old.title, old.description, old.venue); "
+    "INSERT INTO core_event_fts(rowid, title, description, venue) "
+    "VALUES (new.id, new.title, new.description, new.venue); END",
+]
+
+_POSTGRESQL_SCHEMA = [
+    "ALTER TABLE core_event ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(venue, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS event_search_vector_idx ON core_event USING GIN (search_vector)",
+]
+
+
+def install_search_index(connection, rebuild=False):
+    """Create the search index for ``connection``'s backend if it is missing."""
+    if connection.vendor == "sqlite":
+        statements = list(_SQLITE_SCHEMA)
+        if rebuild:
+            statements.append("INSERT INTO core_event_fts(core_event_fts) VALUES ('rebuild')")
+    elif connection.vendor == "postgresql":
+        statements = _POSTGRESQL_SCHEMA
+    else:
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def uninstall_search_index(connection):
+    if connection.vendor == "sqlite":
+        statements = [
+            "DROP TRIGGER IF EXISTS core_event_fts_insert",
+            "DROP TRIGGER IF EXISTS core_event_fts_delete",
+            "DROP TRIGGER IF EXISTS core_event_fts_update",
+            "DROP TABLE IF EXISTS core_event_fts",
+        ]
+    elif connection.vendor == "postgresql":
+        statements = ["ALTER TABLE core_event DROP COLUMN IF EXISTS search_vector"]
+    else:
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+class Match(Lookup):
+    """``<fts5 table column> MATCH <query>``."""
+
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+EventSearchDocument._meta.get_field("document").register_lookup(Match)
+
+
+class Bm25(Func):
+    function = "bm25"
+    output_field = FloatField()
+
+
+def query_terms(query):
+    return re.findall(r"\w+", query.lower())[:MAX_QUERY_TERMS]
+
+
+def search_events(queryset, query):
+    """Restrict ``queryset`` to events matching ``query`` and annotate ``search_rank``."""
+    terms = query_terms(query)
+    if not terms:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+    if vendor == "sqlite":
+        # Join the FTS table rather than probing it per row: bm25() is then
+        # computed once per match by the FTS scan itself.
+        match = " ".join(f'"{term}"*' for term in terms)
+        matches = Q(search_document__document__match=match)
+        # bm25() is lower-is-better; the weights favour title, then venue.
+        rank = -Bm25(F("search_document__document"), Value(10.0), Value(1.0), Value(4.0))
+    elif vendor == "postgresql":
+        tsquery = SearchQuery(" & ".join(f"{term}:*" for term in terms), search_type="raw", config="english")
+        # The generated column is created by migration 0016 and is not a model field.
+        vector = RawSQL("core_event.search_vector", [], output_field=SearchVectorField())
+        queryset = queryset.alias(search_vector=vector)
+        matches = Q(search_vector=tsquery)
+        # float8 so ranks round-trip exactly through pagination cursors.
+        rank = Cast(SearchRank(F("search_vector"), tsquery, cover_density=True), FloatField())
+    else:
+        matches = Q()
+        for term in terms:
+            matches &= Q(title__icontains=term) | Q(description__icontains=term) | Q(venue__icontains=term)
+        rank = Value(0.0, output_field=FloatField())
+
+    return queryset.filter(matches).annotate(**{SEARCH_RANK: rank})
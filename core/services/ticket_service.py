@@ -1,26 +1,335 @@
-from decimal import Decimal
+import random
+from collections import Counter
+
 from django.conf import settings
-from core.models import Ticket
+from django.db import connection, transaction
+from django.db.models import Case, CharField, DateTimeField, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 
+from core.models import Event, InventoryShard, Ticket
+from core.services.event_cache_service import invalidate_event_responses
+from core.services.ledger_service import record_booking
+from core.services.sales_service import apply_pending_sales, record_admissions, record_sale
 
-def create_ticket(*, event, user):
-    commission_rate = (
-        Decimal(settings.PLATFORM_COMMISSION_PERCENT) / Decimal("100")
+
+class TicketsUnavailable(Exception):
+    pass
+
+
+class TicketNotVerifiable(Exception):
+    """Raised when a scan cannot admit a ticket. ``reason`` is one of
+    ``"not_found"``, ``"already_used"`` or ``"cancelled"``."""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def max_tickets_per_booking():
+    return getattr(settings, "MAX_TICKETS_PER_BOOKING", 10)
+
+
+def claim_inventory(event, quantity=1):
+    if event.shard_count > 1:
+        _claim_sharded_inventory(event, quantity)
+    else:
+        # Check and decrement in a single conditional UPDATE so concurrent
+        # bookings can never drive tickets_available below zero.
+        claimed = Event.objects.filter(pk=event.pk, tickets_available__gte=quantity).update(
+            tickets_available=F("tickets_available") - quantity
+        )
+        if not claimed:
+            raise TicketsUnavailable("No tickets available")
+    invalidate_event_responses(availability_only=True)
+
+
+def _claim_shard(event, index, quantity):
+    return InventoryShard.objects.filter(event=event, index=index, tickets_available__gte=quantity).update(
+        tickets_available=F("tickets_available") - quantity
     )
 
-    ticket_price = event.price
 
-    # CALCULATIONS
-    commission_amount = ticket_price * commission_rate
-    provider_amount = ticket_price - commission_amount
+def _claim_sharded_inventory(event, quantity):
+    # Spread contention over the shard rows: try one random shard first and
+    # only fall back to reading shard stock when it cannot cover the booking.
+    if _claim_shard(event, random.randrange(event.shard_count), quantity):
+        return
+
+    with transaction.atomic():
+        remaining = quantity
+        shards = InventoryShard.objects.filter(event=event, tickets_available__gt=0).order_by("-tickets_available")
+        for index, available in shards.values_list("index", "tickets_available"):
+            take = min(remaining, available)
+            if _claim_shard(event, index, take):
+                remaining -= take
+            if not remaining:
+                return
+        # Roll back the partial claims taken from other shards.
+        transaction.set_rollback(True)
+    raise TicketsUnavailable("No tickets available")
+
 
-    # ⬇⬇⬇ THIS IS WHERE YOU WRITE IT ⬇⬇⬇
-    ticket = Ticket.objects.create(
-        event=event,
-        buyer=user,
-        price=ticket_price,
-        commission_amount=commission_amount,   # ✅ HERE
-        provider_amount=provider_amount,
+def restore_inventory(quantities):
+    """Give seats back to several events. ``quantities`` maps event id to seats.
+
+    Unsharded events are updated in one statement; sharded events get their
+    seats back on shard 0 in a second one.
+    """
+    if not quantities:
+        return
+
+    def increment(key):
+        return Case(
+            *[When(**{key: event_id}, then=Value(quantity)) for event_id, quantity in quantities.items()],
+            output_field=IntegerField(),
+        )
+
+    Event.objects.filter(pk__in=quantities, shard_count__lte=1).update(
+        tickets_available=F("tickets_available") + increment("pk")
+    )
+    InventoryShard.objects.filter(event_id__in=quantities, index=0).update(
+        tickets_available=F("tickets_available") + increment("event_id")
     )
+    invalidate_event_responses(availability_only=True)
+
+
+def reshard_inventory(event, added_tickets=0):
+    """Re-split an event's live stock, plus ``added_tickets``, over ``event.shard_count`` shard rows.
+
+    Stock is read from the locked shard rows, or from the locked event row
+    when the event was not sharded yet, never from the reconciled rollup.
+    """
+    with transaction.atomic():
+        shards = InventoryShard.objects.select_for_update().filter(event=event)
+        locked = list(shards.values_list("tickets_available", flat=True))
+        if not locked:
+            row = Event.objects.select_for_update().filter(pk=event.pk)
+            locked = list(row.values_list("tickets_available", flat=True))
+        stock = max(sum(locked) + added_tickets, 0)
+
+        shards.delete()
+        if event.shard_count > 1:
+            base, extra = divmod(stock, event.shard_count)
+            InventoryShard.objects.bulk_create(
+                [
+                    InventoryShard(event=event, index=index, tickets_available=base + (1 if index < extra else 0))
+                    for index in range(event.shard_count)
+                ]
+            )
+        Event.objects.filter(pk=event.pk).update(tickets_available=stock)
+        event.tickets_available = stock
+
+
+def update_inventory(event, previous_shard_count, added_tickets=0):
+    """Carry an event edit over to its live stock without handing sold seats back.
+
+    ``added_tickets`` is the change in ``total_tickets``. New seats go onto one
+    shard (or the event row), the same way ``restore_inventory`` gives seats
+    back; removing seats or changing ``shard_count`` re-splits the stock that
+    is actually left.
+    """
+    sharded = previous_shard_count > 1
+    if event.shard_count != previous_shard_count or (sharded and added_tickets < 0):
+        reshard_inventory(event, added_tickets)
+    elif added_tickets:
+        stock = InventoryShard.objects.filter(event=event, index=0) if sharded else Event.objects.filter(pk=event.pk)
+        # Seats still held may already be off the stock; never take it below zero.
+        stock.update(tickets_available=Greatest(F("tickets_available") + added_tickets, 0))
+    else:
+        return
+    invalidate_event_responses(availability_only=True)
+
+
+def reconcile_inventory():
+    """Roll shard stock up into ``Event.tickets_available`` for every sharded event.
+
+    Their queued sales are folded into ``tickets_sold`` and the sales rollups
+    in the same pass, so both counters lag the shards by the same interval.
+    """
+    apply_pending_sales()
+    shard_total = (
+        InventoryShard.objects.filter(event=OuterRef("pk"))
+        .values("event")
+        .annotate(total=Sum("tickets_available"))
+        .values("total")
+    )
+    updated = Event.objects.filter(shard_count__gt=1).update(
+        tickets_available=Coalesce(Subquery(shard_total), Value(0))
+    )
+    if updated:
+        invalidate_event_responses(availability_only=True)
+    return updated
+
+
+def insert_tickets(*, event, user, quantity):
+    """Bulk-insert ``quantity`` paid tickets for seats that have already been claimed.
+
+    Call inside the booking transaction: it also counts the sale in
+    ``Event.tickets_sold`` and the sales rollups (``record_sale``) and appends
+    it to the finance ledger. For sharded events these are all inserts, so
+    concurrent bookings only contend on the shard rows they claim from.
+    """
+    price = event.ticket_price
+    commission_amount, provider_amount = Ticket.split_price(price)
+    amounts = {"price": price, "commission_amount": commission_amount, "provider_amount": provider_amount}
+    record_sale(event=event, quantity=quantity, **amounts)
+    record_booking(event=event, quantity=quantity, **amounts)
+    return Ticket.objects.bulk_create(
+        [
+            Ticket(
+                event=event,
+                buyer=user,
+                price=price,
+                commission_amount=commission_amount,
+                provider_amount=provider_amount,
+                payment_confirmed=True,
+                is_active=True,
+            )
+            for _ in range(quantity)
+        ]
+    )
+
+
+def create_tickets(*, event, user, quantity=1):
+    """Reserve ``quantity`` seats with one inventory update and bulk-insert the tickets."""
+    with transaction.atomic():
+        claim_inventory(event, quantity)
+        tickets = insert_tickets(event=event, user=user, quantity=quantity)
+        event.refresh_from_db(fields=["tickets_available", "tickets_sold"])
+
+    return tickets
+
+
+def create_ticket(*, event, user):
+    return create_tickets(event=event, user=user)[0]
+
+
+def _admit_returning_event(ticket_id, now):
+    quote = connection.ops.quote_name
+    ticket_table, event_table = quote(Ticket._meta.db_table), quote(Event._meta.db_table)
+    sql = (
+        f"UPDATE {ticket_table} SET {quote('status')} = %s, {quote('used_at')} = %s, {quote('updated_at')} = %s "
+        f"WHERE {quote('id')} = %s AND {quote('status')} = %s "
+        f"RETURNING {quote('event_id')}, (SELECT {quote('title')} FROM {event_table} "
+        f"WHERE {event_table}.{quote('id')} = {ticket_table}.{quote('event_id')})"
+    )
+    with connection.cursor() as cursor:
+        now = connection.ops.adapt_datetimefield_value(now)
+        cursor.execute(sql, ["used", now, now, ticket_id, "unused"])
+        return cursor.fetchone()
+
+
+def admit_ticket(ticket_id):
+    """Mark an unused ticket as used and return its event title.
+
+    The status check and the write are one conditional UPDATE, so two
+    scanners can never both admit the same ticket. On databases with
+    RETURNING the event comes back in the same round trip; a failed scan
+    costs one more query to tell the reasons apart. A successful one also
+    bumps the event's sales rollup in the same transaction.
+    """
+    try:
+        ticket_id = int(ticket_id)
+    except (TypeError, ValueError):
+        raise TicketNotVerifiable("not_found")
+
+    now = timezone.now()
+    with transaction.atomic():
+        if connection.features.can_return_columns_from_insert:
+            admitted = _admit_returning_event(ticket_id, now)
+        elif Ticket.objects.filter(pk=ticket_id, status="unused").update(status="used", used_at=now, updated_at=now):
+            admitted = Event.objects.filter(tickets__pk=ticket_id).values_list("id", "title").get()
+        else:
+            admitted = None
+        if admitted is not None:
+            event_id, title = admitted
+            record_admissions({event_id: 1})
+            return title
+
+    current = Ticket.objects.filter(pk=ticket_id).values_list("status", flat=True).first()
+    if current == "used":
+        raise TicketNotVerifiable("already_used")
+    if current == "cancelled":
+        raise TicketNotVerifiable("cancelled")
+    raise TicketNotVerifiable("not_found")
+
+
+def _first_scans(scans):
+    """Keep the earliest ``(scanned_at, device)`` scan per ticket id."""
+    first = {}
+    for scan in scans:
+        key = (scan["scanned_at"], scan["device_id"])
+        if scan["ticket_id"] not in first or key < first[scan["ticket_id"]]:
+            first[scan["ticket_id"]] = key
+    return first
+
+
+def admit_scans(scans):
+    """Apply a batch of offline gate scans and return one result per scan.
+
+    Each scan is ``{"ticket_id", "scanned_at", "device_id"}``. Across all
+    devices and uploads the earliest ``(scanned_at, device_id)`` scan of a
+    ticket wins, so the stored admission does not depend on upload order.
+    The batch runs in one transaction of set-based statements whose count
+    does not grow with the batch, including the sales rollup update.
+    """
+    first = _first_scans(scans)
+    if not first:
+        return []
+
+    def per_ticket(index, output_field):
+        return Case(
+            *[When(pk=ticket_id, then=Value(scan[index])) for ticket_id, scan in first.items()],
+            output_field=output_field,
+        )
+
+    with transaction.atomic():
+        winner = {
+            "used_at": per_ticket(0, DateTimeField()),
+            "used_by_device": per_ticket(1, CharField()),
+            "updated_at": timezone.now(),
+        }
+        unused = dict(
+            Ticket.objects.select_for_update().filter(pk__in=first, status="unused").values_list("pk", "event_id")
+        )
+        Ticket.objects.filter(pk__in=unused, status="unused").update(status="used", **winner)
+        record_admissions(Counter(unused.values()))
+        # Compare against the same per-ticket CASE expressions rather than OR-ing
+        # one term per ticket, which nests too deeply for SQLite on large batches.
+        Ticket.objects.filter(pk__in=first, status="used").annotate(
+            scan_at=winner["used_at"], scan_device=winner["used_by_device"]
+        ).filter(
+            Q(used_at__gt=F("scan_at")) | Q(used_at=F("scan_at"), used_by_device__gt=F("scan_device"))
+        ).update(**winner)
+        stored = {
+            row["id"]: row
+            for row in Ticket.objects.filter(pk__in=first).values(
+                "id", "status", "used_at", "used_by_device", "event__title"
+            )
+        }
 
-    return ticket
+    results, reported = [], set()
+    for scan in scans:
+        row = stored.get(scan["ticket_id"])
+        result = {"ticket_id": scan["ticket_id"]}
+        if row is None:
+            result["result"] = "not_found"
+        elif row["status"] == "cancelled":
+            result["result"] = "cancelled"
+        else:
+            key = (scan["scanned_at"], scan["device_id"])
+            won = scan["ticket_id"] not in reported and key == first[scan["ticket_id"]] == (
+                row["used_at"],
+                row["used_by_device"],
+            )
+            if won:
+                reported.add(scan["ticket_id"])
+            result.update(
+                result="admitted" if won else "already_used",
+                event=row["event__title"],
+                used_at=row["used_at"],
+                used_by_device=row["used_by_device"],
+            )
+        results.append(result)
+    return results
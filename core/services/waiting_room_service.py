@@ -0,0 +1,95 @@
+"""Admission queue for hot events.
+
+Joining opens (or reuses) a queue session for the event and hands out a
+signed token carrying the session start and a position. Positions are
+admitted at ``WAITING_ROOM_ADMIT_PER_SECOND`` after an initial
+``WAITING_ROOM_BURST``, so a token can be checked from its payload alone and
+polling never touches the database or the cache.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+TOKEN_SALT = "core.waiting_room"
+
+
+class QueueTokenInvalid(Exception):
+    pass
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _key(event_id, suffix):
+    return f"waiting_room:{event_id}:{suffix}"
+
+
+def _session_seconds():
+    return _setting("WAITING_ROOM_SESSION_MINUTES", 30) * 60
+
+
+def join_queue(*, event, user):
+    """Return the user's queue token for ``event``, issuing a new position on first join."""
+    user_key = _key(event.pk, f"user:{user.pk}")
+    token = cache.get(user_key)
+    if token and not queue_status(token)["expired"]:
+        return token
+
+    session = _session_seconds()
+    cache.add(_key(event.pk, "opened_at"), time.time(), timeout=session)
+    opened_at = cache.get(_key(event.pk, "opened_at"))
+    counter_key = _key(event.pk, f"joined:{opened_at}")
+    cache.add(counter_key, 0, timeout=session)
+    position = cache.incr(counter_key)
+
+    token = signing.dumps({"e": event.pk, "u": user.pk, "p": position, "o": opened_at}, salt=TOKEN_SALT)
+    cache.set(user_key, token, timeout=session)
+    return token
+
+
+def queue_status(token, now=None):
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT)
+    except signing.BadSignature:
+        raise QueueTokenInvalid("Invalid queue token")
+
+    now = time.time() if now is None else now
+    rate = _setting("WAITING_ROOM_ADMIT_PER_SECOND", 20)
+    burst = _setting("WAITING_ROOM_BURST", 50)
+    opened_at = payload["o"]
+    admitted_at = opened_at + max(payload["p"] - burst, 0) / rate
+    expires_at = admitted_at + _setting("WAITING_ROOM_ADMISSION_MINUTES", 10) * 60
+    admitted_count = burst + int(max(now - opened_at, 0) * rate)
+
+    return {
+        "event": payload["e"],
+        "user": payload["u"],
+        "position": payload["p"],
+        "ahead": max(payload["p"] - admitted_count - 1, 0),
+        "admitted": admitted_at <= now < expires_at,
+        "expired": now >= expires_at,
+        "retry_after": max(math.ceil(admitted_at - now), 0),
+    }
+
+
+def admission_required(event):
+    return event.is_hot and _setting("WAITING_ROOM_ENABLED", True)
+
+
+def check_admission(*, token, event, user):
+    """Raise ``QueueTokenInvalid`` unless ``token`` belongs to ``user`` and ``event`` and has not expired.
+
+    The returned state still has to be checked for ``admitted``.
+    """
+    if not token:
+        raise QueueTokenInvalid("Join the waiting room before booking")
+    state = queue_status(token)
+    if state["event"] != event.pk or state["user"] != user.pk:
+        raise QueueTokenInvalid("Queue token does not match this booking")
+    if state["expired"]:
+        raise QueueTokenInvalid("Queue token has expired, please rejoin the waiting room")
+    return state
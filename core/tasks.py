@@ -0,0 +1,67 @@
+"""Background jobs kept off the request path.
+
+Tasks are plain functions. ``dispatch`` runs them on a local thread pool by
+default, inline with ``BACKGROUND_TASK_BACKEND = "sync"`` (tests), or through
+Celery with ``BACKGROUND_TASK_BACKEND = "celery"``.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+
+from .models import Ticket
+from .utils import generate_ticket_qr
+
+try:
+    from celery import shared_task
+except ImportError:  # Celery is only needed for the "celery" backend.
+    shared_task = None
+
+
+def background_task(func):
+    if shared_task is not None:
+        func.celery_task = shared_task(name=f"{func.__module__}.{func.__name__}")(func)
+    return func
+
+
+@lru_cache(maxsize=None)
+def _executor():
+    return ThreadPoolExecutor(
+        max_workers=getattr(settings, "BACKGROUND_TASK_WORKERS", 2),
+        thread_name_prefix="background-task",
+    )
+
+
+def _run_in_thread(func, *args):
+    try:
+        func(*args)
+    finally:
+        connections.close_all()
+
+
+def dispatch(func, *args):
+    backend = getattr(settings, "BACKGROUND_TASK_BACKEND", "thread")
+    if backend == "sync":
+        func(*args)
+    elif backend == "celery":
+        func.celery_task.delay(*args)
+    else:
+        _executor().submit(_run_in_thread, func, *args)
+
+
+def dispatch_on_commit(func, *args):
+    transaction.on_commit(lambda: dispatch(func, *args))
+
+
+@background_task
+def render_ticket_qr_codes(ticket_ids):
+    # Without QR_PERSIST_FILES, no ticket is meant to have a stored PNG.
+    if not getattr(settings, "QR_PERSIST_FILES", False):
+        return 0
+    tickets = list(Ticket.objects.filter(Q(qr_code="") | Q(qr_code__isnull=True), pk__in=ticket_ids))
+    for ticket in tickets:
+        generate_ticket_qr(ticket)
+    Ticket.objects.bulk_update(tickets, ["qr_code"])
+    return len(tickets)
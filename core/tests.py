@@ -86,8 +86,8 @@ class TicketPlatformApiTests(APITestCase):
         self.client.force_authenticate(self.provider)
         response = self.client.get(reverse("events-list") + "?mine=1")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["provider"], self.provider.id)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["provider"], self.provider.id)
 
     def test_customer_cannot_create_event(self):
         self.client.force_authenticate(self.customer)
@@ -98,7 +98,7 @@ class TicketPlatformApiTests(APITestCase):
         self.client.force_authenticate(self.customer)
         response = self.client.post(reverse("book-ticket", kwargs={"pk": self.event.id}), {}, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        ticket = Ticket.objects.get(id=response.data["id"])
+        ticket = Ticket.objects.get(id=response.data[0]["id"])
         self.assertIsNotNone(ticket.qr_code)
         self.event.refresh_from_db()
         self.assertEqual(self.event.tickets_available, 4)
@@ -106,7 +106,7 @@ class TicketPlatformApiTests(APITestCase):
     def test_customer_can_download_own_ticket_pdf(self):
         self.client.force_authenticate(self.customer)
         booking = self.client.post(reverse("book-ticket", kwargs={"pk": self.event.id}), {}, format="json")
-        ticket_id = booking.data["id"]
+        ticket_id = booking.data[0]["id"]
 
         self.client.force_authenticate(user=None)
         response = self.client.get(reverse("download-ticket", kwargs={"ticket_id": ticket_id}))
@@ -179,8 +179,8 @@ class TicketPlatformApiTests(APITestCase):
     def test_published_events_are_listed_for_customers(self):
         response = self.client.get(reverse("events-list"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], self.event.title)
+        self.assertGreaterEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], self.event.title)
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Event.objects.filter(provider=self.provider).count(), 2)
@@ -214,8 +214,8 @@ class TicketPlatformApiTests(APITestCase):
         self.client.force_authenticate(self.provider)
         response = self.client.get(reverse("events-list") + "?mine=1")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["provider"], self.provider.id)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["provider"], self.provider.id)
 
     def test_customer_cannot_create_event(self):
         self.client.force_authenticate(self.customer)
@@ -226,7 +226,7 @@ class TicketPlatformApiTests(APITestCase):
         self.client.force_authenticate(self.customer)
         response = self.client.post(reverse("book-ticket", kwargs={"pk": self.event.id}), {}, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        ticket = Ticket.objects.get(id=response.data["id"])
+        ticket = Ticket.objects.get(id=response.data[0]["id"])
         self.assertIsNotNone(ticket.qr_code)
         self.event.refresh_from_db()
         self.assertEqual(self.event.tickets_available, 4)
@@ -234,7 +234,7 @@ class TicketPlatformApiTests(APITestCase):
     def test_customer_can_download_own_ticket_pdf(self):
         self.client.force_authenticate(self.customer)
         booking = self.client.post(reverse("book-ticket", kwargs={"pk": self.event.id}), {}, format="json")
-        ticket_id = booking.data["id"]
+        ticket_id = booking.data[0]["id"]
 
         self.client.force_authenticate(user=None)
         response = self.client.get(reverse("download-ticket", kwargs={"ticket_id": ticket_id}))
@@ -0,0 +1,327 @@
+import tempfile
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import Event, EventSalesStats, InventoryShard, PendingSale, SalesBucket, Ticket, User
+from .services.ticket_service import (
+    TicketsUnavailable,
+    admit_ticket,
+    claim_inventory,
+    create_tickets,
+    reconcile_inventory,
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class AtomicBookingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.event = Event.objects.create(
+            title="Launch Night",
+            venue="Nairobi Arena",
+            tickets_available=1,
+            total_tickets=1,
+            ticket_price=100,
+        )
+
+    def test_claim_inventory_never_goes_negative(self):
+        claim_inventory(self.event)
+        with self.assertRaises(TicketsUnavailable):
+            claim_inventory(self.event)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_available, 0)
+
+    def test_booking_sold_out_event_is_rejected(self):
+        self.client.force_authenticate(self.customer)
+        url = reverse("book-ticket", kwargs={"pk": self.event.id})
+
+        first = self.client.post(url, {}, format="json")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(first.data), 1)
+        self.assertEqual(first.data[0]["event"]["tickets_available"], 0)
+
+        second = self.client.post(url, {}, format="json")
+        self.assertEqual(second.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), 1)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), BACKGROUND_TASK_BACKEND="sync", QR_PERSIST_FILES=True)
+class MultiSeatBookingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.event = Event.objects.create(
+            title="Festival",
+            venue="Uhuru Gardens",
+            tickets_available=12,
+            total_tickets=12,
+            ticket_price=100,
+        )
+        self.url = reverse("book-ticket", kwargs={"pk": self.event.id})
+
+    def test_booking_quantity_creates_block_of_tickets(self):
+        self.client.force_authenticate(self.customer)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {"quantity": 10}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 10)
+        self.assertEqual({ticket["qr_status"] for ticket in response.data}, {"pending"})
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_available, 2)
+        self.assertEqual(self.event.tickets_sold, 10)
+
+        tickets = Ticket.objects.filter(event=self.event, buyer=self.customer)
+        self.assertEqual(tickets.count(), 10)
+        for ticket in tickets:
+            self.assertEqual(ticket.commission_amount, 10)
+            self.assertEqual(ticket.provider_amount, 90)
+            self.assertTrue(ticket.qr_code)
+
+    def test_block_larger_than_inventory_books_nothing(self):
+        self.event.tickets_available = 3
+        self.event.save(update_fields=["tickets_available"])
+        self.client.force_authenticate(self.customer)
+
+        response = self.client.post(self.url, {"quantity": 4}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_available, 3)
+        self.assertFalse(Ticket.objects.filter(event=self.event).exists())
+
+    def test_invalid_quantity_is_rejected(self):
+        self.client.force_authenticate(self.customer)
+        for quantity in (0, -1, "many", 11):
+            response = self.client.post(self.url, {"quantity": quantity}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ShardedInventoryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.provider = User.objects.create_user(username="provider", password="pass1234", role="provider")
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+
+    def _create_event(self, **overrides):
+        self.client.force_authenticate(self.provider)
+        payload = {
+            "title": "Stadium Night",
+            "venue": "Kasarani",
+            "date": "2026-12-31T20:00:00Z",
+            "ticket_price": "10.00",
+            "total_tickets": 10,
+            "tickets_available": 10,
+            "shard_count": 4,
+        }
+        payload.update(overrides)
+        response = self.client.post(reverse("events-list"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Event.objects.get(id=response.data["id"])
+
+    def test_creating_sharded_event_splits_inventory(self):
+        event = self._create_event()
+        shards = list(InventoryShard.objects.filter(event=event).order_by("index").values_list("tickets_available", flat=True))
+        self.assertEqual(shards, [3, 3, 2, 2])
+
+    def test_sharded_event_sells_exactly_its_inventory(self):
+        event = self._create_event()
+        for _ in range(10):
+            claim_inventory(event)
+        with self.assertRaises(TicketsUnavailable):
+            claim_inventory(event)
+
+        self.assertFalse(InventoryShard.objects.filter(event=event, tickets_available__lt=0).exists())
+        reconcile_inventory()
+        event.refresh_from_db()
+        self.assertEqual(event.tickets_available, 0)
+
+    def test_block_booking_can_span_shards(self):
+        event = self._create_event()
+        claim_inventory(event, 7)
+        claim_inventory(event, 3)
+        self.assertEqual(InventoryShard.objects.filter(event=event).aggregate(total=Sum("tickets_available"))["total"], 0)
+
+    def test_failed_block_claim_leaves_shards_untouched(self):
+        event = self._create_event()
+        with self.assertRaises(TicketsUnavailable):
+            claim_inventory(event, 11)
+        self.assertEqual(InventoryShard.objects.filter(event=event).aggregate(total=Sum("tickets_available"))["total"], 10)
+
+    def test_invalid_shard_count_is_rejected(self):
+        self.client.force_authenticate(self.provider)
+        response = self.client.post(
+            reverse("events-list"),
+            {"title": "Bad", "total_tickets": 10, "tickets_available": 10, "shard_count": 0},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_editing_a_sharded_event_keeps_sold_seats_sold(self):
+        event = self._create_event()
+        create_tickets(event=event, user=self.customer, quantity=6)
+        url = reverse("events-detail", args=[event.id])
+
+        def stock():
+            return InventoryShard.objects.filter(event=event).aggregate(total=Sum("tickets_available"))["total"]
+
+        self.client.patch(url, {"title": "Renamed", "tickets_available": 10}, format="json")
+        self.assertEqual(stock() + Ticket.objects.filter(event=event).count(), 10)
+
+        self.client.patch(url, {"total_tickets": 15}, format="json")
+        self.assertEqual(stock(), 9)
+
+        self.client.patch(url, {"shard_count": 2, "total_tickets": 12}, format="json")
+        shards = InventoryShard.objects.filter(event=event).order_by("index")
+        self.assertEqual(list(shards.values_list("tickets_available", flat=True)), [3, 3])
+        reconcile_inventory()
+        event.refresh_from_db()
+        self.assertEqual((event.tickets_available, event.tickets_sold, event.total_tickets), (6, 6, 12))
+
+        response = self.client.patch(url, {"total_tickets": 5}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(stock(), 6)
+
+    def test_sharded_bookings_queue_their_sales(self):
+        event = self._create_event()
+        with CaptureQueriesContext(connection) as queries:
+            create_tickets(event=event, user=self.customer, quantity=3)
+
+        event_table = connection.ops.quote_name(Event._meta.db_table)
+        self.assertFalse([query for query in queries if query["sql"].startswith(f"UPDATE {event_table}")])
+        self.assertEqual(EventSalesStats.objects.get(event=event).sold, 0)
+        self.assertEqual(PendingSale.objects.get(event=event).sold, 3)
+
+        # Edits are checked against the queued sales, not the lagging rollup.
+        response = self.client.patch(reverse("events-detail", args=[event.id]), {"total_tickets": 2}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        reconcile_inventory()
+        event.refresh_from_db()
+        self.assertEqual((event.tickets_available, event.tickets_sold), (7, 3))
+        self.assertEqual(EventSalesStats.objects.get(event=event).gross, 30)
+        self.assertEqual(SalesBucket.objects.get(event=event).sold, 3)
+        self.assertFalse(PendingSale.objects.exists())
+
+    def test_editing_an_unsharded_event_keeps_sold_seats_sold(self):
+        event = self._create_event(shard_count=1)
+        create_tickets(event=event, user=self.customer, quantity=6)
+        url = reverse("events-detail", args=[event.id])
+
+        # The edit form re-sends the availability it loaded before the sale.
+        response = self.client.patch(url, {"title": "Renamed", "tickets_available": 10}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        event.refresh_from_db()
+        self.assertEqual(event.tickets_available, 4)
+
+        self.client.patch(url, {"total_tickets": 15, "tickets_available": 15}, format="json")
+        event.refresh_from_db()
+        self.assertEqual((event.tickets_available, event.total_tickets), (9, 15))
+
+        self.client.patch(url, {"total_tickets": 8}, format="json")
+        event.refresh_from_db()
+        self.assertEqual(event.tickets_available, 2)
+
+        response = self.client.patch(url, {"total_tickets": 5}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        event.refresh_from_db()
+        self.assertEqual(event.tickets_available, 2)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), TICKET_SYNC_OVERLAP_SECONDS=0)
+class CompactTicketListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.festival = Event.objects.create(
+            title="Festival", description="Three days", tickets_available=100, total_tickets=100, ticket_price=50
+        )
+        self.concert = Event.objects.create(title="Concert", tickets_available=10, total_tickets=10, ticket_price=20)
+        self.tickets = [
+            *create_tickets(event=self.festival, user=self.customer, quantity=8),
+            *create_tickets(event=self.concert, user=self.customer, quantity=2),
+        ]
+        self.client.force_authenticate(self.customer)
+
+    def _get(self, **params):
+        response = self.client.get(reverse("my-tickets-list"), {"compact": "1", **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_events_are_sent_once_beside_the_tickets(self):
+        with self.assertNumQueries(2):
+            data = self._get()
+
+        self.assertEqual(len(data["results"]), 10)
+        self.assertNotIn("event", data["results"][0])
+        self.assertEqual({ticket["event_id"] for ticket in data["results"]}, {self.festival.id, self.concert.id})
+        self.assertEqual(set(data["events"]), {str(self.festival.id), str(self.concert.id)})
+        self.assertEqual(data["events"][str(self.festival.id)]["description"], "Three days")
+        self.assertIsNone(data["next"])
+
+    def test_pages_follow_the_cursor(self):
+        seen, data = [], self._get(page_size=4)
+        while True:
+            seen += [ticket["id"] for ticket in data["results"]]
+            if not data["next"]:
+                break
+            data = self.client.get(data["next"]).data
+
+        self.assertEqual(sorted(seen), sorted(ticket.id for ticket in self.tickets))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_since_returns_only_changed_tickets(self):
+        Ticket.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        since = self._get()["since"]
+        admit_ticket(self.tickets[3].id)
+
+        data = self._get(since=since)
+
+        self.assertEqual([ticket["id"] for ticket in data["results"]], [self.tickets[3].id])
+        self.assertEqual(data["results"][0]["status"], "used")
+        self.assertEqual(list(data["events"]), [str(self.festival.id)])
+        unchanged = self._get(since=data["since"])
+        self.assertEqual((unchanged["results"], unchanged["events"]), ([], {}))
+        self.assertEqual(unchanged["since"], data["since"])
+
+    def test_since_resends_tickets_of_edited_events(self):
+        stale = timezone.now() - timedelta(minutes=1)
+        Ticket.objects.update(updated_at=stale)
+        Event.objects.update(details_updated_at=stale)
+        since = self._get()["since"]
+        self.concert.venue = "Uhuru Gardens"
+        self.concert.save()
+
+        data = self._get(since=since)
+
+        self.assertEqual({ticket["id"] for ticket in data["results"]}, {ticket.id for ticket in self.tickets[8:]})
+        self.assertEqual(data["events"][str(self.concert.id)]["venue"], "Uhuru Gardens")
+        self.assertEqual(list(data["events"]), [str(self.concert.id)])
+        self.assertEqual(self._get(since=data["since"])["results"], [])
+
+    def test_since_resends_the_overlap_window(self):
+        since = self._get()["since"]
+
+        with self.settings(TICKET_SYNC_OVERLAP_SECONDS=5):
+            self.assertEqual(len(self._get(since=since)["results"]), 10)
+
+    def test_default_list_still_nests_events(self):
+        response = self.client.get(reverse("my-tickets-list"))
+
+        self.assertEqual(len(response.data), 10)
+        self.assertEqual(response.data[0]["event"]["title"], "Festival")
+
+    def test_bad_parameters_are_rejected(self):
+        url = reverse("my-tickets-list")
+        self.assertEqual(self.client.get(url, {"compact": "1", "since": "yesterday"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"compact": "1", "cursor": "nope"}).status_code, 404)
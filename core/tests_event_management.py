@@ -1,13 +1,21 @@
 import tempfile
+from datetime import timedelta
 from pathlib import Path
 
+from django.conf import settings
+from django.core.cache import caches
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from .models import Event, User
+from .models import Event, Ticket, User
+from .serializer import EventSerializer, TicketSerializer
+from .services.search_service import install_search_index
 
 
 TEST_GIF = (
@@ -94,3 +102,214 @@ class EventImageAndDeletionTests(TestCase):
         self.client.force_authenticate(self.provider)
         response = self.client.delete(reverse("events-detail", kwargs={"pk": event.id}))
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class EventListPaginationTests(TestCase):
+    def setUp(self):
+        caches[settings.SHARED_CACHE_ALIAS].clear()
+        self.client = APIClient()
+        start = timezone.now()
+        # Ties on date exercise the id tie-breaker; undated events sort first.
+        self.events = [
+            Event.objects.create(title=f"Event {index}", date=start + timedelta(days=index // 3))
+            for index in range(10)
+        ]
+        self.undated = [Event.objects.create(title=f"TBA {index}") for index in range(2)]
+
+    def _walk(self, page_size):
+        pages, url = [], reverse("events-list")
+        params = {"page_size": page_size}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([event["id"] for event in response.data["results"]])
+            url, params = response.data["next"], None
+        return pages
+
+    def test_pages_cover_every_event_once_in_date_order(self):
+        pages = self._walk(page_size=4)
+
+        expected = sorted((event.id for event in self.undated), reverse=True) + [
+            event.id for event in sorted(self.events, key=lambda event: (event.date, event.id), reverse=True)
+        ]
+        self.assertEqual([len(page) for page in pages], [4, 4, 4])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_inserts_between_requests_do_not_shift_pages(self):
+        first = self.client.get(reverse("events-list"), {"page_size": 5}).data
+        Event.objects.create(title="Newest", date=timezone.now() + timedelta(days=30))
+
+        second = self.client.get(first["next"]).data
+
+        seen = [event["id"] for event in first["results"] + second["results"]]
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertNotIn("Newest", [event["title"] for event in second["results"]])
+
+    @override_settings(EVENT_RESPONSE_CACHE_SECONDS=0)
+    def test_later_pages_cost_the_same_queries_as_the_first(self):
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get(reverse("events-list"), {"page_size": 3})
+        with CaptureQueriesContext(connection) as later:
+            self.client.get(response.data["next"])
+        self.assertEqual(len(first), len(later))
+
+    def test_bad_cursor_is_rejected(self):
+        response = self.client.get(reverse("events-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class SoldTicketCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        # Uncapped events used to fall back to one COUNT(*) each.
+        Event.objects.bulk_create([Event(title=f"Event {index}", tickets_sold=index % 7) for index in range(1000)])
+
+    def test_listing_a_thousand_events_takes_one_query(self):
+        events = Event.objects.order_by("id")
+        with self.assertNumQueries(1):
+            data = EventSerializer(events, many=True).data
+        self.assertEqual(len(data), 1000)
+        self.assertEqual([event["sold_tickets"] for event in data[:8]], [0, 1, 2, 3, 4, 5, 6, 0])
+
+    def test_nested_events_in_ticket_lists_do_not_query(self):
+        Ticket.objects.bulk_create(
+            [Ticket(event=event, buyer=self.customer, price=0) for event in Event.objects.all()[:50]]
+        )
+        with self.assertNumQueries(1):
+            TicketSerializer(Ticket.objects.select_related("event"), many=True).data
+
+    def test_booking_an_uncapped_event_counts_its_tickets(self):
+        event = Event.objects.create(title="Walk-in", tickets_available=5)
+        self.client.force_authenticate(self.customer)
+
+        response = self.client.post(reverse("book-ticket", kwargs={"pk": event.id}), {"quantity": 2}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data[0]["event"]["sold_tickets"], 2)
+
+
+class EventResponseCacheTests(TestCase):
+    def setUp(self):
+        caches[settings.SHARED_CACHE_ALIAS].clear()
+        self.client = APIClient()
+        self.provider = User.objects.create_user(username="provider", password="pass1234", role="provider")
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.event = Event.objects.create(
+            title="Launch Night", tickets_available=5, total_tickets=5, ticket_price=100, provider=self.provider
+        )
+        self.detail_url = reverse("events-detail", kwargs={"pk": self.event.id})
+
+    def _anonymous_get(self, url):
+        return APIClient().get(url)
+
+    def _book(self):
+        self.client.force_authenticate(self.customer)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("book-ticket", kwargs={"pk": self.event.id}), {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_repeat_anonymous_requests_only_read_the_cache(self):
+        first = self._anonymous_get(reverse("events-list"))
+        self._anonymous_get(self.detail_url)
+        with CaptureQueriesContext(connection) as queries:
+            second = self._anonymous_get(reverse("events-list"))
+            detail = self._anonymous_get(self.detail_url)
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(detail.data["title"], "Launch Night")
+        # The test settings back the shared cache with its database table.
+        cache_table = connection.ops.quote_name(settings.CACHES[settings.SHARED_CACHE_ALIAS]["LOCATION"])
+        self.assertTrue(all(cache_table in query["sql"] for query in queries))
+
+    @override_settings(EVENT_RESPONSE_CACHE_ALIAS="default")
+    def test_per_process_cache_alias_disables_caching(self):
+        self._anonymous_get(self.detail_url)
+        Event.objects.filter(pk=self.event.pk).update(title="Renamed")
+
+        self.assertEqual(self._anonymous_get(self.detail_url).data["title"], "Renamed")
+
+    def test_provider_edits_invalidate_cached_responses(self):
+        self._anonymous_get(self.detail_url)
+        self.client.force_authenticate(self.provider)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(self.detail_url, {"title": "Renamed"}, format="json")
+
+        self.assertEqual(self._anonymous_get(self.detail_url).data["title"], "Renamed")
+
+    def test_bookings_invalidate_availability(self):
+        self._anonymous_get(self.detail_url)
+        self._book()
+        self.assertEqual(self._anonymous_get(self.detail_url).data["tickets_available"], 4)
+
+    @override_settings(EVENT_RESPONSE_STALE_SECONDS=5)
+    def test_stale_mode_keeps_serving_cached_availability(self):
+        self._anonymous_get(self.detail_url)
+        self._book()
+
+        self.assertEqual(self._anonymous_get(self.detail_url).data["tickets_available"], 5)
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get(self.detail_url).data["tickets_available"], 4)
+
+
+class EventSearchTests(TestCase):
+    def setUp(self):
+        caches[settings.SHARED_CACHE_ALIAS].clear()
+        self.client = APIClient()
+        soon = timezone.now() + timedelta(days=3)
+        self.title_match = Event.objects.create(title="Jazz Night", venue="Arena", ticket_price=50, date=soon)
+        self.venue_match = Event.objects.create(title="Open Mic", venue="Jazz Club", ticket_price=20, date=soon)
+        self.description_match = Event.objects.create(
+            title="Late Show", description="Smooth jazz and soul", ticket_price=80, date=soon + timedelta(days=30)
+        )
+        Event.objects.create(title="Rock Fest", description="Guitars", ticket_price=10, date=soon)
+
+    def _search(self, **params):
+        response = self.client.get(reverse("events-list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [event["id"] for event in response.data["results"]]
+
+    def test_results_are_ranked_title_then_venue_then_description(self):
+        self.assertEqual(
+            self._search(q="jazz"), [self.title_match.id, self.venue_match.id, self.description_match.id]
+        )
+
+    def test_words_match_as_prefixes_and_must_all_match(self):
+        self.assertEqual(self._search(q="ja nig"), [self.title_match.id])
+        self.assertEqual(self._search(q="jazz guitars"), [])
+        self.assertEqual(self._search(q='"*()'), [])
+
+    def test_search_combines_with_date_and_price_filters(self):
+        cutoff = (timezone.now() + timedelta(days=10)).isoformat()
+        self.assertEqual(self._search(q="jazz", price_max="60", price_min="30"), [self.title_match.id])
+        self.assertEqual(self._search(q="jazz", date_from=cutoff), [self.description_match.id])
+        self.assertEqual(self._search(q="jazz", date_before=cutoff), [self.title_match.id, self.venue_match.id])
+        response = self.client.get(reverse("events-list"), {"price_min": "cheap"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_edits_and_deletes(self):
+        self.title_match.title = "Blues Night"
+        self.title_match.save()
+        self.venue_match.delete()
+
+        self.assertEqual(self._search(q="blues"), [self.title_match.id])
+        self.assertEqual(self._search(q="jazz"), [self.description_match.id])
+
+    def test_ranked_results_page_by_cursor(self):
+        extra = [Event.objects.create(title=f"Jazz Brunch {index}") for index in range(5)]
+        seen, url, params = [], reverse("events-list"), {"q": "jazz", "page_size": 2}
+        while url:
+            response = self.client.get(url, params)
+            seen += [event["id"] for event in response.data["results"]]
+            url, params = response.data["next"], None
+
+        expected = [self.title_match, self.venue_match, self.description_match, *extra]
+        self.assertEqual(sorted(seen), sorted(event.id for event in expected))
+
+    def test_missing_triggers_are_reinstalled(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER core_event_fts_insert")
+        install_search_index(connection)
+
+        added = Event.objects.create(title="Jazz Brunch")
+        self.assertIn(added.id, self._search(q="brunch"))
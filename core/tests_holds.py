@@ -0,0 +1,144 @@
+import tempfile
+import time
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .holds import get_hold_backend
+from .models import Event, SeatHold, Ticket, User
+from .services.hold_service import create_hold, release_expired_holds
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class SeatHoldTests(TestCase):
+    def setUp(self):
+        get_hold_backend().clear()
+        self.client = APIClient()
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.other = User.objects.create_user(username="other", password="pass1234", role="customer")
+        self.event = Event.objects.create(
+            title="Launch Night",
+            venue="Nairobi Arena",
+            tickets_available=5,
+            total_tickets=5,
+            ticket_price=100,
+        )
+        self.second_event = Event.objects.create(
+            title="After Party",
+            venue="Nairobi Arena",
+            tickets_available=5,
+            total_tickets=5,
+            ticket_price=50,
+        )
+
+    def _hold(self, event, quantity):
+        self.client.force_authenticate(self.customer)
+        response = self.client.post(reverse("hold-tickets", kwargs={"pk": event.id}), {"quantity": quantity}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["hold_id"]
+
+    def test_hold_reserves_inventory_and_confirm_creates_tickets(self):
+        hold_id = self._hold(self.event, 3)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_available, 2)
+        self.assertFalse(Ticket.objects.exists())
+
+        response = self.client.post(reverse("confirm-hold", kwargs={"hold_id": hold_id}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ticket.objects.filter(event=self.event, buyer=self.customer, payment_confirmed=True).count(), 3)
+
+        repeat = self.client.post(reverse("confirm-hold", kwargs={"hold_id": hold_id}))
+        self.assertEqual(repeat.status_code, status.HTTP_404_NOT_FOUND)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_available, 2)
+
+    def test_other_users_cannot_see_or_confirm_hold(self):
+        hold_id = self._hold(self.event, 1)
+        self.client.force_authenticate(self.other)
+
+        self.assertEqual(self.client.get(reverse("hold-detail", kwargs={"hold_id": hold_id})).status_code, 404)
+        self.assertEqual(self.client.post(reverse("confirm-hold", kwargs={"hold_id": hold_id})).status_code, 404)
+
+    def test_released_hold_returns_seats(self):
+        hold_id = self._hold(self.event, 2)
+        response = self.client.delete(reverse("hold-detail", kwargs={"hold_id": hold_id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_available, 5)
+
+    def test_sweeper_returns_expired_holds_in_bulk(self):
+        self._hold(self.event, 2)
+        self._hold(self.event, 1)
+        self._hold(self.second_event, 4)
+
+        self.assertEqual(release_expired_holds(now=time.time() - 1), 0)
+        with self.assertNumQueries(2):
+            released = release_expired_holds(now=time.time() + 3600)
+        self.assertEqual(released, 3)
+
+        self.event.refresh_from_db()
+        self.second_event.refresh_from_db()
+        self.assertEqual(self.event.tickets_available, 5)
+        self.assertEqual(self.second_event.tickets_available, 5)
+
+    def test_hold_larger_than_inventory_is_rejected(self):
+        self.client.force_authenticate(self.customer)
+        response = self.client.post(reverse("hold-tickets", kwargs={"pk": self.event.id}), {"quantity": 6}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_failed_hold_write_returns_the_seats(self):
+        with patch.object(get_hold_backend(), "add", side_effect=ConnectionError):
+            with self.assertRaises(ConnectionError):
+                create_hold(event=self.event, user=self.customer, quantity=3)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_available, 5)
+
+    def test_local_backend_sweeps_expired_holds_when_holding(self):
+        self._hold(self.event, 4)
+        with patch("core.services.hold_service.time.time", return_value=time.time() + 3600):
+            self._hold(self.event, 5)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_available, 0)
+
+    def test_sweep_command_refuses_the_per_process_backend(self):
+        with self.assertRaises(CommandError):
+            call_command("sweep_holds", stdout=StringIO())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), TICKET_HOLD_BACKEND="core.holds.DatabaseHoldBackend")
+class DatabaseHoldBackendTests(TestCase):
+    def setUp(self):
+        get_hold_backend.cache_clear()
+        self.addCleanup(get_hold_backend.cache_clear)
+        self.client = APIClient()
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.event = Event.objects.create(title="Launch Night", tickets_available=5, total_tickets=5, ticket_price=100)
+
+    def test_hold_can_be_confirmed_by_another_worker(self):
+        hold = create_hold(event=self.event, user=self.customer, quantity=2)
+        get_hold_backend.cache_clear()
+
+        self.client.force_authenticate(self.customer)
+        response = self.client.post(reverse("confirm-hold", kwargs={"hold_id": hold["id"]}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), 2)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_sweep_command_returns_expired_holds(self):
+        with self.settings(TICKET_HOLD_MINUTES=0):
+            create_hold(event=self.event, user=self.customer, quantity=3)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_available, 2)
+
+        output = StringIO()
+        call_command("sweep_holds", stdout=output)
+
+        self.assertIn("Released 1 expired hold(s).", output.getvalue())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_available, 5)
+        self.assertFalse(SeatHold.objects.exists())
@@ -0,0 +1,77 @@
+import tempfile
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import Event, Ticket, User
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        caches[settings.SHARED_CACHE_ALIAS].clear()
+        self.client = APIClient()
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.staff = User.objects.create_user(username="staff", password="pass1234", role="staff")
+        self.event = Event.objects.create(
+            title="Launch Night",
+            venue="Nairobi Arena",
+            tickets_available=5,
+            total_tickets=5,
+            ticket_price=100,
+        )
+        self.book_url = reverse("book-ticket", kwargs={"pk": self.event.id})
+
+    def test_retried_booking_is_replayed_without_new_ticket(self):
+        self.client.force_authenticate(self.customer)
+        first = self.client.post(self.book_url, {}, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+        retry = self.client.post(self.book_url, {}, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data[0]["id"], first.data[0]["id"])
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Ticket.objects.count(), 1)
+
+        other = self.client.post(self.book_url, {}, format="json", HTTP_IDEMPOTENCY_KEY="def")
+        self.assertNotEqual(other.data[0]["id"], first.data[0]["id"])
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_running_request_holds_its_key_only_for_the_lock_ttl(self):
+        shared = caches[settings.SHARED_CACHE_ALIAS]
+        self.client.force_authenticate(self.customer)
+        with self.settings(IDEMPOTENCY_LOCK_TTL=30), patch.object(shared, "add", wraps=shared.add) as add:
+            self.client.post(self.book_url, {}, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+
+        self.assertEqual(add.call_args.kwargs["timeout"], 30)
+        self.assertEqual(shared.get(f"idempotency:{self.customer.pk}:book_ticket:abc")["status"], 201)
+
+    def test_key_reused_with_different_body_is_rejected(self):
+        self.client.force_authenticate(self.customer)
+        self.client.post(self.book_url, {"quantity": 1}, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+        response = self.client.post(self.book_url, {"quantity": 2}, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_keys_are_scoped_per_user(self):
+        other = User.objects.create_user(username="other", password="pass1234", role="customer")
+        for user in (self.customer, other):
+            self.client.force_authenticate(user)
+            self.client.post(self.book_url, {}, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_retried_verification_replays_success(self):
+        ticket = Ticket.objects.create(event=self.event, buyer=self.customer, price=100, payment_confirmed=True, is_active=True)
+        self.client.force_authenticate(self.staff)
+        url = reverse("verify-ticket")
+
+        first = self.client.post(url, {"ticket_id": ticket.id}, format="json", HTTP_IDEMPOTENCY_KEY="scan-1")
+        retry = self.client.post(url, {"ticket_id": ticket.id}, format="json", HTTP_IDEMPOTENCY_KEY="scan-1")
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry.data["message"], "Ticket verified")
@@ -0,0 +1,91 @@
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .holds import get_hold_backend
+from .models import Event, LedgerEntry, LedgerSnapshot, User
+from .services.dashboard_service import provider_earnings, total_platform_commission
+from .services.ledger_service import provider_balance, run_payouts, take_ledger_snapshot
+from .services.ticket_service import create_tickets
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), LEDGER_SNAPSHOT_LAG_SECONDS=0)
+class LedgerTests(TestCase):
+    def setUp(self):
+        get_hold_backend().clear()
+        self.provider = User.objects.create_user(username="provider", password="pass1234", role="provider")
+        self.other_provider = User.objects.create_user(username="other", password="pass1234", role="provider")
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.event = Event.objects.create(
+            title="Launch Night", provider=self.provider, tickets_available=50, total_tickets=50, ticket_price=100
+        )
+        self.other_event = Event.objects.create(
+            title="After Party", provider=self.other_provider, tickets_available=50, total_tickets=50, ticket_price=20
+        )
+
+    def test_bookings_append_one_sale_entry(self):
+        create_tickets(event=self.event, user=self.customer, quantity=3)
+        create_tickets(event=self.other_event, user=self.customer, quantity=1)
+
+        entry = LedgerEntry.objects.get(event=self.event)
+        self.assertEqual((entry.kind, entry.provider, entry.tickets), ("sale", self.provider, 3))
+        self.assertEqual((entry.gross, entry.commission, entry.provider_amount), (300, 30, 270))
+        self.assertEqual(total_platform_commission(), Decimal("32.00"))
+        self.assertEqual(provider_earnings(self.provider), Decimal("270.00"))
+
+    def test_balances_are_the_latest_snapshot_plus_later_entries(self):
+        create_tickets(event=self.event, user=self.customer, quantity=2)
+        create_tickets(event=self.other_event, user=self.customer, quantity=2)
+        self.assertEqual(take_ledger_snapshot(), 3)
+        self.assertEqual(take_ledger_snapshot(), 0)
+        create_tickets(event=self.event, user=self.customer, quantity=1)
+
+        with self.assertNumQueries(2):
+            balance = provider_balance(self.provider)
+        self.assertEqual((balance["earnings"], balance["balance"]), (Decimal("270.00"), Decimal("270.00")))
+        self.assertEqual(total_platform_commission(), Decimal("34.00"))
+
+        # Entries already in a snapshot are not read again.
+        LedgerEntry.objects.filter(tickets=2).delete()
+        self.assertEqual(provider_earnings(self.provider), Decimal("270.00"))
+
+    def test_snapshots_skip_entries_younger_than_the_lag(self):
+        create_tickets(event=self.event, user=self.customer, quantity=1)
+
+        with self.settings(LEDGER_SNAPSHOT_LAG_SECONDS=300):
+            self.assertEqual(take_ledger_snapshot(), 0)
+        self.assertFalse(LedgerSnapshot.objects.exists())
+
+    def test_payouts_settle_each_balance_once(self):
+        create_tickets(event=self.event, user=self.customer, quantity=2)
+        create_tickets(event=self.other_event, user=self.customer, quantity=5)
+        take_ledger_snapshot()
+
+        self.assertEqual(run_payouts(batch_size=1), (2, Decimal("270.00")))
+        self.assertEqual(run_payouts(batch_size=1), (0, Decimal("0.00")))
+
+        create_tickets(event=self.event, user=self.customer, quantity=1)
+        call_command("run_payouts", "--minimum", "50", stdout=StringIO())
+        balance = provider_balance(self.provider)
+        self.assertEqual((balance["paid_out"], balance["balance"]), (Decimal("270.00"), Decimal("0.00")))
+        self.assertEqual(provider_balance(self.other_provider)["paid_out"], Decimal("90.00"))
+
+        take_ledger_snapshot()
+        snapshot = LedgerSnapshot.objects.filter(provider=self.provider).latest("last_entry_id")
+        self.assertEqual((snapshot.earnings, snapshot.paid_out), (Decimal("270.00"), Decimal("270.00")))
+
+    def test_provider_dashboard_shows_the_ledger_balance(self):
+        create_tickets(event=self.event, user=self.customer, quantity=1)
+        run_payouts()
+        create_tickets(event=self.event, user=self.customer, quantity=1)
+        client = APIClient()
+        client.force_authenticate(self.provider)
+
+        data = client.get(reverse("provider-dashboard-data")).json()
+
+        self.assertEqual((data["paid_out"], data["balance"]), (90.0, 90.0))
@@ -0,0 +1,285 @@
+import threading
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from unittest import mock
+from zipfile import ZipFile
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from . import pdf_export, pdf_rendering
+from .models import Event, Ticket, User
+from .utils import PAGE_HEIGHT, PAGE_WIDTH, build_ticket_invitation_pdf, draw_ticket_page
+
+
+class TicketPdfTests(TestCase):
+    def setUp(self):
+        customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        event = Event.objects.create(title="Launch Night", venue="Arena", tickets_available=5, total_tickets=5, ticket_price=100)
+        self.ticket = Ticket.objects.create(event=event, buyer=customer, price=100, is_active=True)
+
+    def test_static_layer_form_matches_redrawn_page(self):
+        stamped = PdfReader(build_ticket_invitation_pdf(self.ticket, "CONF-1"), strict=True)
+        redrawn = PdfReader(build_ticket_invitation_pdf(self.ticket, "CONF-1", use_static_layer=False), strict=True)
+
+        self.assertEqual(stamped.pages[0].extract_text(), redrawn.pages[0].extract_text())
+        self.assertIn("TicketFlow Invitation", stamped.pages[0].extract_text())
+        self.assertIn("Launch Night", stamped.pages[0].extract_text())
+
+    def test_static_layer_is_one_form_per_document(self):
+        buffer = BytesIO()
+        pdf = canvas.Canvas(buffer, pagesize=(PAGE_WIDTH, PAGE_HEIGHT))
+        for confirmation_id in ("CONF-1", "CONF-2", "CONF-3"):
+            draw_ticket_page(pdf, self.ticket, confirmation_id)
+            pdf.showPage()
+        pdf.save()
+
+        forms = set()
+        for page in PdfReader(BytesIO(buffer.getvalue()), strict=True).pages:
+            xobjects = page["/Resources"]["/XObject"]
+            forms |= {ref.idnum for ref in xobjects.values() if ref.get_object()["/Subtype"] == "/Form"}
+        self.assertEqual(len(forms), 1)
+
+
+class PdfRenderPoolTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        event = Event.objects.create(title="Launch Night", tickets_available=5, total_tickets=5, ticket_price=100)
+        self.ticket = Ticket.objects.create(event=event, buyer=self.customer, price=100, is_active=True)
+        self.url = reverse("download-ticket", kwargs={"ticket_id": self.ticket.id})
+        self.client.force_authenticate(self.customer)
+        pdf_rendering.metrics.reset()
+
+    def test_pool_renders_pdf_and_reports_timings(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF"))
+        self.assertIn("queue_wait;dur=", response["Server-Timing"])
+        self.assertIn("render;dur=", response["Server-Timing"])
+        self.assertEqual(pdf_rendering.metrics.snapshot()["rendered"], 1)
+
+    def test_saturated_pool_returns_503_with_retry_after(self):
+        exhausted = threading.BoundedSemaphore(1)
+        exhausted.acquire()
+        with mock.patch.object(pdf_rendering, "_slots", return_value=exhausted):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "5")
+        self.assertEqual(pdf_rendering.metrics.snapshot()["rejected"], 1)
+
+    @override_settings(PDF_RENDER_TIMEOUT=0.01)
+    def test_slow_render_times_out_and_keeps_its_slot(self):
+        running = Future()
+        running.set_running_or_notify_cancel()
+        executor = mock.Mock(submit=mock.Mock(return_value=running))
+        slots = threading.BoundedSemaphore(1)
+        with mock.patch.object(pdf_rendering, "_executor", return_value=executor), \
+                mock.patch.object(pdf_rendering, "_slots", return_value=slots):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertFalse(slots.acquire(blocking=False))
+            running.set_result((b"%PDF", 0.0, 0.0))
+            self.assertTrue(slots.acquire(blocking=False))
+
+        self.assertEqual(pdf_rendering.metrics.snapshot()["timed_out"], 1)
+
+    def _pools(self, *pools):
+        pools = list(pools)
+        return mock.Mock(side_effect=lambda: pools[0], cache_clear=lambda: pools.pop(0))
+
+    def test_broken_pool_is_replaced_and_the_submit_retried(self):
+        rendered = Future()
+        rendered.set_result((b"%PDF-1.4", 0.0, 0.0))
+        broken = mock.Mock(submit=mock.Mock(side_effect=BrokenProcessPool))
+        fresh = mock.Mock(submit=mock.Mock(return_value=rendered))
+        with mock.patch.object(pdf_rendering, "_executor", self._pools(broken, fresh)), \
+                self.assertLogs("core.pdf_rendering", "WARNING"):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        broken.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        fresh.submit.assert_called_once()
+
+    def test_render_lost_with_its_worker_returns_503_and_replaces_the_pool(self):
+        lost = Future()
+        lost.set_exception(BrokenProcessPool("worker died"))
+        broken = mock.Mock(submit=mock.Mock(return_value=lost))
+        fresh = mock.Mock()
+        executor = self._pools(broken, fresh)
+        with mock.patch.object(pdf_rendering, "_executor", executor), \
+                self.assertLogs("core.pdf_rendering", "WARNING"):
+            response = self.client.get(self.url)
+            self.assertIs(executor(), fresh)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        broken.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        self.assertEqual(pdf_rendering.metrics.snapshot()["failed"], 1)
+
+    def test_metrics_are_admin_only(self):
+        url = reverse("pdf-render-metrics")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = User.objects.create_user(username="admin", password="pass1234", role="admin")
+        self.client.force_authenticate(admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("queue_wait", response.data)
+
+
+@override_settings(PDF_RENDER_WORKERS=0)
+class PdfCacheTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.provider = User.objects.create_user(username="provider", password="pass1234", role="provider")
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.event = Event.objects.create(
+            title="Launch Night", provider=self.provider, tickets_available=5, total_tickets=5, ticket_price=100
+        )
+        self.ticket = Ticket.objects.create(event=self.event, buyer=self.customer, price=100, is_active=True)
+        self.url = reverse("download-ticket", kwargs={"ticket_id": self.ticket.id})
+        self.client.force_authenticate(self.customer)
+        caches[settings.PDF_CACHE_ALIAS].clear()
+        pdf_rendering.metrics.reset()
+
+    def _edit_event(self, **changes):
+        self.client.force_authenticate(self.provider)
+        response = self.client.patch(reverse("events-detail", kwargs={"pk": self.event.id}), changes, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.force_authenticate(self.customer)
+
+    def test_repeat_download_is_served_from_cache(self):
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+
+        self.assertEqual(b"".join(first.streaming_content), b"".join(second.streaming_content))
+        self.assertEqual(first["ETag"], second["ETag"])
+        self.assertIn("Last-Modified", first)
+        self.assertNotIn("Server-Timing", second)
+        snapshot = pdf_rendering.metrics.snapshot()
+        self.assertEqual((snapshot["rendered"], snapshot["cache_hits"]), (1, 1))
+
+    def test_conditional_requests_get_not_modified(self):
+        first = self.client.get(self.url)
+
+        by_etag = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        by_date = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+
+        self.assertEqual(by_etag.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(by_date.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(pdf_rendering.metrics.snapshot()["rendered"], 1)
+
+    def test_editing_printed_event_fields_invalidates_pdf(self):
+        first = self.client.get(self.url)
+
+        self._edit_event(ticket_price="120.00")
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self._edit_event(venue="Stadium")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertEqual(pdf_rendering.metrics.snapshot()["rendered"], 2)
+
+    def test_details_timestamp_only_moves_for_printed_fields(self):
+        event = Event.objects.get(pk=self.event.pk)
+        stamp = event.details_updated_at
+
+        event.tickets_available = 3
+        event.save()
+        self.assertEqual(event.details_updated_at, stamp)
+
+        event.title = "Launch Night II"
+        event.save(update_fields=["title"])
+        event.refresh_from_db()
+        self.assertGreater(event.details_updated_at, stamp)
+
+
+class BulkExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.provider = User.objects.create_user(username="provider", password="pass1234", role="provider")
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.other = User.objects.create_user(username="other", password="pass1234", role="customer")
+        self.event = Event.objects.create(
+            title="Launch Night", provider=self.provider, tickets_available=5, total_tickets=5, ticket_price=100
+        )
+        self.mine = [
+            Ticket.objects.create(event=self.event, buyer=self.customer, price=100, is_active=True) for _ in range(3)
+        ]
+        self.theirs = Ticket.objects.create(event=self.event, buyer=self.other, price=100, is_active=True)
+
+    def _export(self, export_format, **params):
+        return self.client.get(reverse("export-tickets", kwargs={"export_format": export_format}), params)
+
+    def test_pdf_export_streams_one_page_per_ticket(self):
+        self.client.force_authenticate(self.customer)
+        ids = ",".join(str(ticket.id) for ticket in [*self.mine, self.theirs])
+
+        response = self._export("pdf", ids=ids)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        pdf = b"".join(response.streaming_content)
+        self.assertTrue(pdf.startswith(b"%PDF") and pdf.rstrip().endswith(b"%%EOF"))
+        self.assertIn(b"/Count 3", pdf)
+
+    def test_pdf_export_parses_strictly(self):
+        self.client.force_authenticate(self.customer)
+
+        response = self._export("pdf", event=self.event.id)
+
+        reader = PdfReader(BytesIO(b"".join(response.streaming_content)), strict=True)
+        self.assertEqual(len(reader.pages), 3)
+        self.assertIn("Launch Night", reader.pages[2].extract_text())
+        self.assertEqual(reader.metadata.title, "TicketFlow tickets")
+
+    def test_pinned_reportlab_streams_pages(self):
+        # Fails when requirements.txt moves to a reportlab without the internals page streaming reads.
+        pdf_export._streams_pages.cache_clear()
+        self.addCleanup(pdf_export._streams_pages.cache_clear)
+        self.assertTrue(pdf_export._streams_pages())
+
+    def test_pdf_export_falls_back_to_one_canvas_without_reportlab_internals(self):
+        self.client.force_authenticate(self.customer)
+        pdf_export._streams_pages.cache_clear()
+        self.addCleanup(pdf_export._streams_pages.cache_clear)
+
+        with mock.patch.object(pdf_export, "replays_operators", return_value=False), \
+                self.assertLogs("core.pdf_export", level="WARNING"):
+            response = self._export("pdf", event=self.event.id)
+            reader = PdfReader(BytesIO(b"".join(response.streaming_content)), strict=True)
+
+        self.assertEqual(len(reader.pages), 3)
+        self.assertIn("ReportLab", reader.metadata.producer)
+
+    def test_zip_export_contains_each_ticket_pdf(self):
+        self.client.force_authenticate(self.customer)
+
+        response = self._export("zip", event=self.event.id)
+
+        archive = ZipFile(BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(len(archive.namelist()), 3)
+        self.assertTrue(archive.read(archive.namelist()[0]).startswith(b"%PDF"))
+
+    def test_provider_exports_all_tickets_of_their_event(self):
+        self.client.force_authenticate(self.provider)
+
+        response = self._export("pdf", event=self.event.id)
+
+        self.assertIn(b"/Count 4", b"".join(response.streaming_content))
+
+    def test_export_needs_a_selection_and_visible_tickets(self):
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self._export("pdf").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._export("pdf", ids=str(self.mine[0].id)).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self._export("tar", event=self.event.id).status_code, status.HTTP_404_NOT_FOUND)
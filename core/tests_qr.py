@@ -0,0 +1,154 @@
+import tempfile
+from io import StringIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .checks import check_qr_signing_keys
+from .models import Event, Invitation, Ticket, User
+from .qr import InvalidTicketCode, parse_ticket_code, render_qr, sign_ticket_code
+
+
+class OnDemandQrTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.other = User.objects.create_user(username="other", password="pass1234", role="customer")
+        self.staff = User.objects.create_user(username="staff", password="pass1234", role="staff")
+        self.event = Event.objects.create(title="Launch Night", tickets_available=5, total_tickets=5, ticket_price=100)
+        self.ticket = Ticket.objects.create(event=self.event, buyer=self.customer, price=100, is_active=True)
+
+    def _url(self, image_format):
+        return reverse("ticket-qr", kwargs={"ticket_id": self.ticket.id, "image_format": image_format})
+
+    def test_owner_gets_png_and_svg(self):
+        self.client.force_authenticate(self.customer)
+
+        png = self.client.get(self._url("png"))
+        self.assertEqual(png.status_code, status.HTTP_200_OK)
+        self.assertEqual(png["Content-Type"], "image/png")
+        self.assertTrue(png.content.startswith(b"\x89PNG"))
+
+        svg = self.client.get(self._url("svg"))
+        self.assertEqual(svg["Content-Type"], "image/svg+xml")
+        self.assertIn(b"<svg", svg.content)
+        self.assertNotEqual(png["ETag"], svg["ETag"])
+        self.assertIn("max-age", svg["Cache-Control"])
+
+    def test_matching_etag_returns_not_modified(self):
+        self.client.force_authenticate(self.customer)
+        first = self.client.get(self._url("svg"))
+        second = self.client.get(self._url("svg"), HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(second.content, b"")
+
+    def test_if_none_match_compares_whole_etags(self):
+        self.client.force_authenticate(self.customer)
+        etag = self.client.get(self._url("svg"))["ETag"]
+
+        def status_for(header):
+            return self.client.get(self._url("svg"), HTTP_IF_NONE_MATCH=header).status_code
+
+        self.assertEqual(status_for(f'"other", W/{etag}'), status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(status_for("*"), status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(status_for(etag[:-5] + '"'), status.HTTP_200_OK)
+        self.assertEqual(status_for(f'"x{etag[1:]}'), status.HTTP_200_OK)
+
+    def test_pending_qr_command_only_renders_persisted_files(self):
+        with self.settings(QR_PERSIST_FILES=False):
+            output = StringIO()
+            call_command("render_pending_qr_codes", stdout=output)
+        self.assertIn("QR_PERSIST_FILES is off", output.getvalue())
+        self.ticket.refresh_from_db()
+        self.assertFalse(self.ticket.qr_code)
+
+        with self.settings(QR_PERSIST_FILES=True, MEDIA_ROOT=tempfile.mkdtemp()):
+            call_command("render_pending_qr_codes", stdout=StringIO())
+        self.ticket.refresh_from_db()
+        self.assertTrue(self.ticket.qr_code)
+
+    def test_repeated_renders_hit_the_lru(self):
+        render_qr.cache_clear()
+        self.client.force_authenticate(self.customer)
+        self.client.get(self._url("png"))
+        self.client.get(self._url("png"))
+        self.assertEqual(render_qr.cache_info().hits, 1)
+
+    def test_only_owner_or_staff_can_view(self):
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(self._url("png")).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(self.staff)
+        self.assertEqual(self.client.get(self._url("png")).status_code, status.HTTP_200_OK)
+
+    def test_unknown_format_and_ticket_are_not_found(self):
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get(self._url("gif")).status_code, status.HTTP_404_NOT_FOUND)
+        missing = reverse("ticket-qr", kwargs={"ticket_id": self.ticket.id + 100, "image_format": "png"})
+        self.assertEqual(self.client.get(missing).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_serializer_points_at_qr_endpoint(self):
+        self.client.force_authenticate(self.customer)
+        response = self.client.get(reverse("my-tickets-list"))
+        self.assertTrue(response.data[0]["qr_code"].endswith(self._url("svg")))
+        self.assertEqual(response.data[0]["qr_status"], "ready")
+
+    def test_invitation_qr_is_limited_to_creator_and_guest(self):
+        invitation = Invitation.objects.create(
+            creator=self.customer, title="Dinner", event_date="2026-12-31T20:00:00Z", venue="Home"
+        )
+        url = reverse("invitation-qr", kwargs={"invitation_uuid": invitation.uuid, "image_format": "png"})
+
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(QR_SIGNING_KEYS={"K1": "first-secret"}, QR_SIGNING_KEY_ID="K1")
+class SignedTicketCodeTests(TestCase):
+    def test_code_round_trips_and_stays_alphanumeric(self):
+        code = sign_ticket_code(42, 7)
+
+        self.assertEqual(parse_ticket_code(code), (42, 7))
+        self.assertEqual(parse_ticket_code(code.lower(), event_id=7), (42, 7))
+        self.assertRegex(code, r"^[A-Z0-9.]+$")
+
+    def test_forged_malformed_and_wrong_event_codes_are_rejected(self):
+        code = sign_ticket_code(42, 7)
+        tampered = code.replace(".42.", ".43.")
+        cases = {
+            tampered: "forged",
+            "ticket:42": "malformed",
+            "TF1.K1.42.7": "malformed",
+            code.replace("K1", "K9"): "forged",
+        }
+        for candidate, reason in cases.items():
+            with self.assertRaises(InvalidTicketCode) as raised:
+                parse_ticket_code(candidate)
+            self.assertEqual(raised.exception.reason, reason, candidate)
+
+        with self.assertRaises(InvalidTicketCode) as raised:
+            parse_ticket_code(code, event_id=8)
+        self.assertEqual(raised.exception.reason, "wrong_event")
+
+    def test_missing_signing_key_is_a_check_error_not_an_import_error(self):
+        self.assertEqual(check_qr_signing_keys(None), [])
+        with self.settings(QR_SIGNING_KEYS={}):
+            self.assertEqual([error.id for error in check_qr_signing_keys(None)], ["core.E002"])
+            with self.assertRaises(ImproperlyConfigured):
+                sign_ticket_code(42, 7)
+
+    def test_rotated_keys_accept_old_codes_until_retired(self):
+        old_code = sign_ticket_code(42, 7)
+
+        with self.settings(QR_SIGNING_KEYS={"K1": "first-secret", "K2": "second-secret"}, QR_SIGNING_KEY_ID="K2"):
+            self.assertTrue(sign_ticket_code(42, 7).startswith("TF1.K2."))
+            self.assertEqual(parse_ticket_code(old_code), (42, 7))
+
+        with self.settings(QR_SIGNING_KEYS={"K2": "second-secret"}, QR_SIGNING_KEY_ID="K2"):
+            with self.assertRaises(InvalidTicketCode):
+                parse_ticket_code(old_code)
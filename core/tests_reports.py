@@ -0,0 +1,97 @@
+import csv
+import json
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import report_export
+from .holds import get_hold_backend
+from .models import Event, Ticket, User
+from .services.ticket_service import create_tickets
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class EventReportTests(TestCase):
+    def setUp(self):
+        get_hold_backend().clear()
+        self.client = APIClient()
+        self.provider = User.objects.create_user(username="provider", password="pass1234", role="provider")
+        self.customer = User.objects.create_user(
+            username="customer", password="pass1234", email="amina@example.com", first_name="Amina", last_name="Otieno"
+        )
+        self.event = Event.objects.create(
+            title="Launch Night", provider=self.provider, tickets_available=50, total_tickets=50, ticket_price="99.99"
+        )
+        self.tickets = create_tickets(event=self.event, user=self.customer, quantity=3)
+        self.client.force_authenticate(self.provider)
+
+    def _get(self, report, export_format, **params):
+        url = reverse("event-report", kwargs={"pk": self.event.id, "report": report, "export_format": export_format})
+        return self.client.get(url, params)
+
+    def _body(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_attendee_csv(self):
+        response = self._get("attendees", "csv")
+
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn(f'filename="event-{self.event.id}-attendees.csv"', response["Content-Disposition"])
+        rows = list(csv.reader(StringIO(self._body(response))))
+        self.assertEqual(rows[0], report_export.REPORTS["attendees"])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(
+            rows[1],
+            [str(self.tickets[0].id), "customer", "Amina", "Otieno", "amina@example.com", "", "unused", ""],
+        )
+
+    def test_sales_ndjson_with_selected_columns(self):
+        response = self._get("sales", "ndjson", columns="ticket_id,price,created_at")
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = self._body(response).splitlines()
+        self.assertEqual(len(lines), 3)
+        row = json.loads(lines[0])
+        self.assertEqual(list(row), ["ticket_id", "price", "created_at"])
+        self.assertEqual((row["ticket_id"], row["price"]), (self.tickets[0].id, "99.99"))
+        self.assertTrue(row["created_at"].endswith("+00:00"))
+
+    def test_date_range_and_status_filters(self):
+        Ticket.objects.filter(pk=self.tickets[0].pk).update(created_at=datetime(2026, 1, 5, tzinfo=dt_timezone.utc))
+        Ticket.objects.filter(pk=self.tickets[1].pk).update(status="used")
+
+        january = self._body(
+            self._get("sales", "csv", columns="ticket_id", date_from="2026-01-01", date_before="2026-02-01")
+        )
+        used = self._body(self._get("sales", "csv", columns="ticket_id", status="used"))
+
+        self.assertEqual(january.split(), ["ticket_id", str(self.tickets[0].id)])
+        self.assertEqual(used.split(), ["ticket_id", str(self.tickets[1].id)])
+
+    def test_rows_stream_in_chunks_from_one_query(self):
+        create_tickets(event=self.event, user=self.customer, quantity=7)
+
+        with patch.object(report_export, "ROWS_PER_CHUNK", 4), CaptureQueriesContext(connection) as queries:
+            chunks = list(self._get("sales", "ndjson").streaming_content)
+
+        self.assertEqual([chunk.count(b"\n") for chunk in chunks], [4, 4, 2])
+        self.assertEqual(len([query for query in queries if "core_ticket" in query["sql"]]), 1)
+
+    def test_rejects_unknown_columns_reports_and_foreign_events(self):
+        other = User.objects.create_user(username="other", password="pass1234", role="provider")
+
+        self.assertEqual(self._get("sales", "csv", columns="ticket_id,password").status_code, 400)
+        self.assertEqual(self._get("refunds", "csv").status_code, 404)
+        self.assertEqual(self._get("sales", "xlsx").status_code, 404)
+        self.client.force_authenticate(other)
+        self.assertEqual(self._get("sales", "csv").status_code, 404)
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self._get("sales", "csv").status_code, 403)
@@ -0,0 +1,216 @@
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .holds import get_hold_backend
+from .models import Event, EventSalesStats, PendingSale, SalesBucket, Ticket, User
+from .services.sales_service import rebuild_sales_stats
+from .services.ticket_service import admit_scans, admit_ticket, create_tickets, reconcile_inventory, reshard_inventory
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        get_hold_backend().clear()
+        self.client = APIClient()
+        self.provider = User.objects.create_user(username="provider", password="pass1234", role="provider")
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.event = Event.objects.create(
+            title="Launch Night", provider=self.provider, tickets_available=50, total_tickets=50, ticket_price="99.99"
+        )
+        self.second_event = Event.objects.create(
+            title="After Party", provider=self.provider, tickets_available=50, total_tickets=50, ticket_price=20
+        )
+
+    def _stats(self, event):
+        return EventSalesStats.objects.get(event=event)
+
+    def test_bookings_and_confirmed_holds_add_to_the_rollup(self):
+        create_tickets(event=self.event, user=self.customer, quantity=3)
+        self.client.force_authenticate(self.customer)
+        hold = self.client.post(reverse("hold-tickets", kwargs={"pk": self.event.id}), {"quantity": 2}, format="json")
+        self.client.post(reverse("confirm-hold", kwargs={"hold_id": hold.data["hold_id"]}), format="json")
+
+        stats = self._stats(self.event)
+        self.assertEqual(stats.sold, 5)
+        self.assertEqual(stats.gross, Decimal("499.95"))
+        self.assertEqual(stats.commission + stats.provider_net, stats.gross)
+        self.assertEqual(
+            stats.provider_net, sum(Ticket.objects.filter(event=self.event).values_list("provider_amount", flat=True))
+        )
+
+    def test_admissions_count_once_per_ticket(self):
+        first = create_tickets(event=self.event, user=self.customer, quantity=2)
+        second = create_tickets(event=self.second_event, user=self.customer, quantity=3)
+
+        admit_ticket(first[0].id)
+        now = timezone.now()
+        scans = [{"ticket_id": ticket.id, "scanned_at": now, "device_id": "gate-1"} for ticket in [*first, *second]]
+        admit_scans(scans)
+        admit_scans(scans)
+
+        self.assertEqual(self._stats(self.event).used, 2)
+        self.assertEqual(self._stats(self.second_event).used, 3)
+
+    def test_dashboard_reads_one_row_per_event(self):
+        self.client.force_authenticate(self.provider)
+        create_tickets(event=self.event, user=self.customer, quantity=1)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(reverse("provider-dashboard-data"))
+        for _ in range(5):
+            create_tickets(event=self.event, user=self.customer, quantity=8)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(reverse("provider-dashboard-data"))
+
+        self.assertEqual(len(few), len(many))
+        data = response.json()
+        self.assertEqual((data["events_count"], data["tickets_sold"], data["tickets_used"]), (2, 41, 0))
+        self.assertAlmostEqual(data["gross"], 41 * 99.99, places=2)
+        self.assertEqual(data["events"][0]["sales"]["sold"] + data["events"][1]["sales"]["sold"], 41)
+
+    def test_rebuild_recomputes_the_rollup_from_tickets(self):
+        tickets = create_tickets(event=self.event, user=self.customer, quantity=4)
+        admit_ticket(tickets[0].id)
+        # Changes made behind the services' back, e.g. in the admin, drift the rollup.
+        Ticket.objects.filter(pk=tickets[1].pk).update(status="cancelled")
+        EventSalesStats.objects.filter(event=self.second_event).delete()
+        expected = self._stats(self.event)
+
+        call_command("rebuild_sales_stats", verbosity=0)
+
+        rebuilt = self._stats(self.event)
+        self.assertEqual((rebuilt.sold, rebuilt.used, rebuilt.cancelled), (3, 1, 1))
+        self.assertEqual(rebuilt.gross, expected.gross - Decimal("99.99"))
+        self.assertEqual(self._stats(self.second_event).sold, 0)
+        self.assertEqual(rebuild_sales_stats([self.event.id]), 1)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class SalesTimeseriesTests(TestCase):
+    def setUp(self):
+        get_hold_backend().clear()
+        self.client = APIClient()
+        self.provider = User.objects.create_user(username="provider", password="pass1234", role="provider")
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.event = Event.objects.create(
+            title="Launch Night", provider=self.provider, tickets_available=50, total_tickets=50, ticket_price=10
+        )
+        self.client.force_authenticate(self.provider)
+
+    def _bucket(self, hour, sold, event=None):
+        SalesBucket.objects.create(
+            event=event or self.event, hour=hour, sold=sold, gross=sold * 10, provider_net=sold * 9
+        )
+
+    def _series(self, **params):
+        response = self.client.get(reverse("provider-dashboard-timeseries"), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_bookings_land_in_the_current_hour_bucket(self):
+        create_tickets(event=self.event, user=self.customer, quantity=2)
+        create_tickets(event=self.event, user=self.customer, quantity=3)
+
+        bucket = SalesBucket.objects.get(event=self.event)
+        self.assertEqual((bucket.sold, bucket.gross), (5, Decimal("50.00")))
+        self.assertEqual(bucket.hour, timezone.now().replace(minute=0, second=0, microsecond=0))
+
+    def test_hours_are_gap_filled(self):
+        self._bucket(datetime(2026, 3, 1, 10, tzinfo=dt_timezone.utc), 2)
+        self._bucket(datetime(2026, 3, 1, 13, tzinfo=dt_timezone.utc), 4)
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self._series(interval="hour", date_from="2026-03-01T10:30:00Z", date_before="2026-03-01T14:00:00Z")
+
+        self.assertEqual([point["sold"] for point in data["points"]], [2, 0, 0, 4])
+        self.assertEqual(
+            data["points"][1], {"start": "2026-03-01T11:00:00+00:00", "sold": 0, "gross": 0.0, "revenue": 0.0}
+        )
+        self.assertFalse(any("core_ticket" in query["sql"] for query in queries))
+
+    def test_days_follow_the_requested_time_zone(self):
+        # Nairobi is UTC+3: 22:00 UTC on March 1st is already March 2nd there.
+        self._bucket(datetime(2026, 3, 1, 20, tzinfo=dt_timezone.utc), 1)
+        self._bucket(datetime(2026, 3, 1, 22, tzinfo=dt_timezone.utc), 2)
+        self._bucket(datetime(2026, 3, 2, 5, tzinfo=dt_timezone.utc), 3)
+
+        data = self._series(tz="Africa/Nairobi", date_from="2026-03-01", date_before="2026-03-04")
+
+        self.assertEqual(
+            [(point["start"], point["sold"]) for point in data["points"]],
+            [("2026-03-01T00:00:00+03:00", 1), ("2026-03-02T00:00:00+03:00", 5), ("2026-03-03T00:00:00+03:00", 0)],
+        )
+        self.assertEqual(data["points"][1]["revenue"], 45.0)
+
+    def test_days_across_a_dst_change_sum_their_local_hours(self):
+        # Europe/Berlin springs forward on 2026-03-29, a 23-hour day.
+        self._bucket(datetime(2026, 3, 28, 23, tzinfo=dt_timezone.utc), 1)
+        self._bucket(datetime(2026, 3, 29, 21, tzinfo=dt_timezone.utc), 2)
+        self._bucket(datetime(2026, 3, 29, 22, tzinfo=dt_timezone.utc), 4)
+
+        data = self._series(tz="Europe/Berlin", date_from="2026-03-29", date_before="2026-03-31")
+
+        self.assertEqual(
+            [(point["start"], point["sold"]) for point in data["points"]],
+            [("2026-03-29T00:00:00+01:00", 3), ("2026-03-30T00:00:00+02:00", 4)],
+        )
+
+    def test_series_is_limited_to_the_providers_events(self):
+        other = User.objects.create_user(username="other", password="pass1234", role="provider")
+        foreign = Event.objects.create(title="Elsewhere", provider=other, tickets_available=5, total_tickets=5)
+        second = Event.objects.create(title="After Party", provider=self.provider, tickets_available=5, total_tickets=5)
+        hour = datetime(2026, 3, 1, 10, tzinfo=dt_timezone.utc)
+        self._bucket(hour, 1)
+        self._bucket(hour, 2, event=second)
+        self._bucket(hour, 40, event=foreign)
+        window = {"interval": "hour", "date_from": "2026-03-01T10:00:00Z", "date_before": "2026-03-01T11:00:00Z"}
+
+        self.assertEqual(self._series(**window)["points"][0]["sold"], 3)
+        self.assertEqual(self._series(event=second.id, **window)["points"][0]["sold"], 2)
+        response = self.client.get(reverse("provider-dashboard-timeseries"), {"event": foreign.id, **window})
+        self.assertEqual(response.status_code, 404)
+
+    def test_rejects_bad_parameters(self):
+        url = reverse("provider-dashboard-timeseries")
+        for params in [
+            {"tz": "Mars/Olympus"},
+            {"interval": "minute"},
+            {"date_from": "2026-03-02", "date_before": "2026-03-01"},
+            {"date_from": "2024-01-01", "date_before": "2026-01-01"},
+        ]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(url, params).status_code, 400)
+
+    def test_rebuild_counts_queued_sales_once(self):
+        Event.objects.filter(pk=self.event.pk).update(shard_count=4)
+        self.event.refresh_from_db()
+        reshard_inventory(self.event)
+        create_tickets(event=self.event, user=self.customer, quantity=3)
+
+        rebuild_sales_stats([self.event.id])
+        reconcile_inventory()
+
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.tickets_sold, EventSalesStats.objects.get(event=self.event).sold), (3, 3))
+        self.assertFalse(PendingSale.objects.exists())
+
+    def test_rebuild_recomputes_buckets_from_tickets(self):
+        tickets = create_tickets(event=self.event, user=self.customer, quantity=3)
+        hour = datetime(2026, 3, 1, 10, 15, tzinfo=dt_timezone.utc)
+        Ticket.objects.filter(pk=tickets[0].pk).update(created_at=hour)
+        Ticket.objects.filter(pk=tickets[1].pk).update(status="cancelled")
+
+        rebuild_sales_stats([self.event.id])
+
+        self.assertEqual(
+            sorted(SalesBucket.objects.filter(event=self.event).values_list("hour", "sold")),
+            [(hour.replace(minute=0), 1), (timezone.now().replace(minute=0, second=0, microsecond=0), 1)],
+        )
@@ -0,0 +1,312 @@
+import base64
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .checks import check_manifest_signing_key
+from .models import Event, EventSalesStats, Ticket, User
+from .qr import sign_ticket_code, ticket_qr_payload
+from .serializer import MAX_SCANS_PER_BATCH
+from .services.manifest_service import decode_ids, encode_ids, manifest_public_key, manifest_signature_valid
+from .services.ticket_service import TicketNotVerifiable, admit_scans, admit_ticket
+
+
+class TicketVerificationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.staff = User.objects.create_user(username="staff", password="pass1234", role="staff")
+        self.event = Event.objects.create(title="Launch Night", tickets_available=5, total_tickets=5, ticket_price=100)
+        self.ticket = Ticket.objects.create(event=self.event, buyer=self.customer, price=100, is_active=True)
+        self.client.force_authenticate(self.staff)
+
+    def _verify(self, ticket_id):
+        return self.client.post(reverse("verify-ticket"), {"ticket_id": ticket_id}, format="json")
+
+    def test_admission_is_one_conditional_update_plus_the_rollup(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(admit_ticket(self.ticket.id), "Launch Night")
+        statements = [query["sql"] for query in queries if not query["sql"].startswith(("SAVEPOINT", "RELEASE"))]
+        self.assertEqual(len(statements), 2)
+        self.assertIn('UPDATE "core_ticket"', statements[0])
+        self.assertIn('UPDATE "core_eventsalesstats"', statements[1])
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, "used")
+        self.assertEqual(EventSalesStats.objects.get(event=self.event).used, 1)
+
+    def test_admission_without_returning_support(self):
+        with mock.patch.object(connection.features, "can_return_columns_from_insert", False):
+            self.assertEqual(admit_ticket(self.ticket.id), "Launch Night")
+            with self.assertRaises(TicketNotVerifiable):
+                admit_ticket(self.ticket.id)
+
+    def test_second_scan_is_rejected_as_already_used(self):
+        first = self._verify(self.ticket.id)
+        second = self._verify(self.ticket.id)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data["event"], "Launch Night")
+        self.assertEqual(second.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(second.data["code"], "already_used")
+
+    def test_cancelled_and_unknown_tickets_are_told_apart(self):
+        Ticket.objects.filter(pk=self.ticket.pk).update(status="cancelled")
+
+        cancelled = self._verify(self.ticket.id)
+        missing = self._verify(self.ticket.id + 100)
+        garbage = self._verify("not-a-ticket")
+
+        self.assertEqual((cancelled.status_code, cancelled.data["code"]), (status.HTTP_409_CONFLICT, "cancelled"))
+        self.assertEqual((missing.status_code, missing.data["code"]), (status.HTTP_404_NOT_FOUND, "not_found"))
+        self.assertEqual(garbage.data["code"], "not_found")
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, "cancelled")
+
+
+class BatchScanTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.staff = User.objects.create_user(username="staff", password="pass1234", role="staff")
+        self.event = Event.objects.create(title="Launch Night", tickets_available=50, total_tickets=50, ticket_price=100)
+        self.tickets = Ticket.objects.bulk_create(
+            [Ticket(event=self.event, buyer=customer, price=100, is_active=True) for _ in range(50)]
+        )
+        self.opened = timezone.now() - timedelta(hours=1)
+        self.client.force_authenticate(self.staff)
+
+    def _upload(self, device_id, *scans):
+        payload = {
+            "device_id": device_id,
+            "scans": [
+                {"ticket_id": ticket_id, "scanned_at": (self.opened + timedelta(minutes=minute)).isoformat()}
+                for ticket_id, minute in scans
+            ],
+        }
+        return self.client.post(reverse("verify-ticket-batch"), payload, format="json")
+
+    def test_batch_reports_a_result_per_scan(self):
+        ticket = self.tickets[0]
+        Ticket.objects.filter(pk=self.tickets[1].pk).update(status="cancelled")
+
+        response = self._upload("gate-1", (ticket.id, 1), (ticket.id, 2), (self.tickets[1].id, 3), (999999, 4))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = [result["result"] for result in response.data["results"]]
+        self.assertEqual(results, ["admitted", "already_used", "cancelled", "not_found"])
+        self.assertEqual(response.data["results"][0]["event"], "Launch Night")
+        self.assertEqual(response.data["summary"]["admitted"], 1)
+
+    def _scans(self, tickets):
+        return [{"ticket_id": ticket.id, "scanned_at": self.opened, "device_id": "gate-1"} for ticket in tickets]
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        with CaptureQueriesContext(connection) as small:
+            admit_scans(self._scans(self.tickets[:2]))
+        with CaptureQueriesContext(connection) as large:
+            admit_scans(self._scans(self.tickets[2:]))
+        self.assertEqual(len(small), len(large))
+
+    def test_earliest_scan_wins_regardless_of_upload_order(self):
+        ticket = self.tickets[0]
+
+        late = self._upload("gate-a", (ticket.id, 10))
+        early = self._upload("gate-b", (ticket.id, 5))
+        retry = self._upload("gate-a", (ticket.id, 10))
+
+        self.assertEqual(late.data["results"][0]["result"], "admitted")
+        self.assertEqual(early.data["results"][0]["result"], "admitted")
+        self.assertEqual(retry.data["results"][0]["result"], "already_used")
+        self.assertEqual(retry.data["results"][0]["used_by_device"], "gate-b")
+        ticket.refresh_from_db()
+        self.assertEqual((ticket.status, ticket.used_by_device), ("used", "gate-b"))
+        self.assertEqual(ticket.used_at, self.opened + timedelta(minutes=5))
+
+    def test_simultaneous_scans_tie_break_on_device_id(self):
+        ticket = self.tickets[0]
+
+        self._upload("gate-z", (ticket.id, 5))
+        self._upload("gate-m", (ticket.id, 5))
+
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.used_by_device, "gate-m")
+
+    def test_full_batch_of_earlier_scans_replaces_stored_admissions(self):
+        customer = self.tickets[0].buyer
+        tickets = Ticket.objects.bulk_create(
+            [Ticket(event=self.event, buyer=customer, price=100, is_active=True) for _ in range(MAX_SCANS_PER_BATCH)]
+        )
+
+        late = self._upload("gate-b", *[(ticket.id, 10) for ticket in tickets])
+        early = self._upload("gate-a", *[(ticket.id, 5) for ticket in tickets])
+
+        self.assertEqual(late.data["summary"]["admitted"], MAX_SCANS_PER_BATCH)
+        self.assertEqual(early.data["summary"]["admitted"], MAX_SCANS_PER_BATCH)
+        self.assertEqual(Ticket.objects.filter(used_by_device="gate-a").count(), MAX_SCANS_PER_BATCH)
+
+    def test_scanned_codes_are_verified_before_admitting(self):
+        genuine, victim, other = self.tickets[:3]
+        code = sign_ticket_code(genuine.id, self.event.id)
+        forged = f"TF1.K1.{victim.id}.{self.event.id}.AAAAAAAAAAAAAAAA"
+        scanned_at = self.opened.isoformat()
+        scans = [
+            {"ticket_id": genuine.id, "scanned_at": scanned_at, "code": code},
+            {"ticket_id": victim.id, "scanned_at": scanned_at, "code": forged},
+            {"ticket_id": other.id, "scanned_at": scanned_at, "code": code},
+            {"ticket_id": other.id, "scanned_at": scanned_at, "code": f"ticket:{other.id}"},
+        ]
+
+        payload = {"device_id": "gate-1", "scans": scans}
+        response = self.client.post(reverse("verify-ticket-batch"), payload, format="json")
+
+        results = [result["result"] for result in response.data["results"]]
+        self.assertEqual(results, ["admitted", "forged", "forged", "malformed"])
+        self.assertEqual(list(Ticket.objects.filter(status="used").values_list("pk", flat=True)), [genuine.id])
+
+    def test_scanned_codes_for_another_event_are_rejected_at_the_gate(self):
+        other_event = Event.objects.create(title="After Party", tickets_available=5, total_tickets=5)
+        other_ticket = Ticket.objects.create(event=other_event, price=0, is_active=True)
+        genuine = self.tickets[0]
+        scanned_at = self.opened.isoformat()
+        scans = [
+            {"ticket_id": genuine.id, "scanned_at": scanned_at, "code": sign_ticket_code(genuine.id, self.event.id)},
+            {
+                "ticket_id": other_ticket.id,
+                "scanned_at": scanned_at,
+                "code": sign_ticket_code(other_ticket.id, other_event.id),
+            },
+        ]
+
+        payload = {"device_id": "gate-1", "event_id": self.event.id, "scans": scans}
+        response = self.client.post(reverse("verify-ticket-batch"), payload, format="json")
+
+        results = [result["result"] for result in response.data["results"]]
+        self.assertEqual(results, ["admitted", "wrong_event"])
+        other_ticket.refresh_from_db()
+        self.assertEqual(other_ticket.status, "unused")
+
+    def test_only_staff_can_upload_and_batches_are_validated(self):
+        self.assertEqual(self._upload("gate-1").status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(None)
+        self.assertEqual(self._upload("gate-1", (self.tickets[0].id, 1)).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(ENTRY_MANIFEST_DELTA_OVERLAP_SECONDS=0)
+class EntryManifestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.staff = User.objects.create_user(username="staff", password="pass1234", role="staff")
+        self.event = Event.objects.create(title="Launch Night", tickets_available=5, total_tickets=5, ticket_price=100)
+        self.tickets = Ticket.objects.bulk_create(
+            [Ticket(event=self.event, buyer=self.customer, price=100, is_active=True) for _ in range(4)]
+        )
+        Ticket.objects.filter(event=self.event).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.url = reverse("events-manifest", kwargs={"pk": self.event.id})
+        self.client.force_authenticate(self.staff)
+
+    def _ids(self, *tickets):
+        return sorted(ticket.id for ticket in tickets)
+
+    def test_full_manifest_lists_valid_and_used_tickets(self):
+        admit_ticket(self.tickets[0].id)
+        Ticket.objects.filter(pk=self.tickets[1].pk).update(status="cancelled")
+
+        manifest = self.client.get(self.url).data
+
+        self.assertEqual(decode_ids(manifest["valid"]), self._ids(*self.tickets[2:]))
+        self.assertEqual(decode_ids(manifest["used"]), self._ids(self.tickets[0]))
+        self.assertNotIn("revoked", manifest)
+        self.assertTrue(manifest_signature_valid(manifest))
+        self.assertFalse(manifest_signature_valid({**manifest, "valid": encode_ids(self._ids(*self.tickets))}))
+
+    def test_delta_contains_only_tickets_changed_since_version(self):
+        version = self.client.get(self.url).data["version"]
+        admit_ticket(self.tickets[0].id)
+        cancelled = self.tickets[1]
+        cancelled.status = "cancelled"
+        cancelled.save()
+
+        delta = self.client.get(self.url, {"since": version}).data
+
+        self.assertEqual(delta["since"], version)
+        self.assertGreater(delta["version"], version)
+        self.assertEqual(decode_ids(delta["used"]), self._ids(self.tickets[0]))
+        self.assertEqual(decode_ids(delta["revoked"]), self._ids(cancelled))
+        self.assertEqual(decode_ids(delta["valid"]), [])
+        self.assertTrue(manifest_signature_valid(delta))
+
+    def test_devices_verify_with_only_the_public_key(self):
+        manifest = self.client.get(self.url).data
+        out = StringIO()
+        call_command("manifest_public_key", stdout=out)
+        public_key = out.getvalue().strip()
+
+        self.assertTrue(manifest_signature_valid(manifest, public_key))
+        self.assertFalse(manifest_signature_valid({**manifest, "signature": "forged"}, public_key))
+        with self.settings(ENTRY_MANIFEST_SIGNING_KEY=base64.b64encode(b"\x01" * 32).decode()):
+            self.assertNotEqual(manifest_public_key(), public_key)
+            self.assertFalse(manifest_signature_valid(manifest))
+
+    def test_missing_signing_key_is_a_check_error_not_an_import_error(self):
+        self.assertEqual(check_manifest_signing_key(None), [])
+        for key in ("", "not-base64!", base64.b64encode(b"short").decode()):
+            with self.settings(ENTRY_MANIFEST_SIGNING_KEY=key):
+                self.assertEqual([error.id for error in check_manifest_signing_key(None)], ["core.E001"])
+        with self.settings(ENTRY_MANIFEST_SIGNING_KEY=""), self.assertRaises(ImproperlyConfigured):
+            self.client.get(self.url)
+
+    def test_manifest_is_staff_only_and_validates_since(self):
+        self.assertEqual(self.client.get(self.url, {"since": "yesterday"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_encoding_is_compact_for_large_events(self):
+        ids = list(range(1000, 51000))
+        encoded = encode_ids(ids)
+        self.assertEqual(decode_ids(encoded), ids)
+        self.assertLess(len(encoded), 100_000)
+
+
+class SignedCodeVerificationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        customer = User.objects.create_user(username="customer", password="pass1234", role="customer")
+        self.client.force_authenticate(User.objects.create_user(username="staff", password="pass1234", role="staff"))
+        self.event = Event.objects.create(title="Launch Night", tickets_available=5, total_tickets=5, ticket_price=100)
+        self.ticket = Ticket.objects.create(event=self.event, buyer=customer, price=100, is_active=True)
+
+    def _verify(self, **payload):
+        return self.client.post(reverse("verify-ticket"), payload, format="json")
+
+    def test_scanned_code_admits_ticket(self):
+        response = self._verify(code=ticket_qr_payload(self.ticket), event_id=self.event.id)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["ticket_id"], str(self.ticket.id))
+
+    def test_forged_and_wrong_event_codes_are_rejected_without_queries(self):
+        code = sign_ticket_code(self.ticket.id, self.event.id)
+        forged = code[:-1] + ("B" if code.endswith("A") else "A")
+        with self.assertNumQueries(0):
+            bad_signature = self._verify(code=forged)
+            wrong_event = self._verify(code=ticket_qr_payload(self.ticket), event_id=self.event.id + 1)
+            garbage = self._verify(code="ticket:1")
+
+        self.assertEqual(bad_signature.data["code"], "forged")
+        self.assertEqual(wrong_event.data["code"], "wrong_event")
+        self.assertEqual(garbage.data["code"], "malformed")
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.status, "unused")
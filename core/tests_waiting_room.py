@@ -0,0 +1,76 @@
+import tempfile
+import time
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import Event, Ticket, User
+from .services.waiting_room_service import queue_status
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), WAITING_ROOM_BURST=1, WAITING_ROOM_ADMIT_PER_SECOND=0.01)
+class WaitingRoomTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.first = User.objects.create_user(username="first", password="pass1234", role="customer")
+        self.second = User.objects.create_user(username="second", password="pass1234", role="customer")
+        self.event = Event.objects.create(
+            title="Hot Drop",
+            venue="Nairobi Arena",
+            tickets_available=10,
+            total_tickets=10,
+            ticket_price=100,
+            is_hot=True,
+        )
+
+    def _join(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.post(reverse("events-queue", kwargs={"pk": self.event.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def _book(self, user, token=None):
+        self.client.force_authenticate(user)
+        headers = {"HTTP_X_QUEUE_TOKEN": token} if token else {}
+        return self.client.post(reverse("book-ticket", kwargs={"pk": self.event.id}), {}, format="json", **headers)
+
+    def test_hot_event_booking_requires_queue_token(self):
+        response = self._book(self.first)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_positions_are_admitted_in_order(self):
+        first = self._join(self.first)
+        second = self._join(self.second)
+        self.assertEqual((first["position"], second["position"]), (1, 2))
+        self.assertTrue(first["admitted"])
+        self.assertFalse(second["admitted"])
+        self.assertEqual(self._join(self.first)["token"], first["token"])
+
+        self.assertEqual(self._book(self.first, first["token"]).status_code, status.HTTP_201_CREATED)
+        waiting = self._book(self.second, second["token"])
+        self.assertEqual(waiting.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", waiting)
+
+        later = queue_status(second["token"], now=time.time() + 200)
+        self.assertTrue(later["admitted"])
+
+    def test_token_cannot_be_used_by_another_user(self):
+        first = self._join(self.first)
+        response = self._book(self.second, first["token"])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_polling_does_not_touch_the_database(self):
+        token = self._join(self.first)["token"]
+        self.client.force_authenticate(user=None)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("waiting-room-status", kwargs={"token": token}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["admitted"])
+
+        forged = self.client.get(reverse("waiting-room-status", kwargs={"token": token[:-2] + "xx"}))
+        self.assertEqual(forged.status_code, status.HTTP_404_NOT_FOUND)
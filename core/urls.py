@@ -4,7 +4,9 @@ from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
     RegisterView, LoginView, profile_view,
     EventViewSet, TicketViewSet, InvitationViewSet,
-    book_ticket, verify_ticket, api_root, provider_dashboard_data, download_ticket
+    book_ticket, verify_ticket, api_root, provider_dashboard_data, provider_dashboard_timeseries, download_ticket,
+    hold_tickets, hold_detail, confirm_hold_view, waiting_room_status,
+    ticket_qr, invitation_qr, pdf_render_metrics_view, export_tickets, verify_ticket_batch, event_report,
 
 )
 
@@ -20,12 +22,23 @@ urlpatterns = [
     path("auth/token/refresh/", TokenRefreshView.as_view(), name="token-refresh"),
     path("profile/", profile_view, name="profile"),
     path("tickets/book/<int:pk>/", book_ticket, name="book-ticket"),
+    path("tickets/hold/<int:pk>/", hold_tickets, name="hold-tickets"),
+    path("tickets/holds/<str:hold_id>/", hold_detail, name="hold-detail"),
+    path("tickets/holds/<str:hold_id>/confirm/", confirm_hold_view, name="confirm-hold"),
+    path("queue/<str:token>/", waiting_room_status, name="waiting-room-status"),
     path("tickets/verify/", verify_ticket, name="verify-ticket"),
+    path("tickets/verify/batch/", verify_ticket_batch, name="verify-ticket-batch"),
     path("tickets/download/<int:ticket_id>/", download_ticket, name="download-ticket"),
+    path("tickets/download/metrics/", pdf_render_metrics_view, name="pdf-render-metrics"),
+    path("tickets/export.<str:export_format>", export_tickets, name="export-tickets"),
+    path("events/<int:pk>/<str:report>.<str:export_format>", event_report, name="event-report"),
+    path("tickets/<int:ticket_id>/qr.<str:image_format>", ticket_qr, name="ticket-qr"),
+    path("invitations/<uuid:invitation_uuid>/qr.<str:image_format>", invitation_qr, name="invitation-qr"),
 
     # Include router URLs
     path("", include(router.urls)),
     path("dashboard/provider/data/", provider_dashboard_data, name="provider-dashboard-data"),
+    path("dashboard/provider/timeseries/", provider_dashboard_timeseries, name="provider-dashboard-timeseries"),
     # API root
     path("api-root/", api_root, name="api-root"),
 ]
@@ -1,37 +1,26 @@
 from io import BytesIO
 
-import qrcode
-from django.core.files import File
+from django.core.files.base import ContentFile
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.utils import ImageReader
 from reportlab.pdfgen import canvas
 
+from .qr import invitation_qr_payload, render_qr, ticket_qr_payload
 
-def generate_ticket_qr(ticket):
-    url = f"http://127.0.0.1:8000/api/tickets/{ticket.id}/"
-
-    qr = qrcode.make(url)
-    buffer = BytesIO()
-    qr.save(buffer, format="PNG")
 
+def generate_ticket_qr(ticket):
     ticket.qr_code.save(
-        f"ticket_{ticket.uuid}.png",
-        File(buffer),
+        f"ticket_{ticket.id}.png",
+        ContentFile(render_qr(ticket_qr_payload(ticket), "png")),
         save=False
     )
 
 
 def generate_invitation_qr(invitation):
-    url = f"http://127.0.0.1:8000/invitations/download/{invitation.uuid}/"
-
-    qr = qrcode.make(url)
-    buffer = BytesIO()
-    qr.save(buffer, format="PNG")
-
     invitation.qr_code.save(
         f"invitation_{invitation.uuid}.png",
-        File(buffer),
+        ContentFile(render_qr(invitation_qr_payload(invitation), "png")),
         save=False
     )
 
@@ -63,84 +52,130 @@ def _draw_wrapped_text(pdf, text, x, y, max_width, line_height=14, font_name="He
     return cursor
 
 
+def ticket_confirmation_id(ticket):
+    return f"TKT-{ticket.id:06d}-{ticket.created_at.strftime('%Y%m%d')}"
+
+
+def ticket_pdf_filename(ticket):
+    safe_event_name = "".join(
+        ch if ch.isalnum() or ch in {"-", "_"} else "_" for ch in ticket.event.title
+    ).strip("_")
+    return f"{safe_event_name or 'event'}_ticket_{ticket.id}.pdf"
+
+
 def generate_ticket_pdf(ticket):
-    confirmation_id = f"TKT-{ticket.id:06d}-{ticket.created_at.strftime('%Y%m%d')}"
-    return build_ticket_invitation_pdf(ticket, confirmation_id)
+    return build_ticket_invitation_pdf(ticket, ticket_confirmation_id(ticket))
 
 
-def build_ticket_invitation_pdf(ticket, confirmation_id):
-    """Create a downloadable invitation-style PDF for a ticket."""
-    buffer = BytesIO()
-    verification_payload = f"ticket:{ticket.id}"
+PAGE_WIDTH, PAGE_HEIGHT = A4
+CARD_X, CARD_Y = 40, 50
+CONTENT_TOP = PAGE_HEIGHT - 180
+QR_X, QR_Y = PAGE_WIDTH - 220, CARD_Y + 130
+QR_SIZE = 140
+STATIC_LAYER_FORM = "ticket-static-layer"
 
-    qr_image = qrcode.make(verification_payload)
-    qr_buffer = BytesIO()
-    qr_image.save(qr_buffer, format="PNG")
-    qr_buffer.seek(0)
 
-    pdf = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    pdf.setTitle(f"Ticket Invitation {ticket.id}")
+def _draw_static_layer(pdf):
+    """Draw everything on the ticket page that does not depend on the ticket."""
+    width, height = PAGE_WIDTH, PAGE_HEIGHT
 
     # dark themed background panel
     pdf.setFillColor(colors.HexColor("#0f172a"))
     pdf.rect(0, 0, width, height, stroke=0, fill=1)
 
     # glass card
-    card_x, card_y = 40, 50
     card_w, card_h = width - 80, height - 100
     pdf.setFillColor(colors.HexColor("#1e293b"))
-    pdf.roundRect(card_x, card_y, card_w, card_h, 18, stroke=0, fill=1)
+    pdf.roundRect(CARD_X, CARD_Y, card_w, card_h, 18, stroke=0, fill=1)
 
     pdf.setStrokeColor(colors.HexColor("#38bdf8"))
     pdf.setLineWidth(1.2)
-    pdf.roundRect(card_x, card_y, card_w, card_h, 18, stroke=1, fill=0)
+    pdf.roundRect(CARD_X, CARD_Y, card_w, card_h, 18, stroke=1, fill=0)
 
     pdf.setFillColor(colors.HexColor("#e2e8f0"))
     pdf.setFont("Helvetica-Bold", 24)
-    pdf.drawString(card_x + 28, height - 110, "TicketFlow Invitation")
+    pdf.drawString(CARD_X + 28, height - 110, "TicketFlow Invitation")
 
     pdf.setFillColor(colors.HexColor("#bae6fd"))
     pdf.setFont("Helvetica", 12)
-    pdf.drawString(card_x + 28, height - 135, "Welcome to the event! We're excited to have you.")
+    pdf.drawString(CARD_X + 28, height - 135, "Welcome to the event! We're excited to have you.")
 
-    # event metadata
-    top = height - 180
+    # event metadata labels
     pdf.setFillColor(colors.HexColor("#f8fafc"))
     pdf.setFont("Helvetica-Bold", 14)
-    pdf.drawString(card_x + 28, top, "Event")
+    pdf.drawString(CARD_X + 28, CONTENT_TOP, "Event")
+    pdf.setFont("Helvetica-Bold", 12)
+    pdf.drawString(CARD_X + 28, CONTENT_TOP - 50, "Venue")
+    pdf.drawString(CARD_X + 28, CONTENT_TOP - 95, "Date")
+    pdf.drawString(CARD_X + 28, CONTENT_TOP - 145, "Message")
+
+    # qr backing card and legend
+    pdf.roundRect(QR_X - 10, QR_Y - 10, QR_SIZE + 20, QR_SIZE + 20, 12, stroke=0, fill=1)
+    pdf.setFillColor(colors.HexColor("#cbd5e1"))
+    pdf.setFont("Helvetica", 10)
+    pdf.drawString(QR_X - 10, QR_Y - 44, "QR encodes: signed ticket code")
+
+
+def _stamp_static_layer(pdf):
+    # The layer is drawn into the document as a form XObject the first time
+    # and only referenced after that, so each page stamps it with one operator.
+    if not pdf.hasForm(STATIC_LAYER_FORM):
+        pdf.beginForm(STATIC_LAYER_FORM)
+        _draw_static_layer(pdf)
+        pdf.endForm()
+    pdf.doForm(STATIC_LAYER_FORM)
+
+
+def _draw_ticket_qr(pdf, ticket):
+    qr_buffer = BytesIO(render_qr(ticket_qr_payload(ticket), "png"))
+    pdf.drawImage(ImageReader(qr_buffer), QR_X, QR_Y, width=QR_SIZE, height=QR_SIZE, preserveAspectRatio=True, mask="auto")
+
+
+def draw_ticket_page(pdf, ticket, confirmation_id, use_static_layer=True, draw_qr=_draw_ticket_qr):
+    """Draw one ticket onto the current page of ``pdf`` without finishing it.
+
+    The invariant background, card and labels are a form XObject defined once
+    per document; only the ticket's own fields and QR code are drawn per
+    page. ``use_static_layer=False`` redraws everything (used by the benchmark).
+    """
+    pdf.saveState()
+    if use_static_layer:
+        _stamp_static_layer(pdf)
+    else:
+        _draw_static_layer(pdf)
+    pdf.restoreState()
+
+    # event metadata
+    pdf.setFillColor(colors.HexColor("#f8fafc"))
     pdf.setFont("Helvetica", 13)
-    pdf.drawString(card_x + 28, top - 20, ticket.event.title)
+    pdf.drawString(CARD_X + 28, CONTENT_TOP - 20, ticket.event.title)
 
-    pdf.setFont("Helvetica-Bold", 12)
-    pdf.drawString(card_x + 28, top - 50, "Venue")
     pdf.setFont("Helvetica", 11)
-    pdf.drawString(card_x + 28, top - 68, ticket.event.venue or "TBA")
+    pdf.drawString(CARD_X + 28, CONTENT_TOP - 68, ticket.event.venue or "TBA")
 
-    pdf.setFont("Helvetica-Bold", 12)
-    pdf.drawString(card_x + 28, top - 95, "Date")
-    pdf.setFont("Helvetica", 11)
     event_date = ticket.event.date.strftime("%A, %d %B %Y at %I:%M %p") if ticket.event.date else "TBA"
-    pdf.drawString(card_x + 28, top - 113, event_date)
+    pdf.drawString(CARD_X + 28, CONTENT_TOP - 113, event_date)
 
-    pdf.setFont("Helvetica-Bold", 12)
-    pdf.drawString(card_x + 28, top - 145, "Message")
     description = (ticket.event.description or "Get ready for an amazing event experience with TicketFlow.").strip()
-    _draw_wrapped_text(pdf, description, card_x + 28, top - 163, 320, line_height=15, font_name="Helvetica", font_size=11)
+    _draw_wrapped_text(pdf, description, CARD_X + 28, CONTENT_TOP - 163, 320, line_height=15, font_name="Helvetica", font_size=11)
 
     # right-side qr and identifiers
-    qr_x = width - 220
-    qr_y = card_y + 130
-    pdf.setFillColor(colors.HexColor("#f8fafc"))
-    pdf.roundRect(qr_x - 10, qr_y - 10, 160, 160, 12, stroke=0, fill=1)
-    pdf.drawImage(ImageReader(qr_buffer), qr_x, qr_y, width=140, height=140, preserveAspectRatio=True, mask="auto")
+    draw_qr(pdf, ticket)
 
     pdf.setFillColor(colors.HexColor("#cbd5e1"))
     pdf.setFont("Helvetica-Bold", 11)
-    pdf.drawString(qr_x - 10, qr_y - 28, f"Confirmation: {confirmation_id}")
+    pdf.drawString(QR_X - 10, QR_Y - 28, f"Confirmation: {confirmation_id}")
     pdf.setFont("Helvetica", 10)
-    pdf.drawString(qr_x - 10, qr_y - 44, "QR encodes: ticket:<ticket_id>")
-    pdf.drawString(qr_x - 10, qr_y - 58, f"ticket:{ticket.id}")
+    pdf.drawString(QR_X - 10, QR_Y - 58, f"ticket:{ticket.id}")
+
+
+def build_ticket_invitation_pdf(ticket, confirmation_id, use_static_layer=True):
+    """Create a downloadable invitation-style PDF for a ticket."""
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    pdf.setTitle(f"Ticket Invitation {ticket.id}")
+
+    draw_ticket_page(pdf, ticket, confirmation_id, use_static_layer=use_static_layer)
 
     pdf.showPage()
     pdf.save()
@@ -1,26 +1,81 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import partial
 from io import BytesIO
-import qrcode
-from django.core.files.base import ContentFile
-from django.http import HttpResponse, JsonResponse, FileResponse
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse, FileResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import generics, status, viewsets
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-from .models import Event, Invitation, Ticket
-from .permissions import IsProvider, IsStaff
+from .idempotency import idempotent
+from .pdf_export import stream_tickets_pdf, stream_tickets_zip
+from .pdf_rendering import (
+    PdfRenderUnavailable,
+    cached_ticket_pdf,
+    metrics as pdf_render_metrics,
+    ticket_pdf_etag,
+    ticket_pdf_last_modified,
+)
+from .models import Event, Invitation, SalesBucket, Ticket
+from .pagination import EVENT_ORDERING, EventCursorPagination, TicketSyncPagination
+from .permissions import IsAdmin, IsProvider, IsStaff
+from .qr import (
+    CONTENT_TYPES as QR_CONTENT_TYPES,
+    InvalidTicketCode,
+    invitation_qr_payload,
+    parse_ticket_code,
+    qr_etag,
+    render_qr,
+    ticket_qr_payload,
+)
+from .report_export import CONTENT_TYPES as REPORT_CONTENT_TYPES, REPORTS, stream_report
 from .serializer import (
+    CompactTicketSerializer,
     EventCreateUpdateSerializer,
+    EventFilterSerializer,
+    EventReportSerializer,
     EventSerializer,
     InvitationSerializer,
     LoginSerializer,
     RegisterSerializer,
+    SalesTimeseriesSerializer,
+    TicketListSerializer,
     TicketSerializer,
+    VerifyBatchSerializer,
+)
+from .services.event_cache_service import cached_event_response, invalidate_event_responses
+from .services.hold_service import HoldNotFound, confirm_hold, create_hold, get_hold, release_hold
+from .services.ledger_service import provider_balance
+from .services.manifest_service import event_manifest
+from .services.sales_service import AMOUNT_FIELDS, provider_sales, sales_timeseries
+from .services.search_service import search_events
+from .services.waiting_room_service import (
+    QueueTokenInvalid,
+    admission_required,
+    check_admission,
+    join_queue,
+    queue_status,
+)
+from .services.ticket_service import (
+    TicketNotVerifiable,
+    TicketsUnavailable,
+    admit_scans,
+    admit_ticket,
+    create_tickets,
+    max_tickets_per_booking,
+    reshard_inventory,
+    update_inventory,
 )
-from .utils import generate_ticket_pdf
+from .tasks import dispatch_on_commit, render_ticket_qr_codes
+from .utils import ticket_pdf_filename
 
 
 class RegisterView(generics.CreateAPIView):
@@ -53,13 +108,16 @@ def profile_view(request):
 
 
 class EventViewSet(viewsets.ModelViewSet):
-    queryset = Event.objects.select_related("provider").all().order_by("-date")
+    queryset = Event.objects.select_related("provider").all().order_by(*EVENT_ORDERING)
+    pagination_class = EventCursorPagination
 
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
             return [AllowAny()]
         if self.action in ["create", "update", "partial_update", "destroy"]:
             return [IsAuthenticated(), IsProvider()]
+        if self.action == "manifest":
+            return [IsAuthenticated(), IsStaff()]
         return [IsAuthenticated()]
 
     def get_serializer_class(self):
@@ -67,29 +125,80 @@ class EventViewSet(viewsets.ModelViewSet):
             return EventCreateUpdateSerializer
         return EventSerializer
 
+    def list(self, request, *args, **kwargs):
+        return cached_event_response(request, partial(super().list, request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_event_response(request, partial(super().retrieve, request, *args, **kwargs))
+
     def get_queryset(self):
         queryset = super().get_queryset()
         mine = self.request.query_params.get("mine")
         if mine in {"1", "true", "True"} and self.request.user.is_authenticated:
-            return queryset.filter(provider=self.request.user)
+            queryset = queryset.filter(provider=self.request.user)
+        if self.action == "list":
+            queryset = self._filter_list(queryset)
+        return queryset
+
+    def _filter_list(self, queryset):
+        params = EventFilterSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+        if "date_from" in filters:
+            queryset = queryset.filter(date__gte=filters["date_from"])
+        if "date_before" in filters:
+            queryset = queryset.filter(date__lt=filters["date_before"])
+        if "price_min" in filters:
+            queryset = queryset.filter(ticket_price__gte=filters["price_min"])
+        if "price_max" in filters:
+            queryset = queryset.filter(ticket_price__lte=filters["price_max"])
+        if filters.get("q", "").strip():
+            queryset = search_events(queryset, filters["q"])
         return queryset
 
     def perform_create(self, serializer):
-        serializer.save(provider=self.request.user)
+        event = serializer.save(provider=self.request.user)
+        if event.shard_count > 1:
+            reshard_inventory(event)
+        invalidate_event_responses()
 
     def perform_update(self, serializer):
         if serializer.instance.provider != self.request.user:
             raise PermissionDenied("You can only update your own events.")
         old_image = serializer.instance.image
+        previous_shard_count, previous_total = serializer.instance.shard_count, serializer.instance.total_tickets
         updated_event = serializer.save()
+        update_inventory(updated_event, previous_shard_count, updated_event.total_tickets - previous_total)
 
         if old_image and old_image.name and old_image.name != getattr(updated_event.image, "name", None):
             old_image.delete(save=False)
+        invalidate_event_responses()
 
     def perform_destroy(self, instance):
         if instance.provider != self.request.user:
             raise PermissionDenied("You can only delete your own events.")
         instance.delete()
+        invalidate_event_responses()
+
+    @action(detail=True, methods=["post"])
+    def queue(self, request, pk=None):
+        event = self.get_object()
+        if not admission_required(event):
+            return Response({"error": "This event has no waiting room"}, status=status.HTTP_400_BAD_REQUEST)
+        token = join_queue(event=event, user=request.user)
+        return Response({"token": token, **queue_status(token)})
+
+    @action(detail=True, methods=["get"])
+    def manifest(self, request, pk=None):
+        """Signed ticket manifest for offline gate checks; ``?since=<version>`` returns a delta."""
+        event = self.get_object()
+        since = request.query_params.get("since")
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                return Response({"error": "since must be a manifest version"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(event_manifest(event, since=since))
 
 
 
@@ -100,32 +209,218 @@ class TicketViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         return Ticket.objects.select_related("event").filter(buyer=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        """``?compact=1`` returns cursor pages of tickets carrying ``event_id``
+        plus an ``events`` map holding each event once. Pass a page's
+        ``since`` back as ``?since=`` to fetch only tickets changed after it,
+        including tickets whose event's title, venue, date or description changed."""
+        params = TicketListSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        if not params.validated_data["compact"]:
+            return super().list(request, *args, **kwargs)
+
+        tickets = Ticket.objects.filter(buyer=request.user)
+        since = params.validated_data.get("since")
+        if since is not None:
+            # Re-send a short window so changes committed out of clock order are not missed.
+            overlap = timedelta(seconds=getattr(settings, "TICKET_SYNC_OVERLAP_SECONDS", 5))
+            tickets = tickets.filter(updated_at__gt=since - overlap)
+
+        paginator = TicketSyncPagination()
+        page = paginator.paginate_queryset(tickets, request, view=self)
+        events = Event.objects.filter(pk__in={ticket.event_id for ticket in page}).order_by("pk")
+        context = self.get_serializer_context()
+        events = EventSerializer(events, many=True, context=context).data
+        if page:
+            since = page[-1].updated_at
+        return Response(
+            {
+                "next": paginator.get_next_link(),
+                "since": since.isoformat() if since else None,
+                "results": CompactTicketSerializer(page, many=True, context=context).data,
+                "events": {str(event["id"]): event for event in events},
+            }
+        )
+
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@idempotent
 def book_ticket(request, pk):
+    quantity = _booking_quantity(request)
+    if quantity is None:
+        return Response(
+            {"error": f"quantity must be between 1 and {max_tickets_per_booking()}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
     event = get_object_or_404(Event, pk=pk)
-    if event.tickets_available <= 0:
-        return Response({"error": "No tickets available"}, status=status.HTTP_400_BAD_REQUEST)
-
-    ticket = Ticket.objects.create(
-        event=event,
-        buyer=request.user,
-        price=event.ticket_price,
-        payment_confirmed=True,
-        is_active=True,
-    )
+    rejection = _waiting_room_rejection(request, event)
+    if rejection:
+        return rejection
+    try:
+        tickets = create_tickets(event=event, user=request.user, quantity=quantity)
+    except TicketsUnavailable as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    _queue_qr_codes(tickets)
+    return _booked_response(tickets)
 
-    qr = qrcode.make(f"ticket:{ticket.id}")
-    buffer = BytesIO()
-    qr.save(buffer)
-    ticket.qr_code.save(f"ticket_{ticket.id}.png", ContentFile(buffer.getvalue()), save=False)
-    ticket.save(update_fields=["qr_code", "payment_confirmed", "is_active"])
 
-    event.tickets_available -= 1
-    event.save(update_fields=["tickets_available"])
+def _booking_quantity(request):
+    try:
+        quantity = int(request.data.get("quantity", 1))
+    except (TypeError, ValueError):
+        return None
+    return quantity if 1 <= quantity <= max_tickets_per_booking() else None
 
-    return Response(TicketSerializer(ticket).data, status=status.HTTP_201_CREATED)
+
+def _waiting_room_rejection(request, event):
+    if not admission_required(event):
+        return None
+
+    token = request.headers.get("X-Queue-Token") or request.data.get("queue_token")
+    try:
+        state = check_admission(token=token, event=event, user=request.user)
+    except QueueTokenInvalid as exc:
+        return Response(
+            {"error": str(exc), "queue": f"/api/events/{event.pk}/queue/"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    if not state["admitted"]:
+        return Response(
+            {"error": "You are still in the waiting room", **state},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(max(state["retry_after"], 1))},
+        )
+    return None
+
+
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def waiting_room_status(request, token):
+    # The token is self-describing, so polling needs neither the database nor a login.
+    try:
+        state = queue_status(token)
+    except QueueTokenInvalid as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_404_NOT_FOUND)
+    return Response(state)
+
+
+def _queue_qr_codes(tickets):
+    # QR images are served on demand by ticket_qr. Persisting PNGs is only
+    # kept for deployments that still serve them from MEDIA_ROOT, and is
+    # done by a background worker once the tickets are committed.
+    if getattr(settings, "QR_PERSIST_FILES", False):
+        dispatch_on_commit(render_ticket_qr_codes, [ticket.id for ticket in tickets])
+
+
+def _booked_response(tickets):
+    # Always a list, whatever the quantity, so clients need not branch on the shape.
+    return Response(TicketSerializer(tickets, many=True).data, status=status.HTTP_201_CREATED)
+
+
+def _hold_data(hold):
+    return {
+        "hold_id": hold["id"],
+        "event": hold["event_id"],
+        "quantity": hold["quantity"],
+        "expires_at": datetime.fromtimestamp(hold["expires_at"], tz=dt_timezone.utc).isoformat(),
+    }
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@idempotent
+def hold_tickets(request, pk):
+    quantity = _booking_quantity(request)
+    if quantity is None:
+        return Response(
+            {"error": f"quantity must be between 1 and {max_tickets_per_booking()}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    event = get_object_or_404(Event, pk=pk)
+    rejection = _waiting_room_rejection(request, event)
+    if rejection:
+        return rejection
+    try:
+        hold = create_hold(event=event, user=request.user, quantity=quantity)
+    except TicketsUnavailable as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(_hold_data(hold), status=status.HTTP_201_CREATED)
+
+
+@api_view(["GET", "DELETE"])
+@permission_classes([IsAuthenticated])
+def hold_detail(request, hold_id):
+    try:
+        if request.method == "DELETE":
+            release_hold(hold_id=hold_id, user=request.user)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        hold = get_hold(hold_id=hold_id, user=request.user)
+    except HoldNotFound as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(_hold_data(hold))
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@idempotent
+def confirm_hold_view(request, hold_id):
+    try:
+        tickets = confirm_hold(hold_id=hold_id, user=request.user)
+    except HoldNotFound as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_404_NOT_FOUND)
+
+    _queue_qr_codes(tickets)
+    return _booked_response(tickets)
+
+
+def _qr_response(request, payload, image_format):
+    etag = qr_etag(payload, image_format)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(render_qr(payload, image_format), content_type=QR_CONTENT_TYPES[image_format])
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, max-age=86400"
+    return response
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def ticket_qr(request, ticket_id, image_format):
+    if image_format not in QR_CONTENT_TYPES:
+        return Response({"error": "Unsupported QR format."}, status=status.HTTP_404_NOT_FOUND)
+
+    ticket = Ticket.objects.filter(id=ticket_id).only("id", "buyer_id").first()
+    if ticket is None:
+        return Response({"error": "Ticket not found."}, status=status.HTTP_404_NOT_FOUND)
+    if ticket.buyer_id != request.user.id and request.user.role not in {"staff", "admin"}:
+        return Response({"error": "You are not authorized to view this ticket."}, status=status.HTTP_403_FORBIDDEN)
+
+    return _qr_response(request, ticket_qr_payload(ticket), image_format)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def invitation_qr(request, invitation_uuid, image_format):
+    if image_format not in QR_CONTENT_TYPES:
+        return Response({"error": "Unsupported QR format."}, status=status.HTTP_404_NOT_FOUND)
+
+    invitation = (
+        Invitation.objects.filter(uuid=invitation_uuid)
+        .filter(Q(creator=request.user) | Q(guest=request.user))
+        .only("uuid")
+        .first()
+    )
+    if invitation is None:
+        return Response({"error": "Invitation not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    return _qr_response(request, invitation_qr_payload(invitation), image_format)
 
 
 @api_view(["GET"])
@@ -139,46 +434,215 @@ def download_ticket(request, ticket_id):
     if ticket.buyer_id != request.user.id:
         return Response({"error": "You are not authorized to download this ticket."}, status=status.HTTP_403_FORBIDDEN)
 
-    pdf_buffer = generate_ticket_pdf(ticket)
-    safe_event_name = "".join(
-        ch if ch.isalnum() or ch in {"-", "_"} else "_" for ch in ticket.event.title
-    ).strip("_")
-    filename = f"{safe_event_name or 'event'}_ticket_{ticket.id}.pdf"
+    etag = ticket_pdf_etag(ticket)
+    last_modified = ticket_pdf_last_modified(ticket)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+    if not_modified is not None:
+        return _ticket_pdf_headers(not_modified, etag, last_modified)
 
-    return FileResponse(
-        pdf_buffer,
+    try:
+        pdf, timings = cached_ticket_pdf(ticket)
+    except PdfRenderUnavailable as exc:
+        return Response(
+            {"error": "Ticket downloads are busy, please retry shortly."},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+    response = FileResponse(
+        BytesIO(pdf),
         as_attachment=True,
-        filename=filename,
+        filename=ticket_pdf_filename(ticket),
         content_type="application/pdf",
     )
+    if timings is not None:
+        response["Server-Timing"] = ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
+    return _ticket_pdf_headers(response, etag, last_modified)
+
+
+def _ticket_pdf_headers(response, etag, last_modified):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified.timestamp())
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdmin])
+def pdf_render_metrics_view(request):
+    return Response(pdf_render_metrics.snapshot())
+
+
+EXPORT_CONTENT_TYPES = {"pdf": "application/pdf", "zip": "application/zip"}
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_tickets(request, export_format):
+    """Stream several tickets as one PDF or a ZIP of PDFs.
+
+    Pass ``?ids=1,2,3`` and/or ``?event=<id>``. Customers export their own
+    tickets; providers may also export every ticket of their events.
+    """
+    if export_format not in EXPORT_CONTENT_TYPES:
+        return Response({"error": "Unsupported export format."}, status=status.HTTP_404_NOT_FOUND)
+
+    ids = request.query_params.get("ids")
+    event_id = request.query_params.get("event")
+    if not ids and not event_id:
+        return Response({"error": "Provide ids or event."}, status=status.HTTP_400_BAD_REQUEST)
+
+    tickets = Ticket.objects.filter(is_active=True).select_related("event")
+    if request.user.role == "provider":
+        tickets = tickets.filter(Q(buyer=request.user) | Q(event__provider=request.user))
+    else:
+        tickets = tickets.filter(buyer=request.user)
+
+    try:
+        if ids:
+            tickets = tickets.filter(id__in=[int(ticket_id) for ticket_id in ids.split(",")])
+        if event_id:
+            tickets = tickets.filter(event_id=int(event_id))
+    except ValueError:
+        return Response({"error": "ids and event must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+    count = tickets.count()
+    if not count:
+        return Response({"error": "No tickets found."}, status=status.HTTP_404_NOT_FOUND)
+    limit = getattr(settings, "TICKET_EXPORT_MAX_TICKETS", 5000)
+    if count > limit:
+        return Response({"error": f"Export at most {limit} tickets at once."}, status=status.HTTP_400_BAD_REQUEST)
+
+    tickets = tickets.order_by("event_id", "id").iterator(chunk_size=200)
+    stream = stream_tickets_pdf(tickets) if export_format == "pdf" else stream_tickets_zip(tickets)
+    response = StreamingHttpResponse(stream, content_type=EXPORT_CONTENT_TYPES[export_format])
+    response["Content-Disposition"] = f'attachment; filename="tickets.{export_format}"'
+    return response
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsProvider])
+def event_report(request, pk, report, export_format):
+    """Stream the ``attendees`` or ``sales`` report of one of my events as CSV or NDJSON.
+
+    One row per ticket, in booking order. ``?columns=`` picks and orders
+    the columns; ``date_from``/``date_before`` and ``status`` filter tickets.
+    """
+    if report not in REPORTS or export_format not in REPORT_CONTENT_TYPES:
+        return Response({"error": "Unsupported report."}, status=status.HTTP_404_NOT_FOUND)
+    event = get_object_or_404(Event, pk=pk, provider=request.user)
+    params = EventReportSerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    filters = params.validated_data
+
+    tickets = Ticket.objects.filter(event=event)
+    if "status" in filters:
+        tickets = tickets.filter(status=filters["status"])
+    if "date_from" in filters:
+        tickets = tickets.filter(created_at__gte=filters["date_from"])
+    if "date_before" in filters:
+        tickets = tickets.filter(created_at__lt=filters["date_before"])
+
+    columns = filters.get("columns") or REPORTS[report]
+    response = StreamingHttpResponse(
+        stream_report(tickets, columns, export_format), content_type=REPORT_CONTENT_TYPES[export_format]
+    )
+    response["Content-Disposition"] = f'attachment; filename="event-{event.pk}-{report}.{export_format}"'
+    return response
+
+
+VERIFY_REJECTIONS = {
+    "not_found": ("Ticket not found", status.HTTP_404_NOT_FOUND),
+    "already_used": ("Ticket already used", status.HTTP_409_CONFLICT),
+    "cancelled": ("Ticket is cancelled", status.HTTP_409_CONFLICT),
+    "malformed": ("Not a TicketFlow ticket code", status.HTTP_400_BAD_REQUEST),
+    "forged": ("Ticket code signature is invalid", status.HTTP_400_BAD_REQUEST),
+    "wrong_event": ("Ticket is for a different event", status.HTTP_409_CONFLICT),
+}
+
 
+def _verify_rejection(reason):
+    message, status_code = VERIFY_REJECTIONS[reason]
+    return Response({"error": message, "code": reason}, status=status_code)
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsStaff])
+@idempotent
 def verify_ticket(request):
-    ticket_id = request.data.get("ticket_id")
-    if not ticket_id:
-        return Response({"error": "ticket_id is required"}, status=status.HTTP_400_BAD_REQUEST)
+    """Admit a ticket from a scanned ``code`` or a typed ``ticket_id``.
 
-    ticket = get_object_or_404(Ticket, id=ticket_id)
-    if ticket.status == "used":
-        return Response({"error": "Ticket already used"}, status=status.HTTP_400_BAD_REQUEST)
-    if ticket.status == "cancelled":
-        return Response({"error": "Ticket is cancelled"}, status=status.HTTP_400_BAD_REQUEST)
+    Scanned codes are checked against their signature (and ``event_id`` when
+    the gate sends one) before any query runs.
+    """
+    code = request.data.get("code")
+    ticket_id = request.data.get("ticket_id")
+    if code:
+        try:
+            ticket_id, _ = parse_ticket_code(code, event_id=request.data.get("event_id"))
+        except InvalidTicketCode as exc:
+            return _verify_rejection(exc.reason)
+    elif not ticket_id:
+        return Response({"error": "code or ticket_id is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-    ticket.status = "used"
-    ticket.save(update_fields=["status"])
+    try:
+        event_title = admit_ticket(ticket_id)
+    except TicketNotVerifiable as exc:
+        return _verify_rejection(exc.reason)
 
     return Response(
         {
             "message": "Ticket verified",
-            "ticket_id": str(ticket.id),
-            "event": ticket.event.title,
+            "ticket_id": str(ticket_id),
+            "event": event_title,
         }
     )
 
 
+def _scan_code_rejection(scan, event_id=None):
+    """Why a queued scan's code does not check out, or None. Typed ids carry no code."""
+    if "code" not in scan:
+        return None
+    try:
+        ticket_id, _ = parse_ticket_code(scan["code"], event_id=event_id)
+    except InvalidTicketCode as exc:
+        return exc.reason
+    return None if ticket_id == scan["ticket_id"] else "forged"
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsStaff])
+@idempotent
+def verify_ticket_batch(request):
+    """Apply scans queued offline by a gate device; the earliest scan of a ticket wins.
+
+    Scanned codes were never checked on the device, so they are verified here
+    like online scans, including against the gate's ``event_id`` when sent; a
+    scan whose code is malformed, forged, for another event or names another
+    ticket is reported and admits nothing.
+    """
+    serializer = VerifyBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    device_id = serializer.validated_data["device_id"]
+    event_id = serializer.validated_data.get("event_id")
+    scans = [(scan, _scan_code_rejection(scan, event_id)) for scan in serializer.validated_data["scans"]]
+    admitted = iter(
+        admit_scans(
+            [
+                {"ticket_id": scan["ticket_id"], "scanned_at": scan["scanned_at"], "device_id": device_id}
+                for scan, rejection in scans
+                if rejection is None
+            ]
+        )
+    )
+    results = [
+        {"ticket_id": scan["ticket_id"], "result": rejection} if rejection else next(admitted)
+        for scan, rejection in scans
+    ]
+    summary = Counter(result["result"] for result in results)
+    return Response({"device_id": device_id, "results": results, "summary": summary})
+
+
 class InvitationViewSet(viewsets.ModelViewSet):
     serializer_class = InvitationSerializer
     permission_classes = [IsAuthenticated]
@@ -193,9 +657,9 @@ class InvitationViewSet(viewsets.ModelViewSet):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsProvider])
 def provider_dashboard_data(request):
-    events = Event.objects.filter(provider=request.user).order_by("-date")
-    tickets = Ticket.objects.filter(event__in=events)
-    revenue = sum(t.provider_amount for t in tickets)
+    events = list(Event.objects.filter(provider=request.user).select_related("sales_stats").order_by("-date"))
+    sales, totals = provider_sales(events)
+    ledger = provider_balance(request.user)
 
     events_list = [
         {
@@ -209,21 +673,62 @@ def provider_dashboard_data(request):
             "total_tickets": ev.total_tickets,
             "is_hot": ev.is_hot,
             "image": ev.image.url if ev.image else "",
+            "sales": {name: float(value) if name in AMOUNT_FIELDS else value for name, value in sales[ev.id].items()},
         }
         for ev in events
     ]
 
     return JsonResponse(
         {
-            "events_count": events.count(),
-            "tickets_sold": tickets.count(),
-            "tickets_used": tickets.filter(status="used").count(),
-            "revenue": float(revenue),
+            "events_count": len(events),
+            "tickets_sold": totals["sold"],
+            "tickets_used": totals["used"],
+            "tickets_cancelled": totals["cancelled"],
+            "gross": float(totals["gross"]),
+            "commission": float(totals["commission"]),
+            "revenue": float(totals["provider_net"]),
+            "paid_out": float(ledger["paid_out"]),
+            "balance": float(ledger["balance"]),
             "events": events_list,
         }
     )
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsProvider])
+def provider_dashboard_timeseries(request):
+    params = SalesTimeseriesSerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    query = params.validated_data
+
+    buckets = SalesBucket.objects.filter(event__provider=request.user)
+    if "event" in query:
+        event = get_object_or_404(Event, pk=query["event"], provider=request.user)
+        buckets = SalesBucket.objects.filter(event=event)
+    points = sales_timeseries(
+        buckets, start=query["date_from"], end=query["date_before"], interval=query["interval"], tz=query["tz"]
+    )
+
+    return JsonResponse(
+        {
+            "event": query.get("event"),
+            "interval": query["interval"],
+            "timezone": query["tz"].key,
+            "date_from": query["date_from"].astimezone(query["tz"]).isoformat(),
+            "date_before": query["date_before"].astimezone(query["tz"]).isoformat(),
+            "points": [
+                {
+                    "start": point["start"].isoformat(),
+                    "sold": point["sold"],
+                    "gross": float(point["gross"]),
+                    "revenue": float(point["provider_net"]),
+                }
+                for point in points
+            ],
+        }
+    )
+
+
 @api_view(["GET"])
 def api_root(request):
     return Response(
@@ -1,5 +1,6 @@
 import { api } from './api.js';
 import { auth } from './auth.js';
+import { bookEvent } from './queue.js';
 import { renderNavbar } from './ui.js';
 
 function formatDate(value) {
@@ -41,7 +42,7 @@ function updateAuthLink() {
   }
 }
 
-async function handleBook(eventId) {
+async function handleBook(eventId, isHot) {
   if (!getSessionToken()) {
     alert('Please login to continue with booking.');
     window.location.href = '/login/';
@@ -49,7 +50,7 @@ async function handleBook(eventId) {
   }
 
   try {
-    await api.post(`/tickets/book/${eventId}/`, {});
+    await bookEvent(eventId, isHot);
     alert('Ticket booked successfully! Redirecting to your tickets.');
     window.location.href = '/tickets/';
   } catch (error) {
@@ -78,7 +79,7 @@ function createEventCardMarkup(item) {
       <h3>${title}</h3>
       <p class="event-meta">${formatDate(item.date)}</p>
       <p class="event-meta">${venue}</p>
-      <button class="book-btn" type="button" data-event-id="${item.id}">Book Now</button>
+      <button class="book-btn" type="button" data-event-id="${item.id}" data-hot="${item.is_hot}">Book Now</button>
     </article>
   `;
 }
@@ -95,7 +96,7 @@ function renderEvents(events) {
   grid.innerHTML = events.slice(0, 6).map(createEventCardMarkup).join('');
 
   grid.querySelectorAll('.book-btn').forEach((button) => {
-    button.addEventListener('click', () => handleBook(button.dataset.eventId));
+    button.addEventListener('click', () => handleBook(button.dataset.eventId, button.dataset.hot === 'true'));
   });
 }
 
@@ -106,8 +107,8 @@ async function loadEvents() {
   grid.innerHTML = '<p class="event-empty">Loading featured events...</p>';
 
   try {
-    const events = await api.get('/events/');
-    renderEvents(Array.isArray(events) ? events : []);
+    const page = await api.get('/events/?page_size=6');
+    renderEvents(Array.isArray(page?.results) ? page.results : []);
   } catch {
     grid.innerHTML = '<p class="event-empty">Unable to load events right now. Please try again shortly.</p>';
   }
@@ -35,6 +35,8 @@ function populateEventForm(eventData) {
   form.elements.namedItem('ticket_price').value = eventData.ticket_price;
   form.elements.namedItem('total_tickets').value = eventData.total_tickets;
   form.elements.namedItem('tickets_available').value = eventData.tickets_available;
+  // Availability follows total tickets once an event exists; the server ignores edits to it.
+  form.elements.namedItem('tickets_available').readOnly = true;
   form.elements.namedItem('is_hot').checked = Boolean(eventData.is_hot);
 
   const currentWrap = document.getElementById('current-image-wrap');
@@ -89,6 +91,7 @@ async function loadProviderDashboard() {
         </div>
         ${event.image ? `<img src="${event.image}" alt="${event.title}" class="mt-2 h-28 w-full rounded-lg object-cover" />` : ''}
         <p class="mt-2 text-sm text-slate-300">${event.description || 'No description'}</p>
+        <p class="mt-1 text-xs text-slate-400">${event.sales.sold} sold · ${event.sales.used} checked in · $${event.sales.provider_net.toFixed(2)} net</p>
       </article>
     `
       )
@@ -179,6 +182,7 @@ async function submitEventForm(event) {
 
     form.reset();
     form.elements.namedItem('event_id').value = '';
+    form.elements.namedItem('tickets_available').readOnly = false;
     resetImageControls(form);
     document.getElementById('form-title').textContent = 'Create Event';
     await loadProviderDashboard();
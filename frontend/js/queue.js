@@ -0,0 +1,22 @@
+import { api } from './api.js';
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+async function waitForAdmission(eventId, onWaiting) {
+  const joined = await api.post(`/events/${eventId}/queue/`, {});
+  let state = joined;
+
+  while (!state.admitted) {
+    onWaiting?.(state);
+    await sleep(Math.min(Math.max(state.retry_after, 1), 10) * 1000);
+    state = await api.get(`/queue/${encodeURIComponent(joined.token)}/`);
+  }
+
+  return joined.token;
+}
+
+export async function bookEvent(eventId, isHot, onWaiting) {
+  const headers = { 'Idempotency-Key': crypto.randomUUID() };
+  if (isHot) headers['X-Queue-Token'] = await waitForAdmission(eventId, onWaiting);
+  return api.post(`/tickets/book/${eventId}/`, {}, headers);
+}
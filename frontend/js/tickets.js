@@ -1,9 +1,18 @@
 import { api } from './api.js';
 import { renderNavbar, requireAuth, showMessage } from './ui.js';
 
-function openModal(src, title) {
+async function openModal(ticketId, title) {
   const modal = document.getElementById('qr-modal');
-  modal.querySelector('img').src = src;
+  const image = modal.querySelector('img');
+  try {
+    // The QR endpoint needs the bearer token, so fetch it instead of hot-linking.
+    const { blob } = await api.download(`/tickets/${ticketId}/qr.svg`);
+    if (image.src.startsWith('blob:')) window.URL.revokeObjectURL(image.src);
+    image.src = window.URL.createObjectURL(blob);
+  } catch (error) {
+    showMessage('tickets-message', error.message);
+    return;
+  }
   modal.querySelector('h3').textContent = title;
   modal.classList.remove('hidden');
 }
@@ -21,10 +30,10 @@ function getFileName(headers, fallback) {
   return plainMatch?.[1] || fallback;
 }
 
-async function handleDownload(ticketId) {
+async function handleDownload(endpoint, fallbackName) {
   try {
-    const { blob, headers } = await api.download(`/tickets/download/${ticketId}/`);
-    const fileName = getFileName(headers, `ticket_${ticketId}.pdf`);
+    const { blob, headers } = await api.download(endpoint);
+    const fileName = getFileName(headers, fallbackName);
 
     const url = window.URL.createObjectURL(blob);
     const anchor = document.createElement('a');
@@ -39,6 +48,41 @@ async function handleDownload(ticketId) {
   }
 }
 
+// Tickets are cached per user and kept current with compact delta syncs:
+// each visit only fetches tickets changed since the last one, with every
+// event sent once in a side map instead of inside each ticket.
+function cacheKey(user) {
+  return `tickets-cache-${user.id ?? user.username}`;
+}
+
+function apiPath(url) {
+  const { pathname, search } = new URL(url, window.location.origin);
+  return pathname.replace(/^\/api/, '') + search;
+}
+
+async function syncTickets(user) {
+  const cached = JSON.parse(localStorage.getItem(cacheKey(user)) || 'null');
+  const store = cached || { since: null, tickets: {}, events: {} };
+  const params = new URLSearchParams({ compact: '1', page_size: '200' });
+  if (store.since) params.set('since', store.since);
+
+  let next = `/tickets/my/?${params}`;
+  while (next) {
+    const page = await api.get(next);
+    page.results.forEach((ticket) => {
+      store.tickets[ticket.id] = ticket;
+    });
+    Object.assign(store.events, page.events);
+    store.since = page.since;
+    next = page.next ? apiPath(page.next) : null;
+  }
+
+  localStorage.setItem(cacheKey(user), JSON.stringify(store));
+  return Object.values(store.tickets)
+    .sort((a, b) => a.id - b.id)
+    .map((ticket) => ({ ...ticket, event: store.events[ticket.event_id] }));
+}
+
 async function loadTickets() {
   const user = requireAuth();
   if (!user) return;
@@ -47,7 +91,7 @@ async function loadTickets() {
   list.innerHTML = '<p class="text-slate-400">Loading your tickets...</p>';
 
   try {
-    const tickets = await api.get('/tickets/my/');
+    const tickets = await syncTickets(user);
     if (!tickets.length) {
       list.innerHTML = '<p class="text-slate-400">No purchased tickets yet.</p>';
       return;
@@ -63,7 +107,7 @@ async function loadTickets() {
         </div>
         <p class="mt-2 text-slate-300">${ticket.event.venue} · ${new Date(ticket.event.date).toLocaleString()}</p>
         <div class="mt-4 flex gap-3">
-          <button class="btn-secondary qr-btn" data-title="${ticket.event.title}" data-src="${ticket.qr_code}">View QR</button>
+          <button class="btn-secondary qr-btn" data-title="${ticket.event.title}" data-ticket-id="${ticket.id}" ${ticket.qr_status === 'ready' ? '' : 'disabled'}>${ticket.qr_status === 'ready' ? 'View QR' : 'QR pending...'}</button>
           <button class="btn-primary download-btn" data-ticket-id="${ticket.id}">Download</button>
         </div>
       </article>
@@ -72,12 +116,21 @@ async function loadTickets() {
       .join('');
 
     document.querySelectorAll('.qr-btn').forEach((button) => {
-      button.addEventListener('click', () => openModal(button.dataset.src, button.dataset.title));
+      button.addEventListener('click', () => openModal(button.dataset.ticketId, button.dataset.title));
     });
 
     document.querySelectorAll('.download-btn').forEach((button) => {
-      button.addEventListener('click', () => handleDownload(button.dataset.ticketId));
+      button.addEventListener('click', () =>
+        handleDownload(`/tickets/download/${button.dataset.ticketId}/`, `ticket_${button.dataset.ticketId}.pdf`)
+      );
     });
+
+    const downloadAll = document.getElementById('download-all');
+    if (downloadAll && tickets.length > 1) {
+      const ids = tickets.map((ticket) => ticket.id).join(',');
+      downloadAll.classList.remove('hidden');
+      downloadAll.onclick = () => handleDownload(`/tickets/export.pdf?ids=${ids}`, 'tickets.pdf');
+    }
   } catch (error) {
     showMessage('tickets-message', error.message);
     list.innerHTML = '';
@@ -67,7 +67,7 @@ async function requestBlob(endpoint, options = {}, shouldRetry = true) {
 
 export const api = {
   get: (endpoint) => request(endpoint),
-  post: (endpoint, body) => request(endpoint, { method: 'POST', body: body instanceof FormData ? body : JSON.stringify(body) }),
+  post: (endpoint, body, headers = {}) => request(endpoint, { method: 'POST', headers, body: body instanceof FormData ? body : JSON.stringify(body) }),
   patch: (endpoint, body) => request(endpoint, { method: 'PATCH', body: body instanceof FormData ? body : JSON.stringify(body) }),
   put: (endpoint, body) => request(endpoint, { method: 'PUT', body: body instanceof FormData ? body : JSON.stringify(body) }),
   delete: (endpoint) => request(endpoint, { method: 'DELETE' }),
@@ -9,12 +9,14 @@ async function loadDashboard() {
   document.getElementById('role-pill').textContent = user.role;
 
   try {
-    const [events, tickets] = await Promise.all([api.get('/events/'), api.get('/tickets/my/')]);
+    const [events, tickets] = await Promise.all([api.get('/events/?page_size=3'), api.get('/tickets/my/?compact=1&page_size=3')]);
 
-    const upcoming = events.slice(0, 3).map((event) => `<li>${event.title} · ${new Date(event.date).toLocaleDateString()}</li>`).join('');
+    const upcoming = events.results.map((event) => `<li>${event.title} · ${new Date(event.date).toLocaleDateString()}</li>`).join('');
     document.getElementById('upcoming-events').innerHTML = upcoming || '<li>No upcoming events.</li>';
 
-    const myTickets = tickets.slice(0, 3).map((ticket) => `<li>${ticket.event.title} · ${ticket.status}</li>`).join('');
+    const myTickets = tickets.results
+      .map((ticket) => `<li>${tickets.events[ticket.event_id].title} · ${ticket.status}</li>`)
+      .join('');
     document.getElementById('my-tickets').innerHTML = myTickets || '<li>No tickets purchased yet.</li>';
   } catch (error) {
     showMessage('dashboard-message', error.message);
@@ -1,21 +1,9 @@
 import { api } from './api.js';
+import { bookEvent } from './queue.js';
 import { renderNavbar, showMessage } from './ui.js';
 
-async function renderEvents() {
-  const grid = document.getElementById('events-grid');
-  if (!grid) return;
-
-  grid.innerHTML = '<p class="text-slate-400">Loading events...</p>';
-  try {
-    const events = await api.get('/events/');
-    if (!events.length) {
-      grid.innerHTML = '<p class="text-slate-400">No events available right now.</p>';
-      return;
-    }
-
-    grid.innerHTML = events
-      .map(
-        (event) => `
+function eventCardMarkup(event) {
+  return `
         <article class="glass p-5 transition-all duration-300 hover:scale-105 hover:shadow-lg fade-in">
           <div class="mb-3 flex items-center justify-between">
             <h3 class="text-lg font-semibold">${event.title}</h3>
@@ -23,37 +11,120 @@ async function renderEvents() {
           </div>
           <p class="text-sm text-slate-300 mb-3">${event.description || 'No description available.'}</p>
           <ul class="mb-4 space-y-1 text-sm text-slate-400">
-            <li><i class="fa-regular fa-calendar"></i> ${new Date(event.date).toLocaleString()}</li>
+            <li><i class="fa-regular fa-calendar"></i> ${event.date ? new Date(event.date).toLocaleString() : 'Date TBA'}</li>
             <li><i class="fa-solid fa-location-dot"></i> ${event.venue}</li>
             <li><i class="fa-solid fa-ticket"></i> ${event.tickets_available} available</li>
           </ul>
           <div class="flex items-center justify-between">
             <span class="font-semibold text-blue-300">$${event.ticket_price}</span>
-            <button class="btn-primary book-btn" data-id="${event.id}">Book Now</button>
+            <button class="btn-primary book-btn" data-id="${event.id}" data-hot="${event.is_hot}">Book Now</button>
           </div>
         </article>
-      `
-      )
-      .join('');
-
-    document.querySelectorAll('.book-btn').forEach((btn) => {
-      btn.addEventListener('click', async () => {
-        try {
-          btn.disabled = true;
-          btn.textContent = 'Booking...';
-          await api.post(`/tickets/book/${btn.dataset.id}/`, {});
-          btn.textContent = 'Booked ✓';
-        } catch (error) {
-          showMessage('events-message', error.message);
-          btn.disabled = false;
-          btn.textContent = 'Book Now';
-        }
-      });
+      `;
+}
+
+function apiPath(url) {
+  const { pathname, search } = new URL(url, window.location.origin);
+  return pathname.replace(/^\/api/, '') + search;
+}
+
+function bindBookButtons(scope) {
+  scope.querySelectorAll('.book-btn:not([data-bound])').forEach((btn) => {
+    btn.dataset.bound = 'true';
+    btn.addEventListener('click', async () => {
+      try {
+        btn.disabled = true;
+        btn.textContent = 'Booking...';
+        await bookEvent(btn.dataset.id, btn.dataset.hot === 'true', (state) => {
+          btn.textContent = `In queue (${state.ahead} ahead)...`;
+        });
+        btn.textContent = 'Booked ✓';
+      } catch (error) {
+        showMessage('events-message', error.message);
+        btn.disabled = false;
+        btn.textContent = 'Book Now';
+      }
+    });
+  });
+}
+
+function searchEndpoint(form) {
+  const params = new URLSearchParams();
+  new FormData(form).forEach((value, name) => {
+    if (String(value).trim()) params.set(name, value);
+  });
+  const query = params.toString();
+  return query ? `/events/?${query}` : '/events/';
+}
+
+// The list is cursor-paginated: each page carries the link to the next one,
+// fetched when the sentinel below the grid scrolls into view. Searching
+// restarts from the first page of the filtered results.
+function renderEvents() {
+  const grid = document.getElementById('events-grid');
+  if (!grid) return;
+
+  const sentinel = document.createElement('div');
+  sentinel.setAttribute('aria-hidden', 'true');
+  grid.after(sentinel);
+
+  let first = '/events/';
+  let next = first;
+  let loading = false;
+  let generation = 0;
+
+  const loadMore = async () => {
+    if (!next || loading) return;
+    loading = true;
+    const requested = generation;
+    const endpoint = next;
+    try {
+      const page = await api.get(endpoint);
+      if (requested !== generation) return;
+      if (endpoint === first) grid.innerHTML = '';
+      grid.insertAdjacentHTML('beforeend', page.results.map(eventCardMarkup).join(''));
+      bindBookButtons(grid);
+      next = page.next ? apiPath(page.next) : null;
+      if (!grid.children.length) {
+        grid.innerHTML = '<p class="text-slate-400">No events match your search.</p>';
+      }
+    } catch (error) {
+      if (requested !== generation) return;
+      showMessage('events-message', error.message);
+      if (endpoint === first) grid.innerHTML = '';
+      next = null;
+    } finally {
+      if (requested === generation) loading = false;
+    }
+    // Re-observing fires again straight away if the sentinel is still on screen.
+    observer.unobserve(sentinel);
+    if (next) observer.observe(sentinel);
+  };
+
+  const observer = new IntersectionObserver((entries) => {
+    if (entries.some((entry) => entry.isIntersecting)) loadMore();
+  }, { rootMargin: '400px' });
+
+  const restart = (endpoint) => {
+    generation += 1;
+    first = endpoint;
+    next = endpoint;
+    loading = false;
+    grid.innerHTML = '<p class="text-slate-400">Loading events...</p>';
+    loadMore();
+  };
+
+  const form = document.getElementById('events-search');
+  if (form) {
+    let debounce;
+    form.addEventListener('submit', (event) => event.preventDefault());
+    form.addEventListener('input', () => {
+      clearTimeout(debounce);
+      debounce = setTimeout(() => restart(searchEndpoint(form)), 250);
     });
-  } catch (error) {
-    showMessage('events-message', error.message);
-    grid.innerHTML = '';
   }
+
+  restart(first);
 }
 
 renderNavbar();
@@ -1,30 +1,110 @@
 import { api } from './api.js';
 import { renderNavbar, requireAuth, showMessage } from './ui.js';
 
+const QUEUE_KEY = 'scanner-offline-queue';
+const DEVICE_KEY = 'scanner-device-id';
+const BATCH_SIZE = 500;
+
+function deviceId() {
+  let id = localStorage.getItem(DEVICE_KEY);
+  if (!id) {
+    id = `gate-${crypto.randomUUID()}`;
+    localStorage.setItem(DEVICE_KEY, id);
+  }
+  return id;
+}
+
+function queuedScans() {
+  return JSON.parse(localStorage.getItem(QUEUE_KEY) || '[]');
+}
+
+function saveQueue(scans) {
+  localStorage.setItem(QUEUE_KEY, JSON.stringify(scans));
+}
+
+const RESULT_STYLES = {
+  ok: 'mt-4 rounded-xl bg-emerald-500/20 p-3 text-emerald-300',
+  pending: 'mt-4 rounded-xl bg-amber-500/20 p-3 text-amber-300',
+  error: 'mt-4 rounded-xl bg-rose-500/20 p-3 text-rose-300',
+};
+
+function showResult(kind, text) {
+  const result = document.getElementById('scanner-result');
+  result.className = RESULT_STYLES[kind];
+  result.textContent = text;
+}
+
+// Scanned QR codes are signed (TF1.<key>.<ticket>.<event>.<mac>); typed IDs are plain
+// numbers, and older printed tickets show "ticket:<id>". Only signed codes are sent as a code.
+const SIGNED_CODE = /^TF1\.[A-Z0-9]+\.(\d+)\.\d+\.[A-Z2-7]+$/i;
+const PLAIN_ID = /^(?:ticket:)?(\d+)$/i;
+
+function parseInput(input) {
+  const signed = SIGNED_CODE.exec(input);
+  if (signed) return { ticketId: Number(signed[1]), code: input };
+  const plain = PLAIN_ID.exec(input);
+  return plain ? { ticketId: Number(plain[1]) } : null;
+}
+
+async function flushQueue() {
+  let scans = queuedScans();
+  while (scans.length && navigator.onLine) {
+    const batch = scans.slice(0, BATCH_SIZE);
+    try {
+      // Re-uploading a batch is harmless: the earliest scan of each ticket wins.
+      const data = await api.post('/tickets/verify/batch/', { device_id: deviceId(), scans: batch });
+      scans = queuedScans().slice(batch.length);
+      saveQueue(scans);
+      const rejected = data.results.filter((result) => result.result !== 'admitted');
+      showMessage(
+        'scanner-message',
+        `Synced ${batch.length} offline scan(s)${rejected.length ? `, ${rejected.length} rejected (e.g. ticket ${rejected[0].ticket_id}: ${rejected[0].result})` : ''}.`
+      );
+    } catch (error) {
+      return;
+    }
+  }
+}
+
 async function verifyTicket(event) {
   event.preventDefault();
   const user = requireAuth(['staff', 'admin']);
   if (!user) return;
 
-  const ticketId = document.getElementById('ticket-id').value.trim();
-  if (!ticketId) {
+  const input = document.getElementById('ticket-id').value.trim();
+  if (!input) {
     showMessage('scanner-message', 'Please provide ticket ID.');
     return;
   }
+  const scan = parseInput(input);
+  if (!scan) {
+    showResult('error', 'Unrecognised ticket code.');
+    return;
+  }
 
   const result = document.getElementById('scanner-result');
   result.textContent = 'Verifying...';
+  const scannedAt = new Date().toISOString();
 
   try {
-    const data = await api.post('/tickets/verify/', { ticket_id: ticketId });
-    result.className = 'mt-4 rounded-xl bg-emerald-500/20 p-3 text-emerald-300';
-    result.textContent = `${data.message}: ${data.event}`;
+    const body = scan.code ? { code: scan.code } : { ticket_id: scan.ticketId };
+    const data = await api.post('/tickets/verify/', body, { 'Idempotency-Key': crypto.randomUUID() });
+    showResult('ok', `${data.message}: ${data.event}`);
   } catch (error) {
-    result.className = 'mt-4 rounded-xl bg-rose-500/20 p-3 text-rose-300';
-    result.textContent = error.message;
+    if (error instanceof TypeError || !navigator.onLine) {
+      // No connectivity: keep the scan for the next batch. The device cannot check
+      // the code's signature, so the server verifies it when the batch uploads.
+      const queued = { ticket_id: scan.ticketId, scanned_at: scannedAt, ...(scan.code && { code: scan.code }) };
+      saveQueue([...queuedScans(), queued]);
+      showResult('pending', `Offline - queued, unverified (${queuedScans().length} pending upload).`);
+      return;
+    }
+    showResult('error', error.message);
   }
 }
 
 document.getElementById('scanner-form')?.addEventListener('submit', verifyTicket);
+window.addEventListener('online', flushQueue);
 
 renderNavbar();
+flushQueue();
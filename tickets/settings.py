@@ -11,10 +11,13 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import base64
 import os
+import secrets
 import sys
 from dotenv import load_dotenv
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 
 load_dotenv()
 
@@ -55,6 +58,7 @@ MIDDLEWARE = [
 ]
 
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key", "x-queue-token")
 
 LANGUAGES = [
     ("en", "English"),
@@ -130,6 +134,117 @@ SIMPLE_JWT = {
 
 AUTH_USER_MODEL = "core.User"
 PLATFORM_COMMISSION_PERCENT = 10
+MAX_TICKETS_PER_BOOKING = int(os.getenv("MAX_TICKETS_PER_BOOKING", "10"))
+# Responses to Idempotency-Key requests are replayed for IDEMPOTENCY_KEY_TTL
+# seconds. A request still running holds its key for at most
+# IDEMPOTENCY_LOCK_TTL, so a worker killed mid-request frees it quickly.
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", str(24 * 60 * 60)))
+IDEMPOTENCY_LOCK_TTL = int(os.getenv("IDEMPOTENCY_LOCK_TTL", "60"))
+
+# Background tasks: "thread" (in-process pool), "celery" or "sync" (inline).
+BACKGROUND_TASK_BACKEND = os.getenv("BACKGROUND_TASK_BACKEND", "thread")
+BACKGROUND_TASK_WORKERS = int(os.getenv("BACKGROUND_TASK_WORKERS", "2"))
+
+# QR codes are rendered on demand; set QR_PERSIST_FILES to keep writing PNGs
+# to MEDIA_ROOT while old clients still read them from there.
+QR_PERSIST_FILES = os.getenv("QR_PERSIST_FILES", "False") == "True"
+QR_CACHE_SIZE = int(os.getenv("QR_CACHE_SIZE", "1024"))
+
+# Ticket QR codes carry an HMAC under QR_SIGNING_KEY_ID. To rotate, add the
+# new key to QR_SIGNING_KEYS ("K1:secret,K2:secret"), switch the id, and drop
+# the old key once tickets signed with it no longer need to scan. Key ids
+# must be upper-case letters and digits. There is no SECRET_KEY fallback.
+QR_SIGNING_KEYS = dict(entry.split(":", 1) for entry in os.getenv("QR_SIGNING_KEYS", "").split(",") if entry)
+QR_SIGNING_KEY_ID = os.getenv("QR_SIGNING_KEY_ID", "K1")
+# A missing key is reported by `manage.py check` (core.checks), not at import.
+if RUNNING_TESTS and not QR_SIGNING_KEYS:
+    QR_SIGNING_KEYS = {QR_SIGNING_KEY_ID: secrets.token_urlsafe(32)}
+
+# Ticket PDFs render in a process pool; 0 workers renders inline. Past
+# PDF_RENDER_MAX_PENDING queued renders per web process, downloads get a 503.
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+PDF_RENDER_MAX_PENDING = int(os.getenv("PDF_RENDER_MAX_PENDING", "8"))
+PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", "10"))
+PDF_RENDER_RETRY_AFTER = int(os.getenv("PDF_RENDER_RETRY_AFTER", "5"))
+
+TICKET_EXPORT_MAX_TICKETS = int(os.getenv("TICKET_EXPORT_MAX_TICKETS", "5000"))
+
+# Rendered ticket PDFs are cached in memory, or on disk when PDF_CACHE_DIR is
+# set; either way the oldest entries are culled past PDF_CACHE_MAX_ENTRIES.
+PDF_CACHE_ALIAS = "ticket_pdfs"
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR")
+
+# State every worker has to see (idempotency keys, cached event responses)
+# lives in the shared cache: Redis at SHARED_CACHE_URL, or else the database
+# cache table created by `manage.py createcachetable`.
+SHARED_CACHE_ALIAS = "shared"
+SHARED_CACHE_URL = os.getenv("SHARED_CACHE_URL", "")
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    PDF_CACHE_ALIAS: {
+        "BACKEND": (
+            "django.core.cache.backends.filebased.FileBasedCache"
+            if PDF_CACHE_DIR
+            else "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": PDF_CACHE_DIR or "ticket-pdfs",
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("PDF_CACHE_MAX_ENTRIES", "500"))},
+    },
+    SHARED_CACHE_ALIAS: {
+        "BACKEND": (
+            "django.core.cache.backends.redis.RedisCache"
+            if SHARED_CACHE_URL
+            else "django.core.cache.backends.db.DatabaseCache"
+        ),
+        "LOCATION": SHARED_CACHE_URL or "core_shared_cache",
+    },
+}
+
+# Anonymous GET /api/events/ responses, in the shared cache (never cached
+# when EVENT_RESPONSE_CACHE_ALIAS is a per-process LocMemCache). Set
+# EVENT_RESPONSE_STALE_SECONDS during on-sales to stop bookings from
+# invalidating them; listed availability may then lag by up to that many seconds.
+EVENT_RESPONSE_CACHE_ALIAS = SHARED_CACHE_ALIAS
+EVENT_RESPONSE_CACHE_SECONDS = int(os.getenv("EVENT_RESPONSE_CACHE_SECONDS", "300"))
+EVENT_RESPONSE_STALE_SECONDS = int(os.getenv("EVENT_RESPONSE_STALE_SECONDS", "0"))
+
+# Compact "my tickets" syncs (?since=) re-send tickets changed this long
+# before the given time, so writes committed out of clock order are not missed.
+TICKET_SYNC_OVERLAP_SECONDS = int(os.getenv("TICKET_SYNC_OVERLAP_SECONDS", "5"))
+
+# Ledger snapshots only cover entries at least this old, so bookings still
+# committing when a snapshot runs are not skipped.
+LEDGER_SNAPSHOT_LAG_SECONDS = int(os.getenv("LEDGER_SNAPSHOT_LAG_SECONDS", "300"))
+
+# Entry manifests for offline gate checks are signed with this Ed25519 private
+# key, base64 of its 32 raw bytes (e.g. `openssl rand -base64 32`). Devices
+# only get the public key from `manage.py manifest_public_key`.
+ENTRY_MANIFEST_SIGNING_KEY = os.getenv("ENTRY_MANIFEST_SIGNING_KEY", "")
+# A missing key is reported by `manage.py check` (core.checks), not at import,
+# so build steps like collectstatic run without it.
+if RUNNING_TESTS and not ENTRY_MANIFEST_SIGNING_KEY:
+    ENTRY_MANIFEST_SIGNING_KEY = base64.b64encode(secrets.token_bytes(32)).decode()
+ENTRY_MANIFEST_CACHE_SECONDS = int(os.getenv("ENTRY_MANIFEST_CACHE_SECONDS", "300"))
+ENTRY_MANIFEST_DELTA_OVERLAP_SECONDS = int(os.getenv("ENTRY_MANIFEST_DELTA_OVERLAP_SECONDS", "5"))
+
+# Seat holds live in the database by default (core.holds.RedisHoldBackend is
+# the faster shared alternative); run sweep_holds to return expired seats.
+# The per-process core.holds.LocalHoldBackend is only for tests.
+TICKET_HOLD_MINUTES = int(os.getenv("TICKET_HOLD_MINUTES", "10"))
+TICKET_HOLD_BACKEND = os.getenv(
+    "TICKET_HOLD_BACKEND", "core.holds.LocalHoldBackend" if RUNNING_TESTS else "core.holds.DatabaseHoldBackend"
+)
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Waiting room for is_hot events. Queue counters live in the default cache,
+# which must be shared (e.g. Redis) when running more than one worker.
+WAITING_ROOM_ENABLED = os.getenv("WAITING_ROOM_ENABLED", "True") == "True"
+WAITING_ROOM_ADMIT_PER_SECOND = float(os.getenv("WAITING_ROOM_ADMIT_PER_SECOND", "20"))
+WAITING_ROOM_BURST = int(os.getenv("WAITING_ROOM_BURST", "50"))
+WAITING_ROOM_ADMISSION_MINUTES = int(os.getenv("WAITING_ROOM_ADMISSION_MINUTES", "10"))
+WAITING_ROOM_SESSION_MINUTES = int(os.getenv("WAITING_ROOM_SESSION_MINUTES", "30"))
 
 AUTH_PASSWORD_VALIDATORS = [
     # {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},